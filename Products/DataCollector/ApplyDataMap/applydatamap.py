@@ -12,6 +12,7 @@ import logging
 
 from collections import defaultdict
 
+from Acquisition import aq_base
 from ZODB.transact import transact
 from zope.event import notify
 
@@ -390,6 +391,10 @@ def _process_relationshipmap(relmap, base_device):
     new_relmap._parent = parent
     new_relmap._relname = relname
 
+    # look up every related object in one pass over the relationship
+    relationship = getattr(parent, relname)
+    related = _get_related_objects(relationship)
+
     seenids = defaultdict(int)
     object_maps = []
     for objmap in (_clone_datamap(dm) for dm in relmap):
@@ -401,23 +406,34 @@ def _process_relationshipmap(relmap, base_device):
 
     # remove any objects no longer included in the relationshipmap
     # to be deleted (device, relationship_name, object/id)
-    new_relmap._diff = _get_relationshipmap_diff(parent, relname, object_maps)
+    new_relmap._diff = _get_relationshipmap_diff(
+        parent, relname, object_maps, related
+    )
 
     new_maps = [
         _validate_datamap(parent, object_map) for object_map in object_maps
     ]
-    for map in new_maps:
+    for object_map, map in zip(object_maps, new_maps):
         map.plugin_name = relmap.plugin_name
+        if isinstance(object_map, ObjectMap):
+            _set_related_target(map, parent, relname, relationship, related)
 
     new_relmap.maps = new_maps
 
     return new_relmap
 
 
-def _get_relationshipmap_diff(device, relname, datamaps):
-    """Return a list of objects on the device, that are not in the relmap"""
+def _get_relationshipmap_diff(device, relname, datamaps, related=None):
+    """Return a list of objects on the device, that are not in the relmap
+
+    related is the dict returned by _get_related_objects, if it was
+    already built.
+    """
     relationship = getattr(device, relname)
-    relids = _get_relationship_ids(device, relname)
+    if related is None:
+        relids = _get_relationship_ids(device, relname)
+    else:
+        relids = related
     removed = set(relids) - set([o.id for o in datamaps])
     missing_objects = (relationship._getOb(id) for id in removed)
 
@@ -436,6 +452,28 @@ def _get_relationship_ids(device, relationship_name):
     return set(relationship.objectIdsAll())
 
 
+def _get_related_objects(relationship):
+    """Return a dict of the relationship's objects by id"""
+    return dict(relationship.objectItemsAll())
+
+
+def _set_related_target(idm, parent, relname, relationship, related):
+    """Give an IncrementalDataMap for an object in the relationship its
+    parent, relationship and target, from the related objects, so that
+    it doesn't look each of them up.
+    """
+    if not relname or idm.path or idm.relname != relname:
+        # the map targets an object in another relationship
+        return
+    idm._parent = parent
+    idm._relationship = relationship
+    obj = related.get(idm.id)
+    if obj is None:
+        idm.target = None
+    else:
+        idm.target = aq_base(obj).__of__(relationship)
+
+
 ##############################################################################
 # Apply Changes
 ##############################################################################
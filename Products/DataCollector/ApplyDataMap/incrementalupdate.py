@@ -274,14 +274,7 @@ class IncrementalDataMap(object):
     def _add(self):
         """Add the target device to the parent relationship"""
         changed = False
-        self._target = next(
-            (
-                obj
-                for objId, obj in self.relationship.objectItemsAll()
-                if objId == self._target_id
-            ),
-            _NOTSET,
-        )
+        self._target = self.relationship._getOb(self._target_id, _NOTSET)
         if self._target is _NOTSET:
             changed = True
             self._create_target()
@@ -0,0 +1,93 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Measure how long ApplyDataMap takes to apply relationship maps.
+
+    python -m Products.DataCollector.ApplyDataMap.relmap_benchmark [-s SIZES]
+
+For each size, a RelationshipMap with that many interfaces is applied to
+a new device four times: adding every interface, with nothing changed,
+changing every interface, and with half of the interfaces removed.  It
+runs against the configured ZODB and model catalog, and every
+transaction is aborted, so nothing is committed.
+"""
+
+import argparse
+import os
+import time
+
+import transaction
+
+from Products.DataCollector.plugins.DataMaps import RelationshipMap
+from Products.ZenUtils.ZenScriptBase import ZenScriptBase
+
+from .applydatamap import ApplyDataMap
+
+
+def _relmap(count, description=""):
+    return RelationshipMap(
+        compname="os",
+        relname="interfaces",
+        modname="Products.ZenModel.IpInterface",
+        objmaps=[
+            {
+                "id": "eth%d" % i,
+                "interfaceName": "eth%d" % i,
+                "ifindex": i,
+                "speed": 1e9,
+                "description": description,
+            }
+            for i in xrange(count)
+        ],
+    )
+
+
+def _timed(name, size, function):
+    start = time.time()
+    result = function()
+    elapsed = time.time() - start
+    print("%-10s %7d interfaces %8.2f seconds %8.1f us/interface" % (
+        name, size, elapsed, elapsed * 1e6 / size))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-s", "--sizes", default="100,1000,10000,100000",
+        help="comma separated relationship map sizes",
+    )
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    dmd = ZenScriptBase(noopts=True, connect=True, should_log=False).dmd
+    adm = ApplyDataMap()
+    for size in sizes:
+        transaction.abort()
+        device = dmd.Devices.createInstance(
+            "relmap-benchmark-%d" % os.getpid()
+        )
+        try:
+            added = _relmap(size)
+            changed = _relmap(size, description="changed")
+            removed = _relmap(size // 2, description="changed")
+            _timed("add", size,
+                   lambda: adm.applyDataMap(device, added, commit=False))
+            _timed("nochange", size,
+                   lambda: adm.applyDataMap(device, added, commit=False))
+            _timed("update", size,
+                   lambda: adm.applyDataMap(device, changed, commit=False))
+            _timed("remove", size,
+                   lambda: adm.applyDataMap(device, removed, commit=False))
+        finally:
+            transaction.abort()
+
+
+if __name__ == "__main__":
+    main()
@@ -23,11 +23,13 @@ from ..applydatamap import (
     _create_object,
     _get_object_by_pid,
     _get_objmap_target,
+    _get_related_objects,
     _get_relationship_ids,
     _get_relationshipmap_diff,
     _get_relmap_target,
     _process_relationshipmap,
     _remove_relationship,
+    _set_related_target,
     _validate_datamap,
     _validate_device_class,
 )
@@ -731,6 +733,9 @@ class Test_process_relationshipmap(BaseTestCase):
     @patch("{src}._get_relationshipmap_diff".format(**PATH), autospec=True)
     def test_process_relationshipmap(t, _get_relationshipmap_diff):
         device = Mock(name="device")
+        eth0 = Mock(name="eth0")
+        eth0.__of__ = Mock(name="__of__")
+        device.interfaces.objectItemsAll.return_value = [("eth0", eth0)]
         relmap = RelationshipMap(
             relname="interfaces",
             modname="Products.ZenModel.IpInterface",
@@ -754,6 +759,12 @@ class Test_process_relationshipmap(BaseTestCase):
             t.assertEqual(omap.parent, processed._parent)
             t.assertEqual(omap.plugin_name, relmap.plugin_name)
         t.assertEqual(processed._diff, _get_relationshipmap_diff.return_value)
+        t.assertEqual(
+            _get_relationshipmap_diff.call_args[0][3], {"eth0": eth0}
+        )
+        t.assertEqual(processed.maps[0].target, eth0.__of__.return_value)
+        eth0.__of__.assert_called_with(device.interfaces)
+        t.assertIsNone(processed.maps[1].target)
 
     @patch("{src}._get_relationshipmap_diff".format(**PATH), autospec=True)
     def test_handles_duplicate_ids(t, _get_relationshipmap_diff):
@@ -761,6 +772,7 @@ class Test_process_relationshipmap(BaseTestCase):
         those subsequent objects are given id = id_n
         """
         device = Mock(name="device")
+        device.interfaces.objectItemsAll.return_value = []
 
         om1 = ObjectMap({"id": "eth0"})
         om2 = ObjectMap({"id": "eth0"})
@@ -832,6 +844,72 @@ class Test__get_relationshipmap_diff(BaseTestCase):
         t.assertEqual(ret, {"removed": [t.object_1], "locked": [t.object_2]})
 
 
+class Test_get_related_objects(BaseTestCase):
+    def test__get_related_objects(t):
+        relationship = Mock(name="relationship")
+        relationship.objectItemsAll.return_value = [
+            ("r1", sentinel.r1),
+            ("r2", sentinel.r2),
+        ]
+
+        ret = _get_related_objects(relationship)
+
+        t.assertEqual(ret, {"r1": sentinel.r1, "r2": sentinel.r2})
+        relationship.objectItemsAll.assert_called_once_with()
+
+
+class Test_set_related_target(BaseTestCase):
+    def setUp(t):
+        super(Test_set_related_target, t).setUp()
+        t.parent = Mock(name="parent")
+        t.relationship = Mock(name="relationship")
+        t.obj = Mock(name="obj")
+        t.obj.__of__ = Mock(name="__of__")
+        t.related = {"eth0": t.obj}
+
+    def idm(t, data):
+        return IncrementalDataMap(t.parent, ObjectMap(data))
+
+    def test_existing_object(t):
+        idm = t.idm({"id": "eth0", "relname": "interfaces"})
+
+        _set_related_target(
+            idm, t.parent, "interfaces", t.relationship, t.related
+        )
+
+        t.assertIs(idm.parent, t.parent)
+        t.assertIs(idm.relationship, t.relationship)
+        t.assertIs(idm.target, t.obj.__of__.return_value)
+        t.obj.__of__.assert_called_with(t.relationship)
+
+    def test_new_object(t):
+        idm = t.idm(
+            {
+                "id": "eth1",
+                "relname": "interfaces",
+                "modname": "Products.ZenModel.IpInterface",
+            }
+        )
+
+        _set_related_target(
+            idm, t.parent, "interfaces", t.relationship, t.related
+        )
+
+        t.assertIsNone(idm.target)
+        t.assertEqual(idm.directive, "add")
+
+    def test_object_elsewhere(t):
+        idm = t.idm(
+            {"id": "eth0", "relname": "interfaces", "compname": "os"}
+        )
+
+        _set_related_target(
+            idm, t.parent, "interfaces", t.relationship, t.related
+        )
+
+        t.assertIsNone(idm._parent)
+
+
 class Test_get_relationship_ids(BaseTestCase):
     def test__get_relationship_ids(t):
         relname = "relationship_name"
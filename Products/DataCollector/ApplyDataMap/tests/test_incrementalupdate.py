@@ -562,9 +562,19 @@ class TestIncrementalDataMapImpl(BaseTestCase):
         Requires modname.
         """
         t.idm._create_target = create_autospec(t.idm._create_target)
-        t.idm._create_target.return_value = t.target
+
+        def _create_target():
+            t.idm._target = t.target
+
+        t.idm._create_target.side_effect = _create_target
         t.relationship.hasobject.return_value = False
-        t.relationship.objectItemsAll.return_value = ()
+
+        def _getOb(id, *default):
+            if t.relationship._setObject.called:
+                return t.target
+            return default[0]
+
+        t.relationship._getOb.side_effect = _getOb
         t.idm.modname = "module.name"
 
         t.idm._add()
@@ -7,6 +7,7 @@
 #
 ##############################################################################
 
+import hashlib
 import logging
 
 from pprint import pformat
@@ -191,3 +192,65 @@ class MultiArgs(PBSafe):
 
 
 pb.setUnjellyableForClass(MultiArgs, MultiArgs)
+
+
+_SCALAR_TYPES = (type(None), bool, int, long, float, complex)
+
+
+def _encode(value, out):
+    """
+    Append a string encoding value to out; equal values, including dicts
+    and sets whatever their order, and maps with equal attributes, are
+    encoded alike.
+    """
+    kind = type(value)
+    if kind in _SCALAR_TYPES:
+        out.append("%s:%r;" % (kind.__name__, value))
+    elif isinstance(value, basestring):
+        if isinstance(value, unicode):
+            value = value.encode("utf-8")
+        out.append("%s:%d:" % (kind.__name__, len(value)))
+        out.append(value)
+    elif isinstance(value, (list, tuple)):
+        out.append("%s:%d[" % (kind.__name__, len(value)))
+        for item in value:
+            _encode(item, out)
+        out.append("]")
+    elif isinstance(value, dict):
+        _encodeItems(kind.__name__, value.iteritems(), out)
+    elif isinstance(value, (set, frozenset)):
+        _encodeItems(kind.__name__, ((item, None) for item in value), out)
+    elif hasattr(value, "__dict__"):
+        _encodeItems(
+            "%s.%s" % (kind.__module__, kind.__name__),
+            value.__dict__.iteritems(),
+            out,
+        )
+    else:
+        # An object with a repr that changes while its value doesn't only
+        # makes the value look changed.
+        out.append("%s:%r;" % (kind.__name__, value))
+
+
+def _encodeItems(name, items, out):
+    encoded = []
+    for key, value in items:
+        item = []
+        _encode(key, item)
+        _encode(value, item)
+        encoded.append("".join(item))
+    encoded.sort()
+    out.append("%s:%d{" % (name, len(encoded)))
+    out.extend(encoded)
+    out.append("}")
+
+
+def fingerprint(datamaps):
+    """
+    Return a hash of the contents of a datamap, or of a list of them, that
+    is the same for equal datamaps, even if they were built in a
+    different order.
+    """
+    out = []
+    _encode(datamaps, out)
+    return hashlib.sha1("".join(out)).hexdigest()
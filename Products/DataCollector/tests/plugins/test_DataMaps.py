@@ -11,7 +11,12 @@ from __future__ import absolute_import
 
 from unittest import TestCase
 
-from ...plugins.DataMaps import RelationshipMap, ObjectMap
+from ...plugins.DataMaps import (
+    MultiArgs,
+    ObjectMap,
+    RelationshipMap,
+    fingerprint,
+)
 
 
 class TestRelationshipMap(TestCase):
@@ -77,3 +82,48 @@ class TestRelationshipMap(TestCase):
         t.assertEqual(om2.plugin_name, "test.plugin")
         t.assertEqual(relmap.maps[2].plugin_name, "test.plugin")
         t.assertEqual(om3.plugin_name, "test.plugin")
+
+
+class TestFingerprint(TestCase):
+    def relmap(t, data):
+        return RelationshipMap(
+            relname="interfaces",
+            modname="Products.ZenModel.IpInterface",
+            plugin_name="test.plugin",
+            objmaps=data,
+        )
+
+    def test_equal_maps_have_equal_fingerprints(t):
+        first = t.relmap(
+            [
+                {"id": "eth0", "speed": 1000, "setIpAddresses": ["10.0.0.1"]},
+                {"id": "eth1", "extra": {"a": 1, "b": set([2, 3])}},
+            ]
+        )
+        data = [
+            {"setIpAddresses": ["10.0.0.1"], "speed": 1000, "id": "eth0"},
+            {"extra": {"b": set([3, 2]), "a": 1}, "id": "eth1"},
+        ]
+        t.assertEqual(fingerprint(first), fingerprint(t.relmap(data)))
+        t.assertEqual(
+            fingerprint([ObjectMap({"setFoo": MultiArgs("a", 1)})]),
+            fingerprint([ObjectMap({"setFoo": MultiArgs("a", 1)})]),
+        )
+
+    def test_changed_maps_have_different_fingerprints(t):
+        relmap = t.relmap([{"id": "eth0", "speed": 1000}])
+        others = [
+            t.relmap([{"id": "eth0", "speed": 100}]),
+            t.relmap([{"id": "eth0", "speed": 1000.0}]),
+            t.relmap([{"id": "eth0", "speed": "1000"}]),
+            t.relmap([{"id": "eth0", "speed": 1000, "mtu": None}]),
+            t.relmap([{"id": "eth0", "speed": 1000}, {"id": "eth1"}]),
+            t.relmap([]),
+        ]
+        renamed = t.relmap([{"id": "eth0", "speed": 1000}])
+        renamed.relname = "otherinterfaces"
+        others.append(renamed)
+        others.append(ObjectMap({"id": "eth0", "speed": 1000}))
+        fingerprints = set(fingerprint(m) for m in others)
+        t.assertEqual(len(fingerprints), len(others))
+        t.assertNotIn(fingerprint(relmap), fingerprints)
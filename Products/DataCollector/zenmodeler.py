@@ -44,7 +44,10 @@ from twisted.internet import reactor
 from twisted.python.failure import Failure
 
 from Products.DataCollector import Classifier
-from Products.DataCollector.plugins.DataMaps import PLUGIN_NAME_ATTR
+from Products.DataCollector.plugins.DataMaps import (
+    PLUGIN_NAME_ATTR,
+    fingerprint,
+)
 from Products.DataCollector.PortscanClient import PortscanClient
 from Products.DataCollector.PythonClient import PythonClient
 from Products.DataCollector.SnmpClient import SnmpClient
@@ -78,6 +81,20 @@ _CONFIG_PULLING_TIMEOUT = 15  # seconds
 unused(DeviceProxy, Plugins)
 
 
+class AppliedMaps(object):
+    """
+    Fingerprints of the datamaps that were last applied to a device, by
+    plugin name.
+    """
+
+    def __init__(self, lastChange, fullApplyTime, fingerprints):
+        # The device's lastChange when the maps were applied
+        self.lastChange = lastChange
+        # When all of the device's maps were last applied
+        self.fullApplyTime = fullApplyTime
+        self.fingerprints = fingerprints
+
+
 class ZenModeler(PBDaemon):
     """
     Daemon class to attach to zenhub and pass along
@@ -124,6 +141,8 @@ class ZenModeler(PBDaemon):
         self.counters = collections.Counter()
         self.configFilter = None
         self.configLoaded = False
+        # {device id: AppliedMaps}
+        self.appliedMaps = {}
 
         # Make sendEvent() available to plugins
         zope.component.provideUtility(self, IEventService)
@@ -681,6 +700,59 @@ class ZenModeler(PBDaemon):
             return False
         return True
 
+    def selectChangedMaps(self, device, maps):
+        """
+        Return the maps of the plugins whose maps changed since they were
+        last applied to the device, and the AppliedMaps to keep once they
+        are applied, or None.
+
+        All of the maps are returned when modeling a single device, if the
+        device changed since maps were last applied to it, and at least
+        every fullApplyInterval hours.
+
+        @param device: device proxy
+        @type device: DeviceProxy
+        @param maps: datamaps returned by the plugins
+        @type maps: list
+        @return: (maps, AppliedMaps or None)
+        @rtype: tuple
+        """
+        previous = self.appliedMaps.pop(device.id, None)
+        interval = self.options.fullApplyInterval * 3600
+        if self.single or interval <= 0:
+            return maps, None
+        byPlugin = collections.defaultdict(list)
+        for m in maps:
+            byPlugin[getattr(m, PLUGIN_NAME_ATTR, None)].append(m)
+        try:
+            fingerprints = dict(
+                (name, fingerprint(pluginMaps))
+                for name, pluginMaps in byPlugin.iteritems()
+            )
+        except Exception:
+            self.log.exception(
+                "Unable to fingerprint the datamaps of %s", device.id
+            )
+            return maps, None
+        lastChange = getattr(device, "lastChange", None)
+        now = time.time()
+        if (
+            previous is None
+            or previous.lastChange != lastChange
+            or now - previous.fullApplyTime >= interval
+        ):
+            return maps, AppliedMaps(lastChange, now, fingerprints)
+        changed = set(
+            name
+            for name, value in fingerprints.iteritems()
+            if previous.fingerprints.get(name) != value
+        )
+        previous.fingerprints.update(fingerprints)
+        return (
+            [m for m in maps if getattr(m, PLUGIN_NAME_ATTR, None) in changed],
+            previous,
+        )
+
     def clientFinished(self, collectorClient):
         """
         Callback that processes the return values from a device.
@@ -795,18 +867,32 @@ class ZenModeler(PBDaemon):
                     deviceClass = Classifier.classifyDevice(
                         pluginStats, self.classCollectorPlugins
                     )
-                    # If self.single is True, then call singleApplyDataMaps
-                    # instead of applyDataMaps.
-                    if not self.single:
-                        method = "applyDataMaps"
-                    else:
-                        method = "singleApplyDataMaps"
-                    yield self.config().callRemote(
-                        method, device.id, maps, deviceClass, True
-                    )
+                    maps, applied = self.selectChangedMaps(device, maps)
+                    if maps or deviceClass:
+                        # If self.single is True, then call
+                        # singleApplyDataMaps instead of applyDataMaps.
+                        if not self.single:
+                            method = "applyDataMaps"
+                        else:
+                            method = "singleApplyDataMaps"
+                        yield self.config().callRemote(
+                            method, device.id, maps, deviceClass, True
+                        )
 
-                    if driver.next():
-                        devchanged = True
+                        if driver.next():
+                            devchanged = True
+                    else:
+                        self.log.debug(
+                            "No datamaps changed since they were last "
+                            "applied to %s",
+                            device.id,
+                        )
+                        yield self.config().callRemote(
+                            "setSnmpLastCollection", device.id
+                        )
+                        driver.next()
+                    if applied is not None:
+                        self.appliedMaps[device.id] = applied
                 if devchanged:
                     self.log.info("Changes in configuration applied")
                 else:
@@ -1168,6 +1254,15 @@ class ZenModeler(PBDaemon):
             help="Do not collect from devices whose collect date "
             + "is within this many minutes",
         )
+        self.parser.add_option(
+            "--fullapplyinterval",
+            dest="fullApplyInterval",
+            default=24,
+            type="float",
+            help="Send the datamaps of plugins whose results did not change "
+            "since they were last applied at least every this many hours; "
+            "0 always sends them",
+        )
         self.parser.add_option(
             "--writetries",
             dest="writetries",
@@ -1405,25 +1500,26 @@ class ZenModeler(PBDaemon):
 
     def remote_deleteDevice(self, device):
         """
-        Stub function
+        Forget the datamaps applied to a deleted device
 
-        @param device: device name (unused)
+        @param device: device name
         @type device: string
-        @todo: implement
         """
         # we fetch the device list before every scan
         self.log.debug("Asynch deleteDevice %s", device)
+        self.appliedMaps.pop(device, None)
 
     def remote_deleteDevices(self, devices):
         """
-        Stub function
+        Forget the datamaps applied to deleted devices
 
-        @param devices: device ids (unused)
+        @param devices: device ids
         @type device: set
-        @todo: implement
         """
         # we fetch the device list before every scan
         self.log.debug("Asynch deleteDevices %s", len(devices))
+        for device in devices:
+            self.appliedMaps.pop(device, None)
 
 
 if __name__ == "__main__":
@@ -7,21 +7,49 @@
 #
 ##############################################################################
 
+import glob
+import logging
 import os
 
 from Products.ZenUtils.FileCache import FileCache
+from Products.ZenUtils.logfilecache import LogFileCache
+
+log = logging.getLogger("zen.collector.configcache")
+
+# The name of the file holding the configs of a monitor
+CACHE_FILE = "configs.cache"
 
 
 class DeviceConfigCache(object):
     def __init__(self, basepath):
         self.basepath = basepath
+        self._caches = {}
 
     def _getFileCache(self, monitor):
-        return FileCache(os.path.join(self.basepath, monitor))
+        cache = self._caches.get(monitor)
+        if cache is None:
+            path = os.path.join(self.basepath, monitor)
+            cache = LogFileCache(os.path.join(path, CACHE_FILE))
+            self._importFileCache(path, cache)
+            self._caches[monitor] = cache
+        return cache
+
+    def _importFileCache(self, path, cache):
+        """
+        Move the configs cached by earlier versions, one pickle file per
+        device, into the cache.
+        """
+        if not glob.glob(os.path.join(path, "*.pickle")):
+            return
+        oldCache = FileCache(path)
+        configs = oldCache.items()
+        cache.update(configs)
+        oldCache.clear()
+        log.info("Moved %d cached configs into %s", len(configs), cache.path)
 
     def cacheConfigProxies(self, prefs, configs):
-        for cfg in configs:
-            self.updateConfigProxy(prefs, cfg)
+        cache = self._getFileCache(prefs.options.monitor)
+        cache.update((cfg.configId, cfg) for cfg in configs)
 
     def updateConfigProxy(self, prefs, config):
         cache = self._getFileCache(prefs.options.monitor)
@@ -41,10 +69,9 @@ class DeviceConfigCache(object):
         if cfgids:
             ret = []
             for cfgid in cfgids:
-                if cfgid in cache:
-                    config = cache[cfgid]
-                    if config:
-                        ret.append(config)
+                config = cache.get(cfgid, None)
+                if config:
+                    ret.append(config)
             return ret
         else:
             return filter(None, cache.values())
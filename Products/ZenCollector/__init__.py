@@ -89,6 +89,9 @@ class CoreCollectorFrameworkFactory(object):
     def __init__(self):
         self._configProxy = ConfigurationProxy()
         self._scheduler = None
+        # May be replaced, e.g. by TimerWheelScheduler, before the
+        # scheduler is first requested.
+        self.schedulerClass = Scheduler
         self._configurationLoader = ConfigurationLoaderTask
 
     def getConfigurationProxy(self):
@@ -96,7 +99,7 @@ class CoreCollectorFrameworkFactory(object):
 
     def getScheduler(self):
         if self._scheduler is None:
-            self._scheduler = Scheduler()
+            self._scheduler = self.schedulerClass()
         return self._scheduler
 
     def getConfigurationLoaderTask(self):
@@ -0,0 +1,93 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Compare how fast device configs are cached and loaded from disk.
+
+    python -m Products.ZenCollector.configcache_benchmark [-n DEVICES]
+
+DEVICES configs are written, loaded and looked up by id, once in a
+FileCache, with one pickle file per device, and once in a LogFileCache,
+with every config in one file.  Each load uses a new cache object, as a
+collector starting up does, but the files may still be in the page cache.
+"""
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+
+from Products.ZenUtils.FileCache import FileCache
+from Products.ZenUtils.logfilecache import LogFileCache
+
+
+class SampleConfig(object):
+    """Stands in for a DeviceProxy."""
+
+    def __init__(self, configId, size):
+        self.configId = configId
+        self.id = configId
+        self.manageIp = "10.%d.%d.%d" % (
+            hash(configId) % 256, len(configId), size % 256)
+        self.cycleInterval = 300
+        self.thresholds = []
+        self.datapoints = [
+            ("%s/component%d/dp%d" % (configId, i // 5, i), "GAUGE", None)
+            for i in xrange(size)
+        ]
+
+
+def _timed(name, function):
+    start = time.time()
+    result = function()
+    print("%-34s %8.2f seconds" % (name, time.time() - start))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--devices", type=int, default=30000)
+    parser.add_argument("-d", "--datapoints", type=int, default=20)
+    parser.add_argument("-l", "--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    configs = [
+        SampleConfig("device%06d" % i, args.datapoints)
+        for i in xrange(args.devices)
+    ]
+    ids = random.Random(0).sample(
+        [c.configId for c in configs], min(args.lookups, len(configs))
+    )
+    directory = tempfile.mkdtemp()
+    try:
+        fileCache = FileCache(directory + "/files")
+
+        def writeFiles():
+            for config in configs:
+                fileCache[config.configId] = config
+
+        _timed("FileCache write", writeFiles)
+        _timed("FileCache load all",
+               lambda: FileCache(directory + "/files").values())
+        _timed("FileCache load %d by id" % len(ids),
+               lambda: map(FileCache(directory + "/files").get, ids))
+
+        path = directory + "/log/configs.cache"
+        _timed("LogFileCache write (one update)",
+               lambda: LogFileCache(path).update(
+                   (c.configId, c) for c in configs))
+        _timed("LogFileCache load all", lambda: LogFileCache(path).values())
+        _timed("LogFileCache load %d by id" % len(ids),
+               lambda: map(LogFileCache(path).get, ids))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,7 @@ from .interfaces import (
     IStatisticsService,
     ITaskSplitter,
 )
+from .scheduler import TimerWheelScheduler
 from .utils.maintenance import MaintenanceCycle
 
 log = logging.getLogger("zen.daemon")
@@ -310,6 +311,8 @@ class CollectorDaemon(RRDDaemon):
             IFrameworkFactory, self._frameworkFactoryName
         )
         self._configProxy = frameworkFactory.getConfigurationProxy()
+        if getattr(self.options, "timerWheelScheduler", False):
+            frameworkFactory.schedulerClass = TimerWheelScheduler
         self._scheduler = frameworkFactory.getScheduler()
         self._scheduler.maxTasks = self.options.maxTasks
         self._ConfigurationLoaderTask = (
@@ -362,6 +365,15 @@ class CollectorDaemon(RRDDaemon):
             help="How often to logs statistics of current tasks, "
             "value in seconds; very verbose",
         )
+        self.parser.add_option(
+            "--timer-wheel-scheduler",
+            dest="timerWheelScheduler",
+            action="store_true",
+            default=False,
+            help="Schedule tasks on a timer wheel rather than with one "
+            "looping call per task; suited to collectors running a very "
+            "large number of tasks",
+        )
         addWorkerOptions(self.parser)
         self.parser.add_option(
             "--traceMetricName",
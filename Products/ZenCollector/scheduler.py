@@ -500,14 +500,30 @@ class Scheduler(object):
             newTask.interval,
         )
         callableTask = self._callableTaskFactory.getCallableTask(newTask, self)
-        loopingCall = task.LoopingCall(callableTask)
-        self._loopingCalls[newTask.name] = loopingCall
+        self._loopingCalls[newTask.name] = self._createLoop(callableTask)
         self._tasks[newTask.name] = callableTask
         self._taskCallback[newTask.name] = callback
         self.taskAdded(callableTask)
         startDelay = getattr(newTask, "startDelay", None)
         if startDelay is None:
             startDelay = 0 if now else self._getStartDelay(newTask)
+        self._scheduleStart(newTask, startDelay)
+
+        # just in case someone does not implement scheduled, lets be careful
+        scheduled = getattr(newTask, "scheduled", lambda x: None)
+        scheduled(self)
+
+    def _createLoop(self, callableTask):
+        """
+        Return the object that runs callableTask on its interval.  It must
+        provide the running, interval and stop members of a LoopingCall.
+        """
+        return task.LoopingCall(callableTask)
+
+    def _scheduleStart(self, newTask, startDelay):
+        """
+        Start running newTask on its interval after startDelay seconds.
+        """
         d = defer.Deferred()
         d.addCallback(
             self._startTask,
@@ -518,10 +534,6 @@ class Scheduler(object):
         )
         reactor.callLater(startDelay, d.callback, None)
 
-        # just in case someone does not implement scheduled, lets be careful
-        scheduled = getattr(newTask, "scheduled", lambda x: None)
-        scheduled(self)
-
     def _getStartDelay(self, task):
         """
         amount of time to delay the start of a task. Prevents bunching up of
@@ -924,3 +936,203 @@ class Scheduler(object):
         taskStats.totalRuns = 0
         taskStats.failedRuns = 0
         taskStats.missedRuns = 0
+
+
+# Fractional part of the golden ratio; successive multiples of it modulo 1
+# are spread evenly over [0, 1) no matter how many are taken.
+_GOLDEN_RATIO_FRACTION = (math.sqrt(5) - 1) / 2
+
+
+class _WheelEntry(object):
+    """
+    The timer wheel's counterpart of a task's LoopingCall.
+    """
+
+    __slots__ = (
+        "name",
+        "configId",
+        "call",
+        "interval",
+        "running",
+        "due",
+        "slot",
+        "delayed",
+        "attempts",
+        "_scheduler",
+        "_expectNextCallAt",
+    )
+
+    def __init__(self, scheduler, name, configId, call, interval):
+        self._scheduler = scheduler
+        self.name = name
+        self.configId = configId
+        self.call = call
+        self.interval = interval
+        self.running = False
+        self.due = None
+        self.slot = None
+        self.delayed = 0
+        self.attempts = 0
+        self._expectNextCallAt = None
+
+    def __repr__(self):
+        return "<_WheelEntry %s due at tick %s>" % (self.name, self.due)
+
+    def stop(self):
+        self.running = False
+        self._scheduler._unschedule(self)
+
+
+class TimerWheelScheduler(Scheduler):
+    """
+    An interval-based scheduler that keeps its tasks in a hashed timer wheel
+    driven by a single LoopingCall, rather than giving every task its own
+    LoopingCall and reactor delayed call.
+
+    The wheel has WHEEL_SLOTS slots, each TICK seconds wide; a task due at
+    tick N is kept in slot N % WHEEL_SLOTS.  Adding and removing a task are
+    O(1), and every task that is due is run in one batch per tick.  Task
+    start times are spread evenly over the first half of their interval
+    instead of at random.
+    """
+
+    TICK = 1.0  # seconds
+    WHEEL_SLOTS = 512
+
+    def __init__(self, callableTaskFactory=CallableTaskFactory(), clock=None):
+        super(TimerWheelScheduler, self).__init__(callableTaskFactory)
+        self._clock = clock if clock is not None else reactor
+        self._wheel = [set() for _ in xrange(self.WHEEL_SLOTS)]
+        self._starts = 0
+        # the next tick to be processed
+        self._tick = self._currentTick()
+        self._wheelTask = task.LoopingCall(self._advance)
+        self._wheelTask.clock = self._clock
+        self._wheelTask.start(self.TICK, now=False)
+
+    def _currentTick(self):
+        return int(self._clock.seconds() / self.TICK)
+
+    def _ticks(self, seconds):
+        return int(math.ceil(seconds / self.TICK))
+
+    def _schedule(self, entry, due):
+        # A slot is not looked at again until the wheel comes back around,
+        # so never schedule into a tick that has already been processed.
+        entry.due = max(due, self._tick)
+        entry.slot = self._wheel[entry.due % self.WHEEL_SLOTS]
+        entry.slot.add(entry)
+
+    def _unschedule(self, entry):
+        if entry.slot is not None:
+            entry.slot.discard(entry)
+            entry.slot = None
+
+    def _createLoop(self, callableTask):
+        return _WheelEntry(
+            self,
+            callableTask.task.name,
+            callableTask.task.configId,
+            callableTask,
+            callableTask.task.interval,
+        )
+
+    def _scheduleStart(self, newTask, startDelay):
+        entry = self._loopingCalls[newTask.name]
+        entry.delayed = startDelay
+        self._schedule(entry, self._currentTick() + self._ticks(startDelay))
+
+    def _getStartDelay(self, task):
+        """
+        Spread the start of tasks evenly over the first half of their
+        interval.
+        """
+        self._starts += 1
+        fraction = (self._starts * _GOLDEN_RATIO_FRACTION) % 1.0
+        return int(fraction * task.interval / 2.0)
+
+    def _advance(self):
+        """
+        Run every task that has come due since the previous tick.
+        """
+        now = self._currentTick()
+        if now < self._tick:
+            return
+        # After a stall longer than a full revolution, each slot only
+        # needs to be looked at once.
+        ticks = min(now - self._tick + 1, self.WHEEL_SLOTS)
+        ready = []
+        for tick in xrange(self._tick, self._tick + ticks):
+            slot = self._wheel[tick % self.WHEEL_SLOTS]
+            due = [entry for entry in slot if entry.due <= now]
+            if due:
+                slot.difference_update(due)
+                ready.extend(due)
+        self._tick = now + 1
+
+        if ready:
+            log.debug("Timer wheel tick %d: %d tasks due", now, len(ready))
+        ready.sort(key=lambda entry: entry.due)
+        for entry in ready:
+            entry.slot = None
+            if self._loopingCalls.get(entry.name) is not entry:
+                # removed before it was started
+                continue
+            if entry.running:
+                self._fire(entry, now)
+            else:
+                self._startEntry(entry, now)
+
+    def _fire(self, entry, now):
+        try:
+            entry.call()
+        except Exception:
+            log.exception(
+                "Failure in timer wheel call, will not reschedule %s",
+                entry.name,
+            )
+            entry.running = False
+            return
+        if not entry.running or entry.slot is not None:
+            # stopped or rescheduled by the call itself
+            return
+        interval = max(1, self._ticks(entry.interval))
+        due = entry.due + interval
+        if due <= now:
+            # Like LoopingCall, skip the runs that were missed entirely.
+            due += ((now - due) // interval + 1) * interval
+        self._schedule(entry, due)
+
+    def _startEntry(self, entry, now):
+        """
+        The timer wheel version of Scheduler._startTask.
+        """
+        if self._tasksToCleanup.has_key(entry.configId):  # noqa W601
+            delay = self._getStartDelay(entry)
+            entry.delayed += delay
+            if entry.attempts > Scheduler.ATTEMPTS:
+                obj = self._tasksToCleanup.pop_by_key(entry.configId)
+                log.debug(
+                    "Forced cleanup of %s. Task: %s", entry.configId, obj.name
+                )
+                entry.attempts = 0
+            entry.attempts += 1
+            log.debug(
+                "Waiting for cleanup of %s. Task %s postponing its "
+                "start %d seconds (%d so far). Attempt: %s",
+                entry.configId,
+                entry.name,
+                delay,
+                entry.delayed,
+                entry.attempts,
+            )
+            self._schedule(entry, now + max(1, self._ticks(delay)))
+            return
+        log.debug(
+            "Task %s starting (waited %d seconds) on %d second intervals",
+            entry.name,
+            entry.delayed,
+            entry.interval,
+        )
+        entry.running = True
+        self._fire(entry, now)
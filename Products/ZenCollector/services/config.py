@@ -12,9 +12,12 @@ import hashlib
 import logging
 import traceback
 
+from time import time
+
 from Acquisition import aq_parent
 from cryptography.fernet import Fernet
-from twisted.internet import defer
+from metrology import Metrology
+from twisted.internet import defer, task
 from twisted.spread import pb
 from ZODB.transact import transact
 from zope import component
@@ -37,6 +40,7 @@ from Products.ZenUtils.picklezipper import Zipper
 from Products.Zuul.utils import safe_hasattr as hasattr
 
 from ..interfaces import IConfigurationDispatchingFilter
+from .configcache import DeviceProxyCache
 
 
 class DeviceProxy(pb.Copyable, pb.RemoteCopy):
@@ -78,6 +82,15 @@ BASE_ATTRIBUTES = (
 class CollectorConfigService(HubService, ThresholdMixin):
     """Base class for ZenHub configuration service classes."""
 
+    # Set to True to cache device proxies between requests.  Cached proxies
+    # are invalidated when their device is passed to _notifyAll, so only
+    # services whose proxies depend on nothing else should enable this.
+    cacheDeviceConfigs = False
+
+    # The most devices whose configs are pushed to the collectors in one
+    # batch after they changed; 1 pushes each device's config separately.
+    pushBatchSize = 100
+
     def __init__(self, dmd, instance, deviceProxyAttributes=()):
         """
         Initializes a CollectorConfigService instance.
@@ -99,11 +112,47 @@ class CollectorConfigService(HubService, ThresholdMixin):
 
         # When about to notify daemons about device changes, wait for a little
         # bit to batch up operations.
-        self._procrastinator = Procrastinate(self._pushConfig)
+        self._procrastinator = Procrastinate(
+            self._pushConfig,
+            batchCallback=self._pushConfigs if self._pushBatches() else None,
+            batchSize=self.pushBatchSize,
+        )
         self._reconfigProcrastinator = Procrastinate(self._pushReconfigure)
 
         self._notifier = component.getUtility(IBatchNotifier)
 
+        self._deviceProxyCache = None
+        if self.cacheDeviceConfigs:
+            cache = DeviceProxyCache(
+                "%s.%s" % (self.__module__, self.name()), self.instance
+            )
+            if cache.enabled:
+                self._deviceProxyCache = cache
+        self._proxyCacheHits = Metrology.meter("zenhub.deviceConfigCacheHits")
+        self._proxyRebuilds = Metrology.meter("zenhub.deviceConfigRebuilds")
+        self._proxyRebuildTimer = Metrology.timer(
+            "zenhub.deviceConfigRebuildTime"
+        )
+        self._pushBatchSizes = Metrology.histogram(
+            "zenhub.deviceConfigPushBatchSize"
+        )
+        self._pushedConfigs = Metrology.meter("zenhub.deviceConfigsPushed")
+
+    def _pushBatches(self):
+        """
+        Return whether changed devices are pushed in batches by
+        _pushConfigs.  Services that customize how the config of a single
+        device is pushed keep pushing each device separately.
+        """
+        if self.pushBatchSize <= 1:
+            return False
+        cls = type(self)
+        return all(
+            getattr(cls, name).im_func
+            is getattr(CollectorConfigService, name).im_func
+            for name in ("_pushConfig", "_sendDeviceProxy")
+        )
+
     def _wrapFunction(self, functor, *args, **kwargs):
         """
         Call the functor using the arguments,
@@ -141,6 +190,7 @@ class CollectorConfigService(HubService, ThresholdMixin):
     def perfConfUpdated(self, conf, event):
         with gc_cache_every(1000, db=self.dmd._p_jar._db):
             if conf.id == self.instance:
+                self._invalidateDeviceProxies()
                 for listener in self.listeners:
                     listener.callRemote(
                         "setPropertyItems", conf.propertyItems()
@@ -149,6 +199,7 @@ class CollectorConfigService(HubService, ThresholdMixin):
     @onUpdate(ZenPack)
     def zenPackUpdated(self, zenpack, event):
         with gc_cache_every(1000, db=self.dmd._p_jar._db):
+            self._invalidateDeviceProxies()
             for listener in self.listeners:
                 try:
                     listener.callRemote(
@@ -202,6 +253,7 @@ class CollectorConfigService(HubService, ThresholdMixin):
     def deviceDeleted(self, device, event):
         with gc_cache_every(1000, db=self.dmd._p_jar._db):
             devid = device.id
+            self._invalidateDeviceProxies(devid)
             collector = device.getPerformanceServer().getId()
             # The invalidation is only sent to the collector where the
             # deleted device was.
@@ -255,8 +307,7 @@ class CollectorConfigService(HubService, ThresholdMixin):
         devices = self._filterDevices(devices)
 
         deviceConfigs = []
-        for device in devices:
-            proxies = self._wrapFunction(self._createDeviceProxies, device)
+        for proxies in self._getDeviceProxies(devices):
             if proxies:
                 deviceConfigs.extend(proxies)
 
@@ -288,6 +339,60 @@ class CollectorConfigService(HubService, ThresholdMixin):
         s.update(self.name())
         return base64.urlsafe_b64encode(s.digest())
 
+    def _getDeviceProxies(self, devices):
+        """
+        Return a list of the proxies of each device, taken from the device
+        proxy cache where possible and built and cached otherwise.
+
+        The generations are read before the proxies are built, so a change
+        whose generation zenhub changes in between only causes a miss.
+        """
+        cache = self._deviceProxyCache
+        if cache is None:
+            return [self._buildDeviceProxies(device) for device in devices]
+
+        generations = cache.generations(device.id for device in devices)
+        cached = cache.getMulti(generations)
+        self._proxyCacheHits.mark(len(cached))
+
+        start = time()
+        result = []
+        for device in devices:
+            proxies = cached.get(device.id)
+            if proxies is None:
+                proxies = self._buildDeviceProxies(
+                    device, generations[device.id]
+                )
+            result.append(proxies)
+        self.log.debug(
+            "Served %s device configs from cache, rebuilt %s in %.2f seconds",
+            len(cached),
+            len(devices) - len(cached),
+            time() - start,
+        )
+        return result
+
+    def _buildDeviceProxies(self, device, generation=None):
+        """
+        Create the device's proxies, caching them for the given generation
+        of the device if one is given.  Returns None on failure.
+        """
+        start = time()
+        proxies = self._wrapFunction(self._createDeviceProxies, device)
+        self._proxyRebuildTimer.update(time() - start)
+        self._proxyRebuilds.mark()
+        if proxies is not None and generation is not None:
+            self._deviceProxyCache.set(device.id, generation, proxies)
+        return proxies
+
+    def _invalidateDeviceProxies(self, deviceId=None):
+        """
+        Invalidate the cached proxies of the device, or of all devices if
+        deviceId is None.
+        """
+        if self._deviceProxyCache is not None:
+            self._deviceProxyCache.invalidate(deviceId)
+
     def _postCreateDeviceProxy(self, deviceConfigs):
         pass
 
@@ -403,56 +508,61 @@ class CollectorConfigService(HubService, ThresholdMixin):
 
     def _notifyAll(self, device):
         """Notify all instances (daemons) of a change for the device."""
+        self._invalidateDeviceProxies(device.id)
         # procrastinator schedules a call to _pushConfig
         self._procrastinator.doLater(device)
 
+    def _deleteFromCollector(self, device):
+        """
+        Return whether the collector must be told to delete a device
+        without proxies.  The invalidation is only sent to the previous
+        and current collectors of the device.
+        """
+        if not hasattr(device, "getPerformanceServer"):
+            return True
+        prev_collector = (
+            device.dmd.Monitors.primaryAq().getPreviousCollectorForDevice(
+                device.id
+            )
+        )
+        return self.instance in (
+            prev_collector,
+            device.getPerformanceServer().getId(),
+        )
+
     def _pushConfig(self, device):
         """Push device config and deletes to relevent collectors/instances."""
         deferreds = []
 
         if self._perfIdFilter(device) and self._filterDevice(device):
-            proxies = self._wrapFunction(self._createDeviceProxies, device)
+            # Cache the new proxies for the next getDeviceConfigs call.
+            generation = None
+            if self._deviceProxyCache is not None:
+                generation = self._deviceProxyCache.generations(
+                    [device.id]
+                )[device.id]
+            proxies = self._buildDeviceProxies(device, generation)
             if proxies:
                 self._wrapFunction(self._postCreateDeviceProxy, proxies)
         else:
             proxies = None
+        deleted = not proxies and self._deleteFromCollector(device)
 
-        prev_collector = (
-            device.dmd.Monitors.primaryAq().getPreviousCollectorForDevice(
-                device.id
-            )
-        )
         for listener in self.listeners:
             if not proxies:
-                if hasattr(device, "getPerformanceServer"):
-                    # The invalidation is only sent to the previous and
-                    # current collectors.
-                    if self.instance in (
-                        prev_collector,
-                        device.getPerformanceServer().getId(),
-                    ):
-                        self.log.debug(
-                            "Invalidation: Performing remote call for "
-                            "device %s on collector %s",
-                            device.id,
-                            self.instance,
-                        )
-                        deferreds.append(
-                            listener.callRemote("deleteDevice", device.id)
-                        )
-                    else:
-                        self.log.debug(
-                            "Invalidation: Skipping remote call for "
-                            "device %s on collector %s",
-                            device.id,
-                            self.instance,
-                        )
-                else:
+                if deleted:
+                    self.log.debug(
+                        "Invalidation: Performing remote call for "
+                        "device %s on collector %s",
+                        device.id,
+                        self.instance,
+                    )
                     deferreds.append(
                         listener.callRemote("deleteDevice", device.id)
                     )
+                else:
                     self.log.debug(
-                        "Invalidation: Performing remote call for "
+                        "Invalidation: Skipping remote call for "
                         "device %s on collector %s",
                         device.id,
                         self.instance,
@@ -466,8 +576,79 @@ class CollectorConfigService(HubService, ThresholdMixin):
                             self._sendDeviceProxy(listener, proxy)
                         )
 
+        self._pushBatchSizes.update(1)
+        self._pushedConfigs.mark()
         return defer.DeferredList(deferreds)
 
+    @defer.inlineCallbacks
+    def _pushConfigs(self, devices):
+        """
+        Push the configs and deletes of many devices to the collectors,
+        with one updateDeviceConfigs and one deleteDevices call per
+        listener.  The proxies are built cooperatively, so the reactor
+        keeps serving other requests while a batch is being built.
+        """
+        included = [
+            device
+            for device in devices
+            if self._perfIdFilter(device) and self._filterDevice(device)
+        ]
+        # Cache the new proxies for the next getDeviceConfigs call.
+        includedIds = [device.id for device in included]
+        generations = {}
+        if self._deviceProxyCache is not None and included:
+            generations = self._deviceProxyCache.generations(includedIds)
+        includedIds = set(includedIds)
+        configs = []
+        deletes = []
+
+        def build():
+            for device in devices:
+                proxies = None
+                if device.id in includedIds:
+                    proxies = self._buildDeviceProxies(
+                        device, generations.get(device.id)
+                    )
+                if proxies:
+                    configs.extend(proxies)
+                elif self._deleteFromCollector(device):
+                    deletes.append(device.id)
+                yield
+
+        yield task.cooperate(build()).whenDone()
+        if configs:
+            self._wrapFunction(self._postCreateDeviceProxy, configs)
+        self.log.debug(
+            "Pushing %s device configs and %s deletes to collector %s",
+            len(configs),
+            len(deletes),
+            self.instance,
+        )
+
+        zippedDeletes = Zipper.dump(deletes) if deletes else None
+        for listener in self.listeners:
+            options = self.listenerOptions.get(listener, None)
+            deviceFilter = self._getOptionsFilter(options)
+            filteredConfigs = filter(deviceFilter, configs)
+            if filteredConfigs:
+                listener.callRemote(
+                    "updateDeviceConfigs", Zipper.dump(filteredConfigs)
+                ).addErrback(self._pushFailed, listener)
+            if zippedDeletes:
+                listener.callRemote(
+                    "deleteDevices", zippedDeletes
+                ).addErrback(self._pushFailed, listener)
+
+        self._pushBatchSizes.update(len(devices))
+        self._pushedConfigs.mark(len(devices))
+
+    def _pushFailed(self, failure, listener):
+        self.log.error(
+            "Unable to push device configs to %s: %s",
+            listener,
+            failure.getErrorMessage(),
+        )
+
     def _sendDeviceProxy(self, listener, proxy):
         return listener.callRemote("updateDeviceConfig", proxy)
 
@@ -520,6 +701,7 @@ class CollectorConfigService(HubService, ThresholdMixin):
             ncc,
         )
         if ncc:
+            self._invalidateDeviceProxies()
             self.log.debug("scheduling collector reconfigure")
             self._reconfigProcrastinator.doLater(True)
 
@@ -0,0 +1,158 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+import cPickle as pickle
+import hashlib
+import logging
+
+from uuid import uuid4
+
+from zope.component import adapter
+
+from Products.ZenHub.interfaces import IHubCreatedEvent
+from Products.ZenUtils.FunctionCache import FunctionCache
+
+log = logging.getLogger("zen.collector.configcache")
+
+# Cached configs expire after this many seconds unless global.conf has an
+# 'applicationcache_deviceconfigs' setting.
+DEFAULT_TIMEOUT = 3600
+
+# Invalidates every cached config, of every service, when changed.
+EPOCH_KEY = "DPC|epoch"
+
+
+class DeviceProxyCache(object):
+    """
+    Cache of serialized device proxies shared by zenhub and the zenhub
+    workers through the application cache (memcached), keyed by
+    (service, monitor, device).
+
+    Entries are not deleted when a device changes; instead the device is
+    given a new, unique generation token so that later lookups miss.  A
+    generation for the whole (service, monitor) pair invalidates every
+    device at once.  Since tokens are never reused, a generation evicted
+    from the cache can't make an old entry valid again.
+
+    The cache is disabled if no application cache servers are configured.
+    """
+
+    def __init__(self, service, monitor, client=None, timeout=None):
+        if client is None:
+            client, timeout = FunctionCache(
+                "deviceconfigs", default_timeout=DEFAULT_TIMEOUT
+            ).getCacheClient()
+        self._mc = client
+        self._setArgs = [timeout] if timeout else []
+        self._namespace = (service, monitor)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self._mc is not None
+
+    def _key(self, *parts):
+        return "DPC|%s" % hashlib.sha1(
+            repr(self._namespace + parts)
+        ).hexdigest()
+
+    def _generationKey(self, deviceId=None):
+        if deviceId is None:
+            return self._key("generation")
+        return self._key("generation", deviceId)
+
+    def generations(self, deviceIds):
+        """
+        Return a dict mapping each device id to its current generation.
+        Read the generations before reading the database the proxies are
+        built from; an update that lands in between then only causes a
+        needless miss, never a stale hit.
+        """
+        keys = dict(
+            (self._generationKey(deviceId), deviceId)
+            for deviceId in deviceIds
+        )
+        serviceKey = self._generationKey()
+        allKeys = keys.keys() + [serviceKey, EPOCH_KEY]
+        values = self._mc.get_multi(allKeys)
+        missing = [key for key in allKeys if values.get(key) is None]
+        if missing:
+            # Send the adds without waiting for each reply; whoever added
+            # a generation first wins, so read back the stored ones.
+            for key in missing:
+                self._mc.add(key, uuid4().hex, noreply=True)
+            values.update(self._mc.get_multi(missing))
+        serviceGeneration = (
+            self._generation(EPOCH_KEY, values),
+            self._generation(serviceKey, values),
+        )
+        return dict(
+            (deviceId, serviceGeneration + (self._generation(key, values),))
+            for key, deviceId in keys.iteritems()
+        )
+
+    def _generation(self, key, values):
+        # A generation that could not be stored only causes misses.
+        return values.get(key) or uuid4().hex
+
+    def getMulti(self, generations):
+        """
+        Return a dict mapping device ids to their cached tuple of proxies,
+        for those of the given {device id: generation} that are cached.
+        """
+        keys = dict(
+            (self._key("proxies", deviceId, generation), deviceId)
+            for deviceId, generation in generations.iteritems()
+        )
+        result = {}
+        for key, data in self._mc.get_multi(keys.keys()).iteritems():
+            try:
+                result[keys[key]] = pickle.loads(data)
+            except Exception:
+                log.debug("Discarding unreadable config for %s", keys[key])
+        self.hits += len(result)
+        self.misses += len(keys) - len(result)
+        return result
+
+    def set(self, deviceId, generation, proxies):
+        """Cache the proxies built for the device at the given generation."""
+        try:
+            data = pickle.dumps(tuple(proxies), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            log.debug("Configs for %s cannot be cached", deviceId)
+            return
+        key = self._key("proxies", deviceId, generation)
+        if not self._mc.set(key, data, *self._setArgs):
+            # Most likely larger than the cache's maximum item size.
+            log.debug("Failed to cache configs for %s", deviceId)
+
+    def invalidate(self, deviceId=None):
+        """
+        Invalidate the cached configs of the device, or of every device
+        if deviceId is None.
+        """
+        if not self._mc.set(self._generationKey(deviceId), uuid4().hex):
+            log.warning("Unable to invalidate cached configs")
+
+    def invalidateAll(self):
+        """Invalidate the cached configs of every service and monitor."""
+        if not self._mc.set(EPOCH_KEY, uuid4().hex):
+            log.warning("Unable to invalidate cached configs")
+
+
+@adapter(IHubCreatedEvent)
+def invalidateOnHubCreated(event):
+    """
+    Devices may have changed while zenhub, which handles the invalidations,
+    wasn't running; start over with an empty cache.
+    """
+    cache = DeviceProxyCache(None, None)
+    if cache.enabled:
+        cache.invalidateAll()
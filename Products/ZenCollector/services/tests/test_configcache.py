@@ -0,0 +1,92 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+
+from Products.ZenCollector.services.configcache import DeviceProxyCache
+
+
+class FakeClient(object):
+    """The subset of memcache.Client used by DeviceProxyCache."""
+
+    def __init__(self):
+        self.data = {}
+        self.get_multi_calls = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def get_multi(self, keys):
+        self.get_multi_calls += 1
+        return dict((k, self.data[k]) for k in keys if k in self.data)
+
+    def set(self, key, value, time=0):
+        self.data[key] = value
+        return True
+
+    def add(self, key, value, time=0, noreply=False):
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+
+class DeviceProxyCacheTest(TestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.cache = DeviceProxyCache("Svc", "localhost", client=self.client)
+
+    def _roundtrip(self, deviceIds):
+        return self.cache.getMulti(self.cache.generations(deviceIds))
+
+    def test_set_and_get(self):
+        generations = self.cache.generations(["dev1", "dev2"])
+        self.cache.set("dev1", generations["dev1"], [{"id": "dev1"}])
+        self.assertEqual(
+            self._roundtrip(["dev1", "dev2"]), {"dev1": ({"id": "dev1"},)}
+        )
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_invalidate_device(self):
+        generations = self.cache.generations(["dev1", "dev2"])
+        self.cache.set("dev1", generations["dev1"], ["a"])
+        self.cache.set("dev2", generations["dev2"], ["b"])
+        self.cache.invalidate("dev1")
+        self.assertEqual(self._roundtrip(["dev1", "dev2"]), {"dev2": ("b",)})
+
+    def test_invalidate_service(self):
+        generations = self.cache.generations(["dev1"])
+        self.cache.set("dev1", generations["dev1"], ["a"])
+        other = DeviceProxyCache("Svc", "other", client=self.client)
+        other.set("dev1", other.generations(["dev1"])["dev1"], ["b"])
+        self.cache.invalidate()
+        self.assertEqual(self._roundtrip(["dev1"]), {})
+        self.assertEqual(
+            other.getMulti(other.generations(["dev1"])), {"dev1": ("b",)}
+        )
+
+    def test_invalidate_all(self):
+        self.cache.set("dev1", self.cache.generations(["dev1"])["dev1"], [])
+        DeviceProxyCache(None, None, client=self.client).invalidateAll()
+        self.assertEqual(self._roundtrip(["dev1"]), {})
+
+    def test_evicted_generation_does_not_revive_entries(self):
+        generations = self.cache.generations(["dev1"])
+        self.cache.set("dev1", generations["dev1"], ["old"])
+        self.cache.invalidate("dev1")
+        del self.client.data[self.cache._generationKey("dev1")]
+        self.assertEqual(self._roundtrip(["dev1"]), {})
+
+    def test_cold_generations_are_batched(self):
+        generations = self.cache.generations(["dev%d" % i for i in range(50)])
+        self.assertEqual(self.client.get_multi_calls, 2)
+        self.assertEqual(self.cache.generations(["dev1"])["dev1"],
+                         generations["dev1"])
+        self.assertEqual(self.client.get_multi_calls, 3)
@@ -7,10 +7,19 @@
 #
 ##############################################################################
 
+from unittest import TestCase
+
 import zope.interface
 
+from twisted.internet import task
+
 from Products.ZenCollector.interfaces import IScheduledTask
-from Products.ZenCollector.scheduler import Scheduler
+from Products.ZenCollector.scheduler import (
+    CallableTask,
+    CallableTaskFactory,
+    Scheduler,
+    TimerWheelScheduler,
+)
 from Products.ZenTestCase.BaseTestCase import BaseTestCase
 from Products.ZenUtils.observable import ObservableMixin
 
@@ -104,9 +113,101 @@ class TestScheduler(BaseTestCase):
         self.assertFalse(myTask2.cleaned)
 
 
+class RecordingCallableTaskFactory(CallableTaskFactory):
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def getCallableTask(self, newTask, scheduler):
+        factory = self
+
+        class RecordingCallableTask(CallableTask):
+            def __call__(self):
+                factory.calls.append((self.task.name, factory.clock.seconds()))
+
+        return RecordingCallableTask(newTask, scheduler, scheduler.executor)
+
+
+def makeTask(name, configId=None, interval=60):
+    myTask = BasicTestTask()
+    myTask.name = name
+    myTask.configId = configId or name
+    myTask.interval = interval
+    return myTask
+
+
+class TestTimerWheelScheduler(TestCase):
+    def setUp(self):
+        self.clock = task.Clock()
+        self.factory = RecordingCallableTaskFactory(self.clock)
+        self.scheduler = TimerWheelScheduler(self.factory, clock=self.clock)
+
+    def testTaskRunsOnInterval(self):
+        # A task added at tick 0 runs when that tick is processed, and then
+        # every interval after it.
+        self.scheduler.addTask(makeTask("myTask1"), now=True)
+        self.clock.pump([1] * 150)
+        self.assertEqual(
+            [t for _, t in self.factory.calls], [1.0, 60.0, 120.0]
+        )
+
+    def testLateTickSkipsMissedRuns(self):
+        self.scheduler.addTask(makeTask("myTask1"), now=True)
+        self.clock.advance(1)
+        self.clock.advance(200)
+        self.clock.pump([1] * 40)
+        self.assertEqual(
+            [t for _, t in self.factory.calls], [1.0, 201.0, 240.0]
+        )
+
+    def testIntervalLongerThanWheel(self):
+        interval = TimerWheelScheduler.WHEEL_SLOTS * 2 + 10
+        myTask = makeTask("myTask1", interval=interval)
+        self.scheduler.addTask(myTask, now=True)
+        self.clock.pump([1] * (interval + 1))
+        self.assertEqual(
+            [t for _, t in self.factory.calls], [1.0, float(interval)]
+        )
+
+    def testRemovedTasksDoNotRun(self):
+        self.scheduler.addTask(makeTask("myTask1"), now=True)
+        self.scheduler.addTask(makeTask("myTask2"), now=True)
+        self.scheduler.removeTasksForConfig("myTask1")
+        self.clock.pump([1] * 2)
+        self.scheduler.removeTasksForConfig("myTask2")
+        self.clock.pump([1] * 120)
+        self.assertEqual(self.factory.calls, [("myTask2", 1.0)])
+        self.assertEqual(self.scheduler.taskCount, 0)
+
+    def testStartTimesAreSpreadEvenly(self):
+        delays = set(
+            self.scheduler._getStartDelay(makeTask("t%d" % i))
+            for i in range(100)
+        )
+        self.assertEqual(delays, set(range(30)))
+
+    def testStartWaitsForCleanup(self):
+        self.scheduler._tasksToCleanup.add(makeTask("old", "myDevice"))
+        self.scheduler.addTask(makeTask("new", "myDevice"), now=True)
+        self.clock.pump([1] * 10)
+        self.assertEqual(self.factory.calls, [])
+        self.scheduler._tasksToCleanup.pop_by_key("myDevice")
+        self.clock.pump([1] * 60)
+        self.assertEqual(len(self.factory.calls), 1)
+
+    def testMissedRuns(self):
+        scheduler = TimerWheelScheduler(clock=self.clock)
+        myTask = makeTask("myTask1")
+        myTask.state = "RUNNING"
+        scheduler.addTask(myTask, now=True)
+        self.clock.pump([1] * 61)
+        self.assertEqual(scheduler.missedRuns, 2)
+
+
 def test_suite():
     from unittest import TestSuite, makeSuite
 
     suite = TestSuite()
     suite.addTest(makeSuite(TestScheduler))
+    suite.addTest(makeSuite(TestTimerWheelScheduler))
     return suite
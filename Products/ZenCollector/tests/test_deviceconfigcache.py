@@ -0,0 +1,74 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from Products.ZenCollector.DeviceConfigCache import DeviceConfigCache
+from Products.ZenUtils.FileCache import FileCache
+
+
+class Config(object):
+
+    def __init__(self, configId):
+        self.configId = configId
+
+    def __eq__(self, other):
+        return self.configId == other.configId
+
+
+class Options(object):
+    monitor = "localhost"
+
+
+class Prefs(object):
+    options = Options()
+
+
+class DeviceConfigCacheTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.prefs = Prefs()
+
+    def test_configs(self):
+        cache = DeviceConfigCache(self.directory)
+        cache.cacheConfigProxies(self.prefs, [Config("a"), Config("b")])
+        cache.updateConfigProxy(self.prefs, Config("c"))
+        cache.deleteConfigProxy(self.prefs, "b")
+        cache.deleteConfigProxy(self.prefs, "missing")
+        cache = DeviceConfigCache(self.directory)
+        self.assertEqual(
+            sorted(c.configId for c in cache.getConfigProxies(self.prefs, [])),
+            ["a", "c"],
+        )
+        self.assertEqual(
+            cache.getConfigProxies(self.prefs, ["c", "b"]), [Config("c")]
+        )
+
+    def test_imports_file_cache(self):
+        path = os.path.join(self.directory, "localhost")
+        oldCache = FileCache(path)
+        oldCache["a"] = Config("a")
+        cache = DeviceConfigCache(self.directory)
+        self.assertEqual(
+            cache.getConfigProxies(self.prefs, ["a"]), [Config("a")]
+        )
+        self.assertFalse(oldCache)
+
+
+def test_suite():
+    from unittest import TestSuite, makeSuite
+    suite = TestSuite()
+    suite.addTest(makeSuite(DeviceConfigCacheTest))
+    return suite
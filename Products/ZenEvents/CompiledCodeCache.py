@@ -0,0 +1,90 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+import re
+import logging
+
+log = logging.getLogger("zen.Events")
+
+TRANSFORM = "transform"
+RULE = "rule"
+REGEX = "regex"
+REGEX_NOCASE = "regex_nocase"
+
+_compilers = {
+    TRANSFORM: lambda source: compile(source, "<string>", "exec"),
+    RULE: lambda source: compile(source, "<string>", "eval"),
+    REGEX: lambda source: re.compile(source),
+    REGEX_NOCASE: lambda source: re.compile(source, re.I),
+}
+
+
+class CompiledCodeCache(object):
+    """
+    Cache of compiled event transforms, mapping rules and regexes.
+
+    Entries are keyed on the physical path of the owning object and the
+    kind of code (transform, rule, regex).  Each entry remembers the source
+    text it was compiled from, so a changed (i.e. invalidated and reloaded)
+    ZODB object is recompiled on its next use.  Sources that fail to
+    compile are not cached; the error is raised to the caller every time.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, obj, kind, source):
+        """
+        Return the compiled form of source for the given object.
+
+        @param obj: the EventClass or EventClassInst owning the source
+        @param kind: one of TRANSFORM, RULE, REGEX or REGEX_NOCASE
+        @param source: the source text to compile
+        """
+        key = (obj.getPhysicalPath(), kind)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == source:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        code = _compilers[kind](source)
+        if entry is None and len(self._entries) >= self.maxsize:
+            log.debug(
+                "Compiled code cache is full (%s entries); clearing it",
+                self.maxsize,
+            )
+            self._entries.clear()
+        self._entries[key] = (source, code)
+        return code
+
+    def invalidate(self, path=None):
+        """
+        Remove the entries for the object at path, or all entries if
+        path is None.
+        """
+        if path is None:
+            self._entries.clear()
+            return
+        path = tuple(path)
+        for key in [k for k in self._entries if k[0] == path]:
+            del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hitRate(self):
+        total = self.hits + self.misses
+        return (float(self.hits) / total) if total else 0.0
+
+
+compiledCodeCache = CompiledCodeCache()
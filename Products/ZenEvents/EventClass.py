@@ -183,7 +183,7 @@ class EventClass(EventClassPropertyMixin, Organizer,
             insts.extend(self.find("defaultmapping"))
         return insts
 
-    def lookup(self, evt, device):
+    def lookup(self, evt, device, find=None):
         """
         Given an event, return an event class organizer object
 
@@ -191,6 +191,9 @@ class EventClass(EventClassPropertyMixin, Organizer,
         @type evt: dictionary
         @parameter device: device object
         @type device: DMD device
+        @parameter find: replacement for self.find, e.g. the find method
+            of an EventClassMappingIndex
+        @type find: callable
         @return: an event class that matches the mapping
         @rtype: EventClassInst
         """
@@ -212,7 +215,7 @@ class EventClass(EventClassPropertyMixin, Organizer,
 
         log.debug("No event class specified, searching for eventClassKey %s",
                   eventClassKey)
-        evtcls = self.find(eventClassKey)
+        evtcls = (find or self.find)(eventClassKey)
         log.debug("Found the following event classes that matched key %s: %s",
                   eventClassKey, evtcls)
 
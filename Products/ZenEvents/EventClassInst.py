@@ -45,6 +45,9 @@ from Products import Zuul
 from Products.Zuul.interfaces import IInfo
 from Products.ZenUtils.Utils import zenPath
 from Products.ZenUtils.daemonconfig import IDaemonConfig
+from Products.ZenEvents.CompiledCodeCache import (
+    compiledCodeCache, REGEX, REGEX_NOCASE, RULE, TRANSFORM
+)
 
 from zenoss.protocols.jsonformat import to_dict
 
@@ -165,11 +168,12 @@ class EventClassPropertyMixin(object):
         badLineNo = None
         badLineText = ''
         try:
-            if len(tb) == 2:
-                # Compiletime error: with exceptionText in the form:
-                # '  File "<string>", line 4'
-                # We must extract the line number from the exceptionText
-                badLineNo = int(exceptionText.rsplit(None,1)[1])
+            error = sys.exc_info()[1]
+            if isinstance(error, SyntaxError):
+                # Compiletime error: the transform is compiled by the
+                # compiled code cache, so use the line number recorded
+                # on the exception rather than the traceback.
+                badLineNo = error.lineno
                 exceptionText = "compile error on line %d" % badLineNo
             else:
                 # Runtime error: the transform code is in the third tuple
@@ -319,7 +323,9 @@ Transform:
             startTime = time.time()
             errorCallback = partial(self.sendTransformException, eventclass, evt)
             with transformsavepoint(errorCallback):
-                exec(eventclass.transform, variables_and_funcs)
+                code = compiledCodeCache.get(
+                    eventclass, TRANSFORM, eventclass.transform)
+                exec(code, variables_and_funcs)
             endTime = time.time()
 
             if endTime - startTime > MAX_TRANSFORM_TIME:
@@ -495,7 +501,8 @@ class EventClassInst(EventClassPropertyMixin, ZenModelRM, EventView,
         Apply the event dict regex to extract additional values from the event.
         """
         if self.regex:
-            m = re.search(self.regex, evt.message)
+            m = compiledCodeCache.get(self, REGEX, self.regex).search(
+                evt.message)
             if m: evt.updateFromDict(m.groupdict())
         return evt
 
@@ -535,14 +542,16 @@ class EventClassInst(EventClassPropertyMixin, ZenModelRM, EventView,
         if self.rule:
             try:
                 log.debug("eval rule:%s", self.rule)
-                value = eval(self.rule, {'evt':evt, 'dev':device, 'device': device})
+                code = compiledCodeCache.get(self, RULE, self.rule)
+                value = eval(code, {'evt':evt, 'dev':device, 'device': device})
             except Exception as e:
                 logging.warn("EventClassInst: %s rule failure: %s",
                             self.getDmdKey(), e)
         else:
             try:
                 log.debug("regex='%s' message='%s'", self.regex, evt.message)
-                value = re.search(self.regex, evt.message, re.I)
+                value = compiledCodeCache.get(
+                    self, REGEX_NOCASE, self.regex).search(evt.message)
             except sre_constants.error: pass
         return value
 
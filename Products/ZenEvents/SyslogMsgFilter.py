@@ -18,6 +18,8 @@ import sys
 import logging
 import os.path
 import re
+import sre_constants
+import sre_parse
 
 import zope.interface
 import zope.component
@@ -32,6 +34,101 @@ from Products.ZenUtils.Utils import unused, zenPath
 
 log = logging.getLogger("zen.zensyslog.filter")
 
+
+def _refersToGroups(items):
+    """
+    Return True if the parsed expression contains a backreference, which
+    would refer to the wrong group once the expression is combined with
+    others.
+    """
+    for op, av in items:
+        if op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS):
+            return True
+        stack = [av]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, sre_parse.SubPattern):
+                if _refersToGroups(item):
+                    return True
+            elif isinstance(item, (tuple, list)):
+                stack.extend(item)
+    return False
+
+
+def _isCombinable(compiledRule):
+    """
+    Return True if the rule can be made one alternative of a combined
+    expression without changing what it matches.  Rules with named
+    groups, backreferences or inline flags (which apply to the whole
+    expression) are searched on their own.
+    """
+    if compiledRule.groupindex or compiledRule.flags & ~re.DOTALL:
+        return False
+    try:
+        return not _refersToGroups(sre_parse.parse(compiledRule.pattern))
+    except Exception:
+        return False
+
+
+# The re module supports at most 100 groups in an expression.
+_MAX_GROUPS = 99
+
+
+class _FieldRules(object):
+    """
+    The compiled rules for one event field.  The combinable rules are
+    joined into a single alternation, so a field value is scanned once for
+    all of them.  Each alternative ends with an empty group named after
+    its rule, which identifies the rule that matched; keeping the marker
+    at the end lets re still skip ahead to the literal a rule starts with.
+    """
+
+    def __init__(self, fieldName, rules):
+        self.fieldName = fieldName
+        self.patterns = dict(rules)
+        self.searches = []
+        self.separate = []
+        chunk, groups = [], 0
+        for i, compiledRule in rules:
+            if not _isCombinable(compiledRule):
+                self.separate.append((i, compiledRule))
+                continue
+            if chunk and groups + compiledRule.groups + 1 > _MAX_GROUPS:
+                self._combine(chunk)
+                chunk, groups = [], 0
+            chunk.append((i, compiledRule))
+            groups += compiledRule.groups + 1
+        if chunk:
+            self._combine(chunk)
+
+    def _combine(self, rules):
+        if len(rules) == 1:
+            self.separate.extend(rules)
+            return
+        try:
+            combined = re.compile("|".join(
+                "(?:%s)(?P<r%d>)" % (compiledRule.pattern, i)
+                for i, compiledRule in rules), re.DOTALL)
+        except Exception:
+            self.separate.extend(rules)
+        else:
+            self.searches.append(combined.search)
+        self.separate.sort()
+
+    def match(self, value):
+        """
+        Return the number of a rule that matches the value, or None.
+        """
+        for search in self.searches:
+            m = search(value)
+            if m:
+                return int(m.lastgroup[1:])
+        for i, compiledRule in self.separate:
+            if compiledRule.search(value):
+                return i
+        return None
+
+
 class SyslogMsgFilter(object):
     implements(ICollectorEventTransformer)
     """
@@ -49,7 +146,10 @@ class SyslogMsgFilter(object):
         self._daemon = None
         self._eventService = None
         self._initialized = False
-        self._ruleSet = {}
+        self._ruleSet = []
+        # The event fields that transform filters on, or None for all of
+        # them.  Receiver processes filter on the others.
+        self.fields = None
 
     def initialize(self):
         self._daemon = zope.component.getUtility(ICollector)
@@ -70,13 +170,13 @@ class SyslogMsgFilter(object):
         }
         if kwargs:
             eventDict.update(kwargs)
-        self._eventService.sendEvent(eventDict)
+        if self._eventService is not None:
+            self._eventService.sendEvent(eventDict)
 
     def updateRuleSet(self, rules):
-        processedRuleSet = {}
+        processedRuleSet = []
         for evtFieldName, evtFieldRules in rules.iteritems():
-            if evtFieldName not in processedRuleSet:
-                processedRuleSet[evtFieldName] = []
+            compiledRules = []
             for i, evtFieldRule in enumerate(evtFieldRules):
                 try:
                     compiledRule = re.compile(evtFieldRule, re.DOTALL)
@@ -93,9 +193,44 @@ class SyslogMsgFilter(object):
                         message=msg,
                         eventKey="SyslogMessageFilter.{}.{}".format(evtFieldName, i))
                 else:
-                    processedRuleSet[evtFieldName].append(compiledRule)
+                    compiledRules.append((i, compiledRule))
+            if compiledRules:
+                processedRuleSet.append(
+                    _FieldRules(evtFieldName, compiledRules))
         self._ruleSet = processedRuleSet
 
+    def isFiltered(self, event, fields=None):
+        """
+        Return True if a rule matches the event.  Only the rules for the
+        given fields are used, if any; fields the event doesn't have, or
+        that are None, aren't matched.
+
+        @param event: The event to match.
+        @type event: dict
+        @param fields: The names of the fields to match, or None for all
+        @type fields: collection
+        @rtype: boolean
+        """
+        for fieldRules in self._ruleSet:
+            evtFieldName = fieldRules.fieldName
+            if fields is not None and evtFieldName not in fields:
+                continue
+            value = event.get(evtFieldName)
+            if value is None:
+                continue
+            i = fieldRules.match(value)
+            if i is not None:
+                log.debug(
+                    'Syslog Message Filter match! EventFieldName:%r '
+                    'EventFieldValue:%r FilterRuleNumber:%s '
+                    'FilterRuleExpression:%r',
+                    evtFieldName,
+                    value,
+                    i,
+                    fieldRules.patterns[i].pattern)
+                return True
+        return False
+
     def transform(self, event):
         """
         Performs any transforms of the specified event at the collector.
@@ -108,25 +243,9 @@ class SyslogMsgFilter(object):
                  TRANSFORM_DROP if the event should be dropped.
         @rtype: int
         """
-        result = TRANSFORM_CONTINUE
-
-        if self._daemon and self._ruleSet:
-            for evtFieldName, evtFieldRules in self._ruleSet.iteritems():
-                if evtFieldName in event:
-                    for i, compiledRule in enumerate(evtFieldRules):
-                        m = compiledRule.search(event[evtFieldName])
-                        if not m:
-                            continue
-                        else:
-                            log.debug(
-                                'Syslog Message Filter match! EventFieldName:%r '
-                                'EventFieldValue:%r FilterRuleNumber:%s '
-                                'FilterRuleExpression:%r',
-                                evtFieldName,
-                                event[evtFieldName],
-                                i,
-                                compiledRule.pattern)
-                            self._daemon.counters["eventFilterDroppedCount"] += 1
-                            self._daemon.counters["eventCount"] -= 1
-                            return TRANSFORM_DROP
-        return result
+        if (self._daemon and self._ruleSet and
+                self.isFiltered(event, self.fields)):
+            self._daemon.counters["eventFilterDroppedCount"] += 1
+            self._daemon.counters["eventCount"] -= 1
+            return TRANSFORM_DROP
+        return TRANSFORM_CONTINUE
@@ -20,6 +20,7 @@ import socket
 from copy import deepcopy
 from Products.ZenEvents.syslog_h import *
 from Products.ZenUtils.IpUtil import isip
+from Products.ZenUtils.regexutils import requiredLiteral
 
 
 class SyslogProcessor(object):
@@ -51,6 +52,7 @@ class SyslogProcessor(object):
         self.monitor = monitor
         self.defaultPriority = defaultPriority
         self.compiledParsers = []
+        self._parserIndex = []
         self.updateParsers(syslogParsers)
         self.syslogSummaryToMessage = syslogSummaryToMessage
 
@@ -69,6 +71,26 @@ class SyslogProcessor(object):
                 slog.warn(msg)
                 self.syslogParserErrorEvent(message=msg)
                 pass
+        self._parserIndex = self._buildParserIndex(self.compiledParsers)
+
+    def _buildParserIndex(self, compiledParsers):
+        """
+        Return a list of (index, parserCfg, search, literal, isPrefix) for
+        each usable parser, in order, where literal is a string that must
+        be in (or, if isPrefix, start) a message for the parser to match.
+        Checking the literal first avoids running most parsers' regular
+        expressions against messages they can not match.
+        """
+        index = []
+        for i, parserCfg in enumerate(compiledParsers):
+            expr = parserCfg.get('expr')
+            if not hasattr(expr, 'search'):
+                continue
+            literal, isPrefix = requiredLiteral(expr.pattern)
+            index.append((i, parserCfg, expr.search, literal, isPrefix))
+        slog.debug("Prefiltering %d of %d syslog parsers by literal",
+                   sum(1 for entry in index if entry[3]), len(index))
+        return index
 
     def syslogParserErrorEvent(self, **kwargs):
         """
@@ -233,9 +255,14 @@ class SyslogProcessor(object):
         @type: dictionary
         """
         slog.debug(msg)
-        for i, parserCfg in enumerate(self.compiledParsers):
-            slog.debug("parserCfg[%s] regex: %s", i, parserCfg['expr'].pattern)
-            m = parserCfg['expr'].search(msg)
+        for i, parserCfg, search, literal, isPrefix in self._parserIndex:
+            if literal is not None:
+                if isPrefix:
+                    if not msg.startswith(literal):
+                        continue
+                elif literal not in msg:
+                    continue
+            m = search(msg)
             if not m:
                 continue
             elif not parserCfg['keep']:
@@ -56,6 +56,75 @@ def getNextHigherGlobbedOid(oid):
         nextGlobbedOID = ''.join([oid[0:dotIndex], ".*"])
     return nextGlobbedOID
 
+class OidFilterTree(object):
+    """
+    A prefix tree of OID-based filter definitions, keyed by OID component.
+
+    Each node holds the definitions for its own OID, keyed by an optional
+    qualifier (the specific trap of a V1 definition), and the definition
+    for the globbed OID below it, so a single walk down the tree finds an
+    exact match or the closest globbed definition above the OID.
+    """
+
+    __slots__ = ("children", "definitions", "globbed")
+
+    def __init__(self):
+        self.children = {}
+        self.definitions = None
+        self.globbed = None
+
+    @classmethod
+    def compile(cls, filtersByLevel):
+        """
+        Build a tree from a map of filter definitions by OID level, keyed
+        by "OID", "OID-SPECIFIC_TRAP" or a globbed OID.
+        """
+        root = cls()
+        for filtersByOid in filtersByLevel.itervalues():
+            for key, filterDefinition in filtersByOid.iteritems():
+                root.add(key, filterDefinition)
+        return root
+
+    def add(self, key, filterDefinition):
+        oid, _, qualifier = key.partition("-")
+        globbed = oid == "*" or oid.endswith(".*")
+        if globbed:
+            oid = oid[:-2]
+        node = self
+        if oid:
+            for part in oid.split("."):
+                child = node.children.get(part)
+                if child is None:
+                    child = node.children[part] = OidFilterTree()
+                node = child
+        if globbed:
+            node.globbed = filterDefinition
+        else:
+            if node.definitions is None:
+                node.definitions = {}
+            node.definitions[qualifier or None] = filterDefinition
+
+    def find(self, oid, qualifiers=(None,)):
+        """
+        Return the definition of the OID for the first of the qualifiers
+        that has one, else the definition of the closest globbed OID above
+        the OID, or None if neither exists.
+        """
+        found = None
+        node = self
+        for part in oid.split("."):
+            if node.globbed is not None:
+                found = node.globbed
+            node = node.children.get(part)
+            if node is None:
+                return found
+        if node.definitions:
+            for qualifier in qualifiers:
+                filterDefinition = node.definitions.get(qualifier)
+                if filterDefinition is not None:
+                    return filterDefinition
+        return found
+
 class BaseFilterDefinition(object):
     def __init__(self, lineNumber=None, action=None, collectorRegex=None):
         self.lineNumber =  lineNumber
@@ -128,6 +197,8 @@ class TrapFilter(object):
         self._genericTraps = frozenset([0, 1, 2, 3, 4, 5])
 
         self._initialized = False
+        # False while receiver processes filter the traps instead
+        self.enabled = True
         self._resetFilters()
 
     def _resetFilters(self):
@@ -144,6 +215,11 @@ class TrapFilter(object):
         # value is a map of unique V2FilterDefinition objects for that number of OID levels.
         # The map of V2FilterDefinition objects is keyed by OID
         self._v2Filters = dict()
+
+        # The V1 and V2 filters compiled into OidFilterTrees; built by
+        # _readFilters, or on first use if the filters were set otherwise.
+        self._v1FilterTree = None
+        self._v2FilterTree = None
         self._filtersDefined = False
 
     def _parseFilterDefinition(self, line, lineNumber):
@@ -185,16 +261,7 @@ class TrapFilter(object):
             errorMessage = 'Could not compile collector expression {!r} on ' \
                            'line {}'.format(collectorRegex, lineNumber)
             log.error(errorMessage)
-            self._eventService.sendEvent({
-                'device': '127.0.0.1',
-                'eventClass': '/App/Zenoss',
-                'severity': 4,
-                'eventClassKey': '',
-                'summary': 'SNMP Trap Filter processing issue',
-                'component': 'zentrap',
-                'message': errorMessage,
-                'eventKey': "SnmpTrapFilter.{}".format(lineNumber)
-            })
+            self._sendFilterErrorEvent(errorMessage, lineNumber)
             return errorMessage
 
         if snmpVersion == "v1":
@@ -388,17 +455,10 @@ class TrapFilter(object):
             if errorMessage:
                 errorMessage = "Failed to parse filter definition at line %d: %s" % (lineNumber, errorMessage)
                 log.warn(errorMessage)
-                self._eventService.sendEvent({
-                    'device': '127.0.0.1',
-                    'eventClass': '/App/Zenoss',
-                    'severity': 4,
-                    'eventClassKey': '',
-                    'summary': 'SNMP Trap Filter processing issue',
-                    'component': 'zentrap',
-                    'message': errorMessage,
-                    'eventKey': "SnmpTrapFilter.{}".format(lineNumber)
-                })
+                self._sendFilterErrorEvent(errorMessage, lineNumber)
                 continue
+        self._v1FilterTree = OidFilterTree.compile(self._v1Filters)
+        self._v2FilterTree = OidFilterTree.compile(self._v2Filters)
         numFiltersDefined = len(self._v1Traps) + len(self._v1Filters) + len(self._v2Filters)
         self._filtersDefined = 0 != numFiltersDefined
         if self._filtersDefined:
@@ -410,11 +470,35 @@ class TrapFilter(object):
         else:
             log.warn("No zentrap filters defined.")
 
+    def _sendFilterErrorEvent(self, errorMessage, lineNumber):
+        if self._eventService is None:
+            return
+        self._eventService.sendEvent({
+            'device': '127.0.0.1',
+            'eventClass': '/App/Zenoss',
+            'severity': 4,
+            'eventClassKey': '',
+            'summary': 'SNMP Trap Filter processing issue',
+            'component': 'zentrap',
+            'message': errorMessage,
+            'eventKey': "SnmpTrapFilter.{}".format(lineNumber)
+        })
+
     def initialize(self, trapFilters):
         self._daemon = zope.component.getUtility(ICollector)
         self._eventService = zope.component.queryUtility(IEventService)
         self._initialized = True
 
+    def initializeReceiver(self, daemon):
+        """
+        Initialize a filter used by a receiver process.  Problems with the
+        filter definitions are only logged, since the main process reports
+        them.
+        """
+        self._daemon = daemon
+        self._eventService = None
+        self._initialized = True
+
     def updateFilter(self, trapFilters):
         if trapFilters != None:
             self._readFilters(trapFilters)
@@ -432,18 +516,30 @@ class TrapFilter(object):
         @rtype: int
         """
         result = TRANSFORM_CONTINUE
+        if self.enabled and self.isFiltered(event):
+            self._daemon.counters['eventFilterDroppedCount'] += 1
+            self._daemon.counters["eventCount"] -= 1
+            result = TRANSFORM_DROP
+        return result
+
+    def isFiltered(self, event):
+        """
+        Return True if the filters drop the event.
+
+        @param event: The trap event.
+        @type event: dict
+        @rtype: boolean
+        """
         snmpVersion = event.get('snmpVersion', None)
         if snmpVersion and self._filtersDefined:
             log.debug("Filtering V%s event %s", snmpVersion, event)
             if self._dropEvent(event):
                 log.debug("Dropping event %s", event)
-                self._daemon.counters['eventFilterDroppedCount'] += 1
-                self._daemon.counters["eventCount"] -= 1
-                result = TRANSFORM_DROP
+                return True
         else:
             log.debug("Skipping filter for event=%s, filtersDefined=%s",
                       event, self._filtersDefined)
-        return result
+        return False
 
     def _dropEvent(self, event):
         """
@@ -482,21 +578,17 @@ class TrapFilter(object):
             log.error("No OID found for enterprise-specific trap for V1 event: %s", event)
             return True
 
+        # Try the specific trap, then any specific trap, and then the
+        # closest globbed OID.
         specificTrap = event.get("snmpV1SpecificTrap", None)
         if specificTrap != None:
-            key = ''.join([enterpriseOID, "-", str(specificTrap)])
-            filterDefinition = self._findFilterByLevel(key, self._v1Filters)
-            if filterDefinition != None:
-                log.debug("_dropV1Event: matched definition %s", filterDefinition)
-                return filterDefinition.action == "exclude"
-
-        key = ''.join([enterpriseOID, "-", "*"])
-        filterDefinition = self._findFilterByLevel(key, self._v1Filters)
-        if filterDefinition != None:
-            log.debug("_dropV1Event: matched definition %s", filterDefinition)
-            return filterDefinition.action == "exclude"
-
-        filterDefinition = self.findClosestGlobbedFilter(enterpriseOID, self._v1Filters)
+            qualifiers = (str(specificTrap), "*")
+        else:
+            qualifiers = ("*",)
+        tree = self._v1FilterTree
+        if tree is None:
+            tree = self._v1FilterTree = OidFilterTree.compile(self._v1Filters)
+        filterDefinition = tree.find(enterpriseOID, qualifiers)
         if filterDefinition == None:
             log.debug("_dropV1Event: no matching definitions found")
             return True
@@ -507,14 +599,11 @@ class TrapFilter(object):
     def _dropV2Event(self, event):
         oid = event["oid"]
 
-        # First, try an exact match on the OID
-        filterDefinition = self._findFilterByLevel(oid, self._v2Filters)
-        if filterDefinition != None:
-            log.debug("_dropV2Event: matched definition %s", filterDefinition)
-            return filterDefinition.action == "exclude"
-
-        # Convert the OID to its globbed equivalent and try that
-        filterDefinition = self.findClosestGlobbedFilter(oid, self._v2Filters)
+        # Try an exact match on the OID, then the closest globbed OID
+        tree = self._v2FilterTree
+        if tree is None:
+            tree = self._v2FilterTree = OidFilterTree.compile(self._v2Filters)
+        filterDefinition = tree.find(oid)
         if filterDefinition == None:
             log.debug("_dropV2Event: no matching definitions found")
             return True
@@ -0,0 +1,106 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from collections import OrderedDict
+from time import time
+
+MISSING = object()
+
+
+class IdentityCache(object):
+    """
+    Process-local, size-bounded LRU cache of element identity lookups
+    (identifier/IP address -> uuid).
+
+    A lookup that found nothing is cached as None (a negative entry) for
+    negativeTtl seconds; found uuids are cached for ttl seconds, or until
+    invalidateUuids() is called for them.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300, negativeTtl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negativeTtl = negativeTtl
+        self._entries = OrderedDict()
+        self._keysByUuid = {}
+        self.hits = 0
+        self.negativeHits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return the cached uuid (or None for a negative entry) for key, or
+        MISSING if key is not cached or has expired.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires, value = entry
+        if expires < time():
+            self._forget(key, value)
+            self.misses += 1
+            return MISSING
+        # Re-insert to mark as most recently used.
+        self._entries[key] = entry
+        if value is None:
+            self.negativeHits += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Cache value, a uuid or None, for key."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._forget(key, old[1])
+        ttl = self.negativeTtl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        while len(self._entries) >= self.maxsize:
+            oldKey, (_, oldValue) = self._entries.popitem(last=False)
+            self._forget(oldKey, oldValue)
+            self.evictions += 1
+        self._entries[key] = (time() + ttl, value)
+        if value is not None:
+            self._keysByUuid.setdefault(value, set()).add(key)
+
+    def invalidate(self, key):
+        """Remove the entry for key."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._forget(key, entry[1])
+
+    def invalidateUuids(self, uuids):
+        """Remove the entries resolving to any of the given uuids."""
+        for uuid in uuids:
+            for key in self._keysByUuid.pop(uuid, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._keysByUuid.clear()
+
+    def _forget(self, key, value):
+        if value is not None:
+            keys = self._keysByUuid.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keysByUuid[value]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hitRate(self):
+        hits = self.hits + self.negativeHits
+        total = hits + self.misses
+        return (float(hits) / total) if total else 0.0
@@ -0,0 +1,129 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+import logging
+
+from collections import defaultdict
+from time import time
+
+log = logging.getLogger("zen.eventd")
+
+DEFAULT_MAPPING = "defaultmapping"
+
+
+class EventClassMappingIndex(object):
+    """
+    In-memory index of the event class mappings (EventClassInst objects)
+    under /Events keyed by eventClassKey.
+
+    find() returns the same list as EventClass.find() without a catalog
+    query or object loads.  The index holds the mapping objects of its own
+    connection, so changes to a mapping's rule, regex or transform are
+    picked up by the normal ZODB sync.  Changes that move mappings
+    between keys (eventClassKey or sequence edits, adds, removes) must be
+    reported with invalidate(), given the oids invalidated in the
+    database since the previous call.
+    """
+
+    # Bounds the lookup results kept for keys seen in events.
+    MAX_RESOLVED = 10000
+
+    def __init__(self, events):
+        self._events = events
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.updates = 0
+        self.rebuild()
+
+    def reset(self, events):
+        """Rebuild the index from another (e.g. reconnected) /Events."""
+        self._events = events
+        self.rebuild()
+
+    def rebuild(self):
+        """Build the index from the whole /Events tree."""
+        start = time()
+        self._byKey = defaultdict(list)
+        self._mappings = {}
+        stack = [self._events]
+        while stack:
+            org = stack.pop()
+            for inst in org.instances.objectValuesAll():
+                key = inst.eventClassKey
+                self._mappings[inst._p_oid] = (key, inst)
+                self._byKey[key].append(inst)
+            stack.extend(org.children(checkPerm=False))
+        for mappings in self._byKey.itervalues():
+            mappings.sort(key=lambda x: x.sequence)
+        # Mappings are added, removed and moved through the catalog,
+        # so a change to it means the set of mappings has changed.
+        catalog = self._events._getCatalog()._catalog
+        self._catalogOids = set(
+            getattr(obj, "_p_oid", None)
+            for obj in (catalog, getattr(catalog, "_length", None))
+        )
+        self._catalogOids.discard(None)
+        self._resolved = {}
+        self.rebuilds += 1
+        log.info(
+            "Indexed %s event class mappings with %s keys in %.2f seconds",
+            len(self._mappings), len(self._byKey), time() - start,
+        )
+
+    def invalidate(self, oids):
+        """
+        Update the index for the given invalidated oids.  An oids value of
+        None means the changes are unknown and the index is rebuilt.
+        """
+        if oids is None:
+            self.rebuild()
+            return
+        if any(oid in self._catalogOids for oid in oids):
+            self.rebuild()
+            return
+        for oid in oids:
+            if oid in self._mappings:
+                self._update(oid)
+
+    def _update(self, oid):
+        oldKey, inst = self._mappings[oid]
+        newKey = inst.eventClassKey
+        if newKey != oldKey:
+            self._byKey[oldKey].remove(inst)
+            if not self._byKey[oldKey]:
+                del self._byKey[oldKey]
+            self._byKey[newKey].append(inst)
+            self._mappings[oid] = (newKey, inst)
+        # The sequence may have changed either way.
+        self._byKey[newKey].sort(key=lambda x: x.sequence)
+        self._resolved = {}
+        self.updates += 1
+
+    def find(self, evClassKey):
+        """
+        Return the mappings for evClassKey in sequence order, followed by
+        the 'defaultmapping' mappings.
+        """
+        mappings = self._resolved.get(evClassKey)
+        if mappings is not None:
+            self.hits += 1
+            return mappings
+        self.misses += 1
+        mappings = list(self._byKey.get(evClassKey, ()))
+        if evClassKey != DEFAULT_MAPPING:
+            mappings.extend(self._byKey.get(DEFAULT_MAPPING, ()))
+        mappings = tuple(mappings)
+        if len(self._resolved) >= self.MAX_RESOLVED:
+            self._resolved.clear()
+        self._resolved[evClassKey] = mappings
+        return mappings
+
+    def __len__(self):
+        return len(self._mappings)
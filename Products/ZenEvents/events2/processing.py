@@ -15,6 +15,8 @@ from Products.ZenModel.IpAddress import IpAddress
 from Products.ZenModel.DeviceComponent import DeviceComponent
 from Products.ZenModel.DataRoot import DataRoot
 from Products.ZenEvents.events2.proxy import ZepRawEventProxy, EventProxy
+from Products.ZenEvents.events2.mappings import EventClassMappingIndex
+from Products.ZenEvents.events2.identitycache import IdentityCache, MISSING
 from Products.ZenUtils.guid.interfaces import IGUIDManager, IGlobalIdentifier
 from Products.ZenUtils.IpUtil import isip, ipToDecimal
 from Products.ZenUtils.FunctionCache import FunctionCache
@@ -71,8 +73,30 @@ class Manager(object):
         COMPONENT: DeviceComponent,
     }
 
+    # Index of the event class mappings; None when the storage
+    # cannot report invalidated oids.
+    mappingIndex = None
+
+    # Local cache of device and component identity lookups.
+    identityCache = None
+
+    # Settings of the local identity cache, which sits in front of the
+    # memcached FunctionCache (if configured).
+    IDENTITY_CACHE_SIZE = 10000
+    IDENTITY_CACHE_TTL = 300
+    IDENTITY_CACHE_NEGATIVE_TTL = 60
+
     def __init__(self, dmd):
         self.dmd = dmd
+        self.identityCache = IdentityCache(
+            self.IDENTITY_CACHE_SIZE,
+            self.IDENTITY_CACHE_TTL,
+            self.IDENTITY_CACHE_NEGATIVE_TTL,
+        )
+        # uuids of the devices, components and IP addresses resolved by
+        # this manager, so that identity cache entries can be dropped
+        # when those objects are invalidated.
+        self._uuidsByOid = {}
         self._initCatalogs()
 
     def _initCatalogs(self):
@@ -85,10 +109,62 @@ class Manager(object):
         self._catalogs = {
             DEVICE: self._devices,
         }
+        self._initMappingIndex()
+
+    def _initMappingIndex(self):
+        storage = self.dmd._p_jar.db().storage
+        self._pollInvalidations = getattr(storage, 'poll_invalidations', None)
+        if self._pollInvalidations is None:
+            log.info("Storage does not report invalidations; "
+                     "event class mappings will be looked up in the catalog")
+            self.mappingIndex = None
+            return
+        # Discard changes made before the index is built.
+        self._pollInvalidations()
+        if self.mappingIndex is None:
+            self.mappingIndex = EventClassMappingIndex(self._events)
+        else:
+            self.mappingIndex.reset(self._events)
 
     def reset(self):
+        self.identityCache.clear()
+        self._uuidsByOid.clear()
         self._initCatalogs()
 
+    def pollInvalidations(self):
+        """
+        Return the oids invalidated in the database since the last poll.
+        Call this before syncing the connection, so no change is missed,
+        and pass the result to processInvalidations after syncing.
+        """
+        if self._pollInvalidations is not None:
+            return self._pollInvalidations()
+        return ()
+
+    def processInvalidations(self, oids):
+        """
+        Update the in-memory indexes for the invalidated oids.
+        """
+        if self.mappingIndex is not None and (oids is None or oids):
+            self.mappingIndex.invalidate(oids)
+        if oids is None:
+            self.identityCache.clear()
+            self._uuidsByOid.clear()
+        elif oids:
+            uuids = set()
+            for oid in oids:
+                uuids.update(self._uuidsByOid.pop(oid, ()))
+            if uuids:
+                self.identityCache.invalidateUuids(uuids)
+
+    def _trackObject(self, obj, uuid):
+        """
+        Remember that identity cache entries for uuid depend on obj.
+        """
+        if len(self._uuidsByOid) >= self.IDENTITY_CACHE_SIZE * 2:
+            self._uuidsByOid.clear()
+        self._uuidsByOid.setdefault(obj._p_oid, set()).add(uuid)
+
     def getEventClassOrganizer(self, eventClassName):
         try:
             return self._events.getOrganizer(eventClassName)
@@ -100,15 +176,21 @@ class Manager(object):
         """
         Find a Device's EventClass
         """
+        index = self.mappingIndex
+        find = index.find if index is not None else None
         return self._events.lookup(eventContext.eventProxy,
-                                   eventContext.deviceObject)
+                                   eventContext.deviceObject,
+                                   find=find)
 
     def getElementByUuid(self, uuid):
         """
         Get a Device/Component by UUID
         """
         if uuid:
-            return self._guidManager.getObject(uuid)
+            element = self._guidManager.getObject(uuid)
+            if element is not None:
+                self._trackObject(element, uuid)
+            return element
 
     def uuidFromBrain(self, brain):
         """
@@ -119,13 +201,23 @@ class Manager(object):
         uuid = brain.uuid
         return uuid if uuid else IGlobalIdentifier(brain.getObject()).getGUID()
 
-    @FunctionCache("getElementUuidById", cache_miss_marker=-1, default_timeout=300)
     def getElementUuidById(self, catalog, element_type_id, id):
         """
         Find element by ID but only cache UUID. This forces us to lookup elements
         each time by UUID (pretty fast) which gives us a chance to see if the element
         has been deleted.
         """
+        key = ('getElementUuidById', self._catalogKey(catalog), element_type_id, id)
+        uuid = self.identityCache.get(key)
+        if uuid is MISSING:
+            uuid = self._cachedElementUuidById(catalog, element_type_id, id)
+            self.identityCache.set(key, uuid)
+        return uuid
+
+    def _catalogKey(self, catalog):
+        return catalog.getPrimaryId() if catalog is not None else None
+
+    def _lookupElementUuidById(self, catalog, element_type_id, id):
         cls = self.ELEMENT_TYPE_MAP.get(element_type_id)
         if cls:
             catalog = catalog or self._catalogs.get(element_type_id)
@@ -144,6 +236,10 @@ class Manager(object):
                     else:
                         return self.uuidFromBrain(result)
 
+    _cachedElementUuidById = FunctionCache(
+        "getElementUuidById", cache_miss_marker=-1, default_timeout=300
+    )(_lookupElementUuidById)
+
     def getElementById(self, catalog, element_type_id, id):
         """
         Find element by ID, first checking a cache for UUIDs then using that UUID
@@ -155,10 +251,12 @@ class Manager(object):
             element = self.getElementByUuid(uuid)
             if not element:
                 # Lookup cache must be invalid, try looking up again
-                self.getElementUuidById.clear()
                 log.warning(
-                        'Clearing ElementUuidById cache becase we could not find %s', uuid)
-                uuid = self.getElementUuidById(catalog, element_type_id, id)
+                        'Ignoring cached ElementUuidById because we could not find %s', uuid)
+                uuid = self._lookupElementUuidById(catalog, element_type_id, id)
+                self.identityCache.set(
+                    ('getElementUuidById', self._catalogKey(catalog), element_type_id, id),
+                    uuid)
                 element = self.getElementByUuid(uuid)
             return element
 
@@ -208,11 +306,17 @@ class Manager(object):
                                  query=(Eq('name', ip_address)),
                                  limit = limit,
                                  filterPermissions = False)
-        devices = [brain.getObject().device() for brain in results]
+        devices = []
+        for brain in results:
+            ip = brain.getObject()
+            device = ip.device()
+            if device is not None:
+                # The IP address may move to another device.
+                self._trackObject(ip, self.getElementUuid(device))
+            devices.append(device)
 
         return device_brains, devices
 
-    @FunctionCache("findDeviceUuid", cache_miss_marker=-1, default_timeout=300)
     def findDeviceUuid(self, identifier, ipAddress):
         """
         This will return the device's
@@ -221,6 +325,14 @@ class Manager(object):
         @type  ipaddress: string
         @param ipaddress: The known ipaddress of the device
         """
+        key = ('findDeviceUuid', identifier, ipAddress)
+        uuid = self.identityCache.get(key)
+        if uuid is MISSING:
+            uuid = self._cachedFindDeviceUuid(identifier, ipAddress)
+            self.identityCache.set(key, uuid)
+        return uuid
+
+    def _lookupDeviceUuid(self, identifier, ipAddress):
         device_brains, devices = self._findDevices(identifier, ipAddress, limit=1)
         if device_brains:
             return self.uuidFromBrain(device_brains[0])
@@ -228,6 +340,10 @@ class Manager(object):
             return self.getElementUuid(devices[0])
         return None
 
+    _cachedFindDeviceUuid = FunctionCache(
+        "findDeviceUuid", cache_miss_marker=-1, default_timeout=300
+    )(_lookupDeviceUuid)
+
     def findDevice(self, identifier, ipAddress):
         uuid = self.findDeviceUuid(identifier, ipAddress)
         if uuid:
@@ -0,0 +1,89 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Measure how fast SyslogProcessor.parseTag matches syslog parsers.
+
+    python -m Products.ZenEvents.syslog_benchmark [-p PARSERS] [-n COUNT]
+
+The default syslog parsers are preceded by PARSERS site-specific ones, and
+a sample corpus of messages is matched against them, once by trying every
+parser's expression in turn, and once with parseTag's literal prefilter.
+"""
+
+import argparse
+import time
+
+from Products.ZenEvents.EventManagerBase import EventManagerBase
+from Products.ZenEvents.SyslogProcessing import SyslogProcessor
+
+SAMPLES = [
+    "-- MARK --",
+    "sshd[1234]: Accepted publickey for zenoss from 10.0.0.1 port 52022",
+    "kernel: eth0: link up, 1000Mbps, full-duplex",
+    "%LINK-3-UPDOWN: Interface GigabitEthernet0/1, changed state to down",
+    "Process 10532, Nbr 192.168.10.13 on GigabitEthernet2/15 from LOADING "
+    "to FULL, Loading Done",
+    "54884 05/25/2009 13:41:14.060 SEV=3 HTTP/42 RPT=4623 Error on socket "
+    "accept.",
+    "date=xxxx devname=blue log_id=987654321 type=myComponent blah blah",
+    "a message that none of the parsers match " * 3,
+]
+
+
+def _siteParsers(count):
+    return [
+        {
+            "description": "site parser %d" % i,
+            "expr": r"APP%03d\[(?P<pid>\d+)\]: (?P<component>\S+) "
+                    r"(?P<summary>.*)" % i,
+            "keep": True,
+        }
+        for i in xrange(count)
+    ]
+
+
+def _legacyParseTag(processor):
+    """Try every parser in turn, as parseTag used to."""
+    parsers = processor.compiledParsers
+
+    def parseTag(evt, msg):
+        for parserCfg in parsers:
+            m = parserCfg['expr'].search(msg)
+            if m:
+                evt.update(m.groupdict())
+                break
+        return evt
+
+    return parseTag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-p", "--parsers", type=int, default=100)
+    parser.add_argument("-n", "--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    processor = SyslogProcessor(
+        lambda evt: None, 6, False, "localhost", 3,
+        _siteParsers(args.parsers) + EventManagerBase.syslogParsers, False,
+    )
+    messages = (SAMPLES * (args.count // len(SAMPLES) + 1))[:args.count]
+    for name, parseTag in (
+        ("every parser", _legacyParseTag(processor)),
+        ("prefiltered", processor.parseTag),
+    ):
+        start = time.time()
+        for msg in messages:
+            parseTag({}, msg)
+        elapsed = time.time() - start
+        print("%-14s %10.0f messages/sec" % (name, len(messages) / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -79,6 +79,69 @@ class SyslogMsgFilterTest(BaseTestCase):
         transformResult = msgFilter.transform(event)
         self.assertEquals(transformResult, TRANSFORM_CONTINUE)
 
+    def testSyslogMsgFilterCombinedRules(self):
+        filterCfg = {
+            "summary": [
+                "^link (up|down)$",
+                r"(?P<word>\w+) again (?P=word)",
+                r"(\d+)-\1",
+                "(?i)^ignore",
+                "(BadBad",
+            ] + ["^noise%d(x)?$" % n for n in range(120)],
+            "component": [],
+        }
+        msgFilter = SyslogMsgFilter()
+        msgFilter._daemon = Mock()
+        msgFilter._daemon.counters = {
+            'eventCount': 10,
+            'eventFilterDroppedCount': 0}
+        msgFilter._eventService = Mock()
+        msgFilter.updateRuleSet(filterCfg)
+        self.assertEquals(len(msgFilter._ruleSet), 1)
+        fieldRules = msgFilter._ruleSet[0]
+        self.assertEquals(fieldRules.match("link down"), 0)
+        self.assertEquals(fieldRules.match("spam again spam"), 1)
+        self.assertEquals(fieldRules.match("12-12"), 2)
+        self.assertEquals(fieldRules.match("12-13"), None)
+        self.assertEquals(fieldRules.match("IGNORE this"), 3)
+        self.assertEquals(fieldRules.match("noise0"), 5)
+        self.assertEquals(fieldRules.match("noise119x"), 124)
+        self.assertEquals(fieldRules.match("noise120"), None)
+
+        event = {'summary': 'link up', 'component': 'eth0'}
+        self.assertEquals(msgFilter.transform(event), TRANSFORM_DROP)
+        event['summary'] = 'link sideways'
+        self.assertEquals(msgFilter.transform(event), TRANSFORM_CONTINUE)
+        self.assertEquals(msgFilter._daemon.counters, {
+            'eventCount': 9,
+            'eventFilterDroppedCount': 1})
+
+    def testSyslogMsgFilterFields(self):
+        filterCfg = {
+            "device": ["^noisy"],
+            "summary": ["^link (up|down)$"],
+        }
+        msgFilter = SyslogMsgFilter()
+        msgFilter.updateRuleSet(filterCfg)
+        event = {'summary': 'link up', 'device': None}
+        self.assertTrue(msgFilter.isFiltered(event))
+        self.assertFalse(msgFilter.isFiltered(event, ('device',)))
+        event = {'summary': 'link sideways', 'device': 'noisy1'}
+        self.assertTrue(msgFilter.isFiltered(event, ('device',)))
+
+        msgFilter._daemon = Mock()
+        msgFilter._daemon.counters = {
+            'eventCount': 1,
+            'eventFilterDroppedCount': 0}
+        msgFilter.fields = ('device',)
+        event = {'summary': 'link up', 'device': 'quiet'}
+        self.assertEquals(msgFilter.transform(event), TRANSFORM_CONTINUE)
+        event['device'] = 'noisy2'
+        self.assertEquals(msgFilter.transform(event), TRANSFORM_DROP)
+        self.assertEquals(msgFilter._daemon.counters, {
+            'eventCount': 0,
+            'eventFilterDroppedCount': 1})
+
 def test_suite():
     from unittest import TestSuite, makeSuite
     suite = TestSuite()
@@ -8,6 +8,8 @@
 ##############################################################################
 
 
+import re
+
 from Products.ZenEvents.SyslogProcessing import SyslogProcessor
 from Products.ZenEvents.EventManagerBase import EventManagerBase
 from Products.ZenTestCase.BaseTestCase import BaseTestCase
@@ -150,6 +152,39 @@ class SyslogProcessingTest(BaseTestCase):
         self.assertEquals(evt.get('component'), '10/100/1000/e1a')
         self.assertEquals(evt.get('summary'), 'Client 10.0.0.101 (xid 4251521131) is trying to access an unexported mount (fileid 64, snapid 0, generation 6111516 and flags 0x0 on volume 0xc97d89a [No volume name available])')
 
+    def testPrefilterKeepsParserOrder(self):
+        parsers = [
+            {"expr": r"^APP1 (?P<summary>.*)", "keep": True},
+            {"expr": r"(?P<component>\S+)\[(?P<pid>\d+)\]:", "keep": True},
+            {"expr": "(unbalanced", "keep": True},
+            {"expr": r"(?i)app2 (?P<summary>.*)", "keep": False},
+            {"expr": r"(?P<component>\S+): (?P<summary>.*)", "keep": True},
+        ]
+        s = SyslogProcessor(
+            self.sendEvent, 6, False, 'localhost', 3, parsers, False)
+        self.assertEquals(
+            s.parseTag({}, "APP1 sshd[12]: x")['parserRuleMatched'], 0)
+        self.assertEquals(
+            s.parseTag({}, "x APP1 sshd[12]: x")['parserRuleMatched'], 1)
+        self.assertEquals(s.parseTag({}, "App2 sshd: x"), "ParserDropped")
+        self.assertEquals(
+            s.parseTag({}, "sshd: x")['parserRuleMatched'], 4)
+        self.assertFalse('parserRuleMatched' in s.parseTag({}, "nothing"))
+
+    def testPrefilterMatchesEveryParser(self):
+        s = SyslogProcessor(
+            self.sendEvent, 6, False, 'localhost', 3,
+            EventManagerBase.syslogParsers, False)
+        for parserCfg in EventManagerBase.syslogParsers:
+            msg = parserCfg['description']
+            expected = None
+            for i, cfg in enumerate(EventManagerBase.syslogParsers):
+                if re.search(cfg['expr'], msg, re.DOTALL):
+                    expected = i
+                    break
+            evt = s.parseTag({}, msg)
+            self.assertEquals(evt.get('parserRuleMatched'), expected, msg)
+
 
 def test_suite():
     from unittest import TestSuite, makeSuite
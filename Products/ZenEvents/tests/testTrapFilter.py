@@ -1273,6 +1273,27 @@ class TrapFilterTest(BaseTestCase):
         }
         self.assertEquals(TRANSFORM_DROP, filter.transform(event))
 
+    def testTransformDisabledForReceivers(self):
+        filter = TrapFilter()
+        daemon = Mock()
+        daemon.options.monitor = 'localhost'
+        daemon.counters = {
+            'eventCount': 0,
+            'eventFilterDroppedCount': 0}
+        filter.initializeReceiver(daemon)
+        filter.updateFilter("include v2 1.2.3\nexclude v2 (bad")
+        self.assertEquals(filter._eventService, None)
+
+        event = {
+            "snmpVersion": "2",
+            "oid": "1.2.4",
+        }
+        self.assertTrue(filter.isFiltered(event))
+        self.assertFalse(filter.isFiltered(dict(event, oid="1.2.3")))
+        filter.enabled = False
+        self.assertEquals(TRANSFORM_CONTINUE, filter.transform(event))
+        self.assertEquals(daemon.counters['eventFilterDroppedCount'], 0)
+
     def testTransformWithoutFilters(self):
         filter = TrapFilter()
         filter._eventService = Mock()
@@ -1325,6 +1346,52 @@ class TrapFilterTest(BaseTestCase):
         self.assertEquals(filter._eventService.sendEvent.called, False)
         self.assertEquals(len(filter._v2Filters), 0)
 
+    def testParsedFiltersPrecedence(self):
+        filter = TrapFilter()
+        filter._eventService = Mock()
+        filter._daemon = Mock()
+        filter._daemon.options.monitor = 'localhost'
+        filter.updateFilter("\n".join([
+            "exclude v1 *",
+            "include v1 1.2.*",
+            "exclude v1 1.2.3.*",
+            "include v1 1.2.3.4 *",
+            "exclude v1 1.2.3.4 7",
+            "include v2 *",
+            "exclude v2 1.5.*",
+            "include v2 1.5.6",
+            "exclude v2 1.5.6.7.*",
+        ]))
+        self.assertIsNotNone(filter._v1FilterTree)
+        self.assertIsNotNone(filter._v2FilterTree)
+
+        def dropV1(enterprise, specificTrap=None):
+            return filter._dropV1Event({
+                "snmpVersion": "1",
+                "snmpV1GenericTrapType": 6,
+                "snmpV1Enterprise": enterprise,
+                "snmpV1SpecificTrap": specificTrap,
+            })
+
+        self.assertTrue(dropV1("1.2.3.4", 7))
+        self.assertFalse(dropV1("1.2.3.4", 8))
+        self.assertFalse(dropV1("1.2.3.4"))
+        self.assertTrue(dropV1("1.2.3.5", 8))
+        self.assertFalse(dropV1("1.2.3", 8))
+        self.assertFalse(dropV1("1.2.4"))
+        self.assertTrue(dropV1("1.3"))
+
+        def dropV2(oid):
+            return filter._dropV2Event({"snmpVersion": "2", "oid": oid})
+
+        self.assertFalse(dropV2("1.5.6"))
+        self.assertTrue(dropV2("1.5.6.8"))
+        self.assertTrue(dropV2("1.5.6.7.1"))
+        self.assertTrue(dropV2("1.5.6.7"))
+        self.assertFalse(dropV2("1.5"))
+        self.assertFalse(dropV2("1"))
+        self.assertFalse(dropV2(""))
+
 def test_suite():
     from unittest import TestSuite, makeSuite
     suite = TestSuite()
@@ -0,0 +1,75 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+
+from Products.ZenEvents.CompiledCodeCache import (
+    CompiledCodeCache, REGEX, REGEX_NOCASE, RULE, TRANSFORM
+)
+
+
+class FakeEventClass(object):
+
+    def __init__(self, path):
+        self._path = tuple(path.split('/'))
+
+    def getPhysicalPath(self):
+        return self._path
+
+
+class CompiledCodeCacheTest(TestCase):
+
+    def setUp(self):
+        self.cache = CompiledCodeCache()
+        self.obj = FakeEventClass('/zport/dmd/Events/App')
+
+    def test_transform_is_compiled_once(self):
+        source = "evt.summary = 'x'"
+        code = self.cache.get(self.obj, TRANSFORM, source)
+        self.assertIs(code, self.cache.get(self.obj, TRANSFORM, source))
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_changed_source_is_recompiled(self):
+        first = self.cache.get(self.obj, RULE, "1 == 1")
+        second = self.cache.get(self.obj, RULE, "1 == 2")
+        self.assertIsNot(first, second)
+        self.assertFalse(eval(second, {}))
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_regex_flags_are_cached_separately(self):
+        regex = self.cache.get(self.obj, REGEX, "abc")
+        nocase = self.cache.get(self.obj, REGEX_NOCASE, "abc")
+        self.assertIsNone(regex.search("ABC"))
+        self.assertIsNotNone(nocase.search("ABC"))
+
+    def test_compile_errors_are_not_cached(self):
+        for _ in range(2):
+            self.assertRaises(
+                SyntaxError, self.cache.get, self.obj, TRANSFORM, "if"
+            )
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_invalidate(self):
+        other = FakeEventClass('/zport/dmd/Events/Perf')
+        self.cache.get(self.obj, RULE, "True")
+        self.cache.get(self.obj, REGEX, "x")
+        self.cache.get(other, RULE, "True")
+        self.cache.invalidate(self.obj.getPhysicalPath())
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_maxsize(self):
+        cache = CompiledCodeCache(maxsize=2)
+        for name in ('a', 'b', 'c'):
+            cache.get(FakeEventClass(name), RULE, "True")
+        self.assertEqual(len(cache), 1)
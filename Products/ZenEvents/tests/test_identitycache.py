@@ -0,0 +1,72 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+from mock import patch
+
+from Products.ZenEvents.events2.identitycache import IdentityCache, MISSING
+
+PATH = {'identitycache': 'Products.ZenEvents.events2.identitycache'}
+
+
+class IdentityCacheTest(TestCase):
+
+    def setUp(self):
+        self.cache = IdentityCache(maxsize=3, ttl=300, negativeTtl=60)
+
+    def test_miss_then_hit(self):
+        self.assertIs(self.cache.get('dev1'), MISSING)
+        self.cache.set('dev1', 'uuid1')
+        self.assertEqual(self.cache.get('dev1'), 'uuid1')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_negative_entry(self):
+        self.cache.set('nodev', None)
+        self.assertIsNone(self.cache.get('nodev'))
+        self.assertEqual(self.cache.negativeHits, 1)
+
+    @patch('{identitycache}.time'.format(**PATH))
+    def test_expiry(self, _time):
+        _time.return_value = 1000
+        self.cache.set('dev1', 'uuid1')
+        self.cache.set('nodev', None)
+        _time.return_value = 1061
+        self.assertIs(self.cache.get('nodev'), MISSING)
+        self.assertEqual(self.cache.get('dev1'), 'uuid1')
+        _time.return_value = 1301
+        self.assertIs(self.cache.get('dev1'), MISSING)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        self.cache.set('a', 'uuid-a')
+        self.cache.set('b', 'uuid-b')
+        self.cache.set('c', 'uuid-c')
+        self.cache.get('a')
+        self.cache.set('d', 'uuid-d')
+        self.assertIs(self.cache.get('b'), MISSING)
+        self.assertEqual(self.cache.get('a'), 'uuid-a')
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_invalidate_uuids(self):
+        self.cache.set(('findDeviceUuid', 'dev1', ''), 'uuid1')
+        self.cache.set(('findDeviceUuid', '10.0.0.1', ''), 'uuid1')
+        self.cache.set(('findDeviceUuid', 'dev2', ''), 'uuid2')
+        self.cache.invalidateUuids(['uuid1'])
+        self.assertIs(self.cache.get(('findDeviceUuid', 'dev1', '')), MISSING)
+        self.assertIs(
+            self.cache.get(('findDeviceUuid', '10.0.0.1', '')), MISSING
+        )
+        self.assertEqual(
+            self.cache.get(('findDeviceUuid', 'dev2', '')), 'uuid2'
+        )
+
+    def test_zero_negative_ttl_disables_negative_caching(self):
+        cache = IdentityCache(negativeTtl=0)
+        cache.set('nodev', None)
+        self.assertIs(cache.get('nodev'), MISSING)
@@ -0,0 +1,117 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+
+from Products.ZenEvents.events2.mappings import EventClassMappingIndex
+
+
+class FakePersistent(object):
+
+    _next_oid = [0]
+
+    def __init__(self):
+        self._next_oid[0] += 1
+        self._p_oid = self._next_oid[0]
+
+
+class FakeMapping(FakePersistent):
+
+    def __init__(self, eventClassKey, sequence):
+        super(FakeMapping, self).__init__()
+        self.eventClassKey = eventClassKey
+        self.sequence = sequence
+
+    def __repr__(self):
+        return "<FakeMapping %s/%s>" % (self.eventClassKey, self.sequence)
+
+
+class FakeRelationship(object):
+
+    def __init__(self, objs):
+        self.objs = objs
+
+    def objectValuesAll(self):
+        return list(self.objs)
+
+
+class FakeCatalog(FakePersistent):
+
+    def __init__(self):
+        super(FakeCatalog, self).__init__()
+        self._catalog = FakePersistent()
+
+
+class FakeEventClass(object):
+
+    def __init__(self, instances, children=(), catalog=None):
+        self.instances = FakeRelationship(instances)
+        self._children = list(children)
+        self._catalog = catalog
+
+    def children(self, checkPerm=True):
+        return list(self._children)
+
+    def _getCatalog(self):
+        return self._catalog
+
+
+class EventClassMappingIndexTest(TestCase):
+
+    def setUp(self):
+        self.a1 = FakeMapping("a", 1)
+        self.a0 = FakeMapping("a", 0)
+        self.b0 = FakeMapping("b", 0)
+        self.default = FakeMapping("defaultmapping", 0)
+        self.catalog = FakeCatalog()
+        self.sub = FakeEventClass([self.a1, self.b0])
+        self.events = FakeEventClass(
+            [self.a0, self.default], [self.sub], self.catalog
+        )
+        self.index = EventClassMappingIndex(self.events)
+
+    def test_find(self):
+        self.assertEqual(
+            self.index.find("a"), (self.a0, self.a1, self.default)
+        )
+        self.assertEqual(self.index.find("missing"), (self.default,))
+        self.assertEqual(self.index.find("defaultmapping"), (self.default,))
+        self.assertEqual(len(self.index), 4)
+
+    def test_find_is_cached(self):
+        self.assertIs(self.index.find("a"), self.index.find("a"))
+        self.assertEqual((self.index.hits, self.index.misses), (1, 1))
+
+    def test_sequence_change(self):
+        self.index.find("a")
+        self.a1.sequence = -1
+        self.index.invalidate([self.a1._p_oid])
+        self.assertEqual(
+            self.index.find("a"), (self.a1, self.a0, self.default)
+        )
+
+    def test_key_change(self):
+        self.a1.eventClassKey = "b"
+        self.index.invalidate([self.a1._p_oid, 12345])
+        self.assertEqual(self.index.find("a"), (self.a0, self.default))
+        self.assertEqual(
+            self.index.find("b"), (self.b0, self.a1, self.default)
+        )
+        self.assertEqual(self.index.rebuilds, 1)
+
+    def test_catalog_change_rebuilds(self):
+        c0 = FakeMapping("c", 0)
+        self.sub.instances.objs.append(c0)
+        self.index.invalidate([self.catalog._catalog._p_oid])
+        self.assertEqual(self.index.find("c"), (c0, self.default))
+        self.assertEqual(self.index.rebuilds, 2)
+
+    def test_unknown_changes_rebuild(self):
+        self.index.invalidate(None)
+        self.assertEqual(self.index.rebuilds, 2)
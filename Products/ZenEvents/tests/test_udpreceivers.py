@@ -0,0 +1,151 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+import multiprocessing
+import os
+import socket
+
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from Products.ZenEvents.udpreceivers import (
+    CONFIGURE, DATAGRAMS, RESULTS, STATS, ReceiverPool, _RequestWriter,
+    _encode, _readMessage, _runReceiver, socketDrops,
+)
+
+PATH = {"src": "Products.ZenEvents.udpreceivers"}
+
+
+class SuffixHandler(object):
+
+    suffix = ""
+
+    def configure(self, suffix):
+        self.suffix = suffix
+
+    def __call__(self, data, address):
+        if data == "boom":
+            raise ValueError(data)
+        return [data + self.suffix]
+
+
+class RunReceiverTest(TestCase):
+
+    def startWorker(self, sock=None):
+        requests, writer = os.pipe()
+        parentConn, childConn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_runReceiver,
+            args=(SuffixHandler(), requests, childConn, sock, (writer,)),
+        )
+        process.daemon = True
+        process.start()
+        os.close(requests)
+        childConn.close()
+        self.addCleanup(process.join, 5)
+        self.addCleanup(process.terminate)
+        self.addCleanup(parentConn.close)
+        self.addCleanup(os.close, writer)
+        return writer, parentConn
+
+    def send(self, fd, message):
+        os.write(fd, _encode(message))
+
+    def receive(self, conn):
+        self.assertTrue(conn.poll(5))
+        return conn.recv()
+
+    def test_handles_dispatched_datagrams(self):
+        writer, conn = self.startWorker()
+        self.send(writer, (CONFIGURE, "!"))
+        self.send(
+            writer, (DATAGRAMS, [("a", ("10.0.0.1", 514)), ("boom", None)])
+        )
+        self.send(writer, (DATAGRAMS, [("b", ("10.0.0.2", 514))]))
+        self.assertEqual(self.receive(conn), (RESULTS, ["a!"]))
+        self.assertEqual(self.receive(conn), (RESULTS, ["b!"]))
+
+    def test_receives_from_socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.setblocking(False)
+        self.addCleanup(sock.close)
+        writer, conn = self.startWorker(sock)
+        self.send(writer, (CONFIGURE, "?"))
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(client.close)
+        client.sendto("hello", sock.getsockname())
+        self.assertEqual(self.receive(conn), (RESULTS, ["hello?"]))
+
+
+class RequestWriterTest(TestCase):
+
+    def setUp(self):
+        patcher = patch("{src}.reactor".format(**PATH))
+        self.reactor = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reader, fd = os.pipe()
+        self.addCleanup(os.close, self.reader)
+        self.pool = Mock(name="pool")
+        self.writer = _RequestWriter(self.pool, 0, fd, 100000)
+        self.addCleanup(self.writer.close)
+
+    def test_buffers_without_blocking_and_drops_when_full(self):
+        datagram = (DATAGRAMS, [("x" * 10000, None)])
+        written = 0
+        while self.writer.write(datagram):
+            written += 1
+        # The pipe took some, the rest is buffered and waits for the
+        # reactor.
+        self.assertGreater(written, 10)
+        self.reactor.addWriter.assert_called_once_with(self.writer)
+        self.assertTrue(self.writer.write((CONFIGURE, "!"), force=True))
+        for _ in xrange(written):
+            self.assertEqual(_readMessage(self.reader), datagram)
+            self.writer.doWrite()
+        self.assertEqual(_readMessage(self.reader), (CONFIGURE, "!"))
+        self.reactor.removeWriter.assert_called_once_with(self.writer)
+        self.pool._lost.assert_not_called()
+
+
+class ReceiverPoolTest(TestCase):
+
+    def test_results_and_statistics(self):
+        results = []
+        pool = ReceiverPool("test", 2, SuffixHandler(), results.append)
+        pool._received(1, (RESULTS, ["a", "b"]))
+        pool._received(1, (STATS, {
+            "received": 3, "results": 2, "errors": 1, "dropped": 4,
+        }))
+        self.assertEqual(results, ["a", "b"])
+        pool.dispatchDrops[1] = 5
+        self.assertEqual(
+            pool.displayStatistics(),
+            "test receiver 1: 3 received, 2 results, 1 errors, "
+            "4 dropped by the kernel, 5 dropped while its buffer was full",
+        )
+
+    def test_socket_drops(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        self.addCleanup(sock.close)
+        if os.path.exists("/proc/net/udp"):
+            self.assertEqual(socketDrops(sock), 0)
+        else:
+            self.assertIsNone(socketDrops(sock))
+
+
+def test_suite():
+    from unittest import TestSuite, makeSuite
+    suite = TestSuite()
+    suite.addTest(makeSuite(RunReceiverTest))
+    suite.addTest(makeSuite(RequestWriterTest))
+    suite.addTest(makeSuite(ReceiverPoolTest))
+    return suite
@@ -0,0 +1,160 @@
+from unittest import TestCase
+from mock import patch, Mock
+
+from twisted.internet import defer
+
+from Products.ZenEvents.zeneventdBatch import (
+    BatchQueueConsumerTask,
+    DROP,
+    PUBLISH,
+    REJECT,
+    RecordingTimer,
+    shardKey,
+)
+from zenoss.protocols.protobufs.zep_pb2 import Event, ZepRawEvent
+
+
+PATH = {
+    'zeneventd': 'Products.ZenEvents.zeneventd',
+    'zeneventdBatch': 'Products.ZenEvents.zeneventdBatch',
+}
+
+
+def make_event(uuid, device=None, fingerprint=None):
+    event = Event(uuid=uuid, created_time=1523044529575)
+    if device:
+        event.actor.element_identifier = device
+    if fingerprint:
+        event.fingerprint = fingerprint
+    return event
+
+
+class ShardKeyTest(TestCase):
+
+    def test_device(self):
+        event = make_event('u1', device='dev1', fingerprint='fp')
+        self.assertEqual(shardKey(event), 'dev1')
+
+    def test_fingerprint(self):
+        self.assertEqual(shardKey(make_event('u1', fingerprint='fp')), 'fp')
+
+    def test_uuid(self):
+        self.assertEqual(shardKey(make_event('u1')), 'u1')
+
+
+class RecordingTimerTest(TestCase):
+
+    def test_drain(self):
+        timer = RecordingTimer()
+        with timer:
+            pass
+        with timer:
+            pass
+        durations = timer.drain()
+        self.assertEqual(len(durations), 2)
+        self.assertEqual(timer.drain(), [])
+
+
+class FakePool(object):
+    """Processes shards in place, dropping events with 'drop' in the uuid
+    and rejecting those with 'reject' in the uuid."""
+
+    def __init__(self, size):
+        self.size = size
+        self.calls = []
+
+    def process(self, worker, items):
+        self.calls.append((worker, [index for index, _ in items]))
+        results = []
+        for index, data in items:
+            event = Event()
+            event.ParseFromString(data)
+            if 'drop' in event.uuid:
+                results.append((index, DROP, None))
+            elif 'reject' in event.uuid:
+                results.append((index, REJECT, None))
+            else:
+                zepRawEvent = ZepRawEvent()
+                zepRawEvent.event.CopyFrom(event)
+                results.append(
+                    (index, PUBLISH, zepRawEvent.SerializeToString())
+                )
+        return defer.succeed((results, {'CheckInputPipe': [0.5] * len(items)}))
+
+
+class BatchQueueConsumerTaskTest(TestCase):
+
+    def setUp(self):
+        # BaseQueueConsumerTask looks up the queue schema
+        patcher = patch('{zeneventd}.getUtility'.format(**PATH))
+        self.getUtility = patcher.start()
+        self.addCleanup(patcher.stop)
+        metrology = patch('{zeneventdBatch}.Metrology'.format(**PATH))
+        self.metrology = metrology.start()
+        self.addCleanup(metrology.stop)
+
+        self.pool = FakePool(2)
+        self.task = BatchQueueConsumerTask(self.pool, 3, 1.0)
+        self.task.queueConsumer = Mock()
+        self.task.queueConsumer.publishMessage.return_value = defer.succeed(None)
+        self.task.queueConsumer.acknowledge.return_value = defer.succeed(None)
+        self.task.queueConsumer.reject.return_value = defer.succeed(None)
+
+    def test_same_device_goes_to_same_worker(self):
+        batch = [
+            (Mock(), make_event('u%s' % i, device='dev%s' % (i % 3)))
+            for i in range(9)
+        ]
+        shards = self.task._shard(batch)
+        workers = {}
+        for worker, shard in enumerate(shards):
+            indexes = [index for index, _ in shard]
+            self.assertEqual(indexes, sorted(indexes))
+            for index in indexes:
+                device = batch[index][1].actor.element_identifier
+                workers.setdefault(device, set()).add(worker)
+        self.assertTrue(all(len(w) == 1 for w in workers.values()))
+        self.assertEqual(sum(len(shard) for shard in shards), 9)
+
+    def test_process_batch(self):
+        messages = [Mock(name='m%s' % i) for i in range(3)]
+        events = [
+            make_event('publish', device='dev1'),
+            make_event('drop', device='dev1'),
+            make_event('reject', device='dev2'),
+        ]
+        self.task._processBatch(list(zip(messages, events)))
+
+        consumer = self.task.queueConsumer
+        self.assertEqual(consumer.publishMessage.call_count, 1)
+        published = consumer.publishMessage.call_args[0][2]
+        self.assertEqual(published.event.uuid, 'publish')
+        self.assertEqual(
+            [c[0][0] for c in consumer.acknowledge.call_args_list],
+            messages[:2]
+        )
+        consumer.reject.assert_called_once_with(messages[2])
+        self.metrology.timer.return_value.update.assert_any_call(0.5)
+
+    def test_failed_worker_rejects_its_shard(self):
+        self.pool.process = Mock(return_value=defer.fail(Exception('boom')))
+        message = Mock()
+        self.task._processBatch([(message, make_event('u1', device='d'))])
+        self.task.queueConsumer.reject.assert_called_once_with(message)
+        self.task.queueConsumer.publishMessage.assert_not_called()
+
+    def test_failed_publish_rejects_its_message(self):
+        messages = [Mock(name='m%s' % i) for i in range(3)]
+        events = [make_event('u%s' % i, device='d%s' % i) for i in range(3)]
+        consumer = self.task.queueConsumer
+        consumer.publishMessage.side_effect = [
+            defer.succeed(None),
+            defer.fail(Exception('boom')),
+            Exception('boom'),
+        ]
+        self.task._processBatch(list(zip(messages, events)))
+        self.assertEqual(consumer.publishMessage.call_count, 3)
+        consumer.acknowledge.assert_called_once_with(messages[0])
+        self.assertEqual(
+            [c[0][0] for c in consumer.reject.call_args_list], messages[1:]
+        )
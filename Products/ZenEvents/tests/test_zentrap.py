@@ -4,9 +4,12 @@ import logging
 from struct import pack
 from unittest import TestCase
 
+from mock import Mock
+
 from Products.ZenEvents.zentrap import (
     decode_snmp_value, TrapTask, FakePacket, SNMPv1, SNMPv2, 
-    LEGACY_VARBIND_COPY_MODE, DIRECT_VARBIND_COPY_MODE, MIXED_VARBIND_COPY_MODE
+    LEGACY_VARBIND_COPY_MODE, DIRECT_VARBIND_COPY_MODE, MIXED_VARBIND_COPY_MODE,
+    TrapDecoder, TRAP, FILTER_DROPPED
 )
 
 log = logging.getLogger("test_zentrap")
@@ -222,6 +225,32 @@ class TestOid2Name(TestCase):
         task = MockTrapTask(oidMap)
         self.assertEqual(task.oid2name((1, 2, 3, 4)), "1.2.3.4")
 
+    def test_LongestPrefix(self):
+        oidMap = {
+            "1.2": "Zenoss",
+            "1.2.3": "Zenoss.Test",
+            "1.2.3.4.5": "Zenoss.Test.deep",
+            "1.2.4": "Zenoss.Other",
+            "1.2.x": "Zenoss.Invalid",
+        }
+        task = MockTrapTask(oidMap)
+        for oid, expected in (
+            ((1, 2, 3, 4, 5, 1), "Zenoss.Test.deep.1"),
+            ((1, 2, 3, 4, 6), "Zenoss.Test.4.6"),
+            ((1, 2, 3, 9), "Zenoss.Test.9"),
+            ((1, 2, 5), "Zenoss.5"),
+            ((1, 2), "Zenoss"),
+            ((1, 3), "1.3"),
+            ((1,), "1"),
+            (".1.2.4.7", "Zenoss.Other.7"),
+            ("1.2.x.7", "1.2.x.7"),
+        ):
+            self.assertEqual(task.oid2name(oid, exactMatch=False), expected)
+        self.assertEqual(
+            task.oid2name((1, 2, 3, 4, 6), exactMatch=False, strip=True),
+            "Zenoss.Test",
+        )
+
 
 class _SnmpV1Base(object):
 
@@ -424,6 +453,31 @@ class TestDecodeSnmpV2OrV3(TestCase, _SnmpV2Base):
         self.assertEqual(result["testVar"], "None")
 
 
+class TestTrapDecoder(TestCase, _SnmpV2Base):
+
+    def test_FiltersTraps(self):
+        task = self.makeTask()
+        task._daemon = Mock()
+        task._daemon.options.monitor = "localhost"
+        decoder = TrapDecoder(task)
+        decoder.configure((
+            {"1.3.6.1.6.3.1.1.5.3": "linkDown"},
+            "include v2 1.3.6.1.6.3.1.1.5.3",
+        ))
+        addr = ("10.0.0.1", 162)
+
+        results = decoder((self.makePacket("1.3.6.1.6.3.1.1.5.3"), 1.0), addr)
+        self.assertEqual(len(results), 1)
+        kind, (eventType, result, community, startProcessTime) = results[0]
+        self.assertEqual(kind, TRAP)
+        self.assertEqual(eventType, "snmp_linkDown")
+        self.assertEqual(result["zenoss.trap_source_ip"], "10.0.0.1")
+        self.assertEqual(community, "public")
+
+        results = decoder((self.makePacket("1.3.6.1.6.3.1.1.5.4"), 1.0), addr)
+        self.assertEqual(results, [(FILTER_DROPPED, None)])
+
+
 class _VarbindTests(object):
 
     def case_unknown_id_single(self):
@@ -1073,6 +1127,7 @@ def test_suite():
     suite.addTest(makeSuite(TestOid2Name))
     suite.addTest(makeSuite(TestDecodeSnmpV1))
     suite.addTest(makeSuite(TestDecodeSnmpV2OrV3))
+    suite.addTest(makeSuite(TestTrapDecoder))
     suite.addTest(makeSuite(TestSnmpV1VarbindHandling))
     suite.addTest(makeSuite(TestSnmpV2VarbindHandling))
     return suite
@@ -0,0 +1,132 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Measure how fast TrapFilter decides whether to drop trap events.
+
+    python -m Products.ZenEvents.trapfilter_benchmark [-f FILTERS] [-n COUNT]
+
+FILTERS V1 and V2 definitions, exact, specific-trap and globbed, are read
+into a TrapFilter, and a corpus of events that match them exactly, match
+a globbed OID or match nothing is checked against them, once by looking
+up every OID level as TrapFilter used to, and once with the compiled
+OID filter trees.
+"""
+
+import argparse
+import random
+import time
+
+from .TrapFilter import TrapFilter
+
+
+class _Options(object):
+    monitor = "localhost"
+
+
+class _Daemon(object):
+    options = _Options()
+
+
+def _filters(count, rand):
+    lines = ["include v1 *", "include v2 *"]
+    for i in xrange(count):
+        oid = "1.3.6.1.4.1.%d.%d.%d" % (i, rand.randint(1, 20), i % 7)
+        kind = i % 4
+        if kind == 0:
+            lines.append("exclude v2 %s" % oid)
+        elif kind == 1:
+            lines.append("exclude v2 %s.*" % oid)
+        elif kind == 2:
+            lines.append("exclude v1 %s %d" % (oid, i % 10))
+        else:
+            lines.append("exclude v1 %s.*" % oid)
+    return "\n".join(lines)
+
+
+def _events(filterText, count, rand):
+    oids = [
+        line.split()[2].rstrip(".*")
+        for line in filterText.splitlines()[2:]
+    ]
+    events = []
+    for n in xrange(count):
+        oid = rand.choice(oids)
+        if n % 3 == 1:
+            oid += ".%d.%d" % (rand.randint(1, 50), rand.randint(1, 50))
+        elif n % 3 == 2:
+            oid = "1.3.6.1.4.1.%d.99.1" % rand.randint(10 ** 6, 10 ** 7)
+        if n % 2:
+            events.append({"snmpVersion": "2", "oid": oid})
+        else:
+            events.append({
+                "snmpVersion": "1",
+                "snmpV1GenericTrapType": 6,
+                "snmpV1Enterprise": oid,
+                "snmpV1SpecificTrap": n % 10,
+            })
+    return events
+
+
+def _legacyDropEvent(trapFilter):
+    """Look up every OID level in turn, as TrapFilter used to."""
+    v1Filters = trapFilter._v1Filters
+    v2Filters = trapFilter._v2Filters
+    find = trapFilter._findFilterByLevel
+    findGlobbed = trapFilter.findClosestGlobbedFilter
+
+    def dropEvent(event):
+        if event["snmpVersion"] == "1":
+            enterpriseOID = event["snmpV1Enterprise"]
+            key = "%s-%s" % (enterpriseOID, event["snmpV1SpecificTrap"])
+            filterDefinition = (
+                find(key, v1Filters)
+                or find(enterpriseOID + "-*", v1Filters)
+                or findGlobbed(enterpriseOID, v1Filters)
+            )
+        else:
+            oid = event["oid"]
+            filterDefinition = (
+                find(oid, v2Filters) or findGlobbed(oid, v2Filters)
+            )
+        return filterDefinition is None or \
+            filterDefinition.action == "exclude"
+
+    return dropEvent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-f", "--filters", type=int, default=10000)
+    parser.add_argument("-n", "--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    rand = random.Random(0)
+    filterText = _filters(args.filters, rand)
+    trapFilter = TrapFilter()
+    trapFilter._daemon = _Daemon()
+    start = time.time()
+    trapFilter.updateFilter(filterText)
+    print("%-14s %10.2f seconds" % ("compile", time.time() - start))
+
+    events = _events(filterText, args.count, rand)
+    for name, dropEvent in (
+        ("every level", _legacyDropEvent(trapFilter)),
+        ("filter trees", trapFilter._dropEvent),
+    ):
+        start = time.time()
+        dropped = sum(1 for event in events if dropEvent(event))
+        elapsed = time.time() - start
+        print(
+            "%-14s %10.0f events/sec %8d dropped"
+            % (name, len(events) / elapsed, dropped)
+        )
+
+
+if __name__ == "__main__":
+    main()
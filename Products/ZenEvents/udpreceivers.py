@@ -0,0 +1,474 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""
+Multi-process receiving and processing of UDP datagrams for zensyslog and
+zentrap.
+
+A ReceiverPool runs a number of worker processes, each with a handler
+that turns a datagram into a list of results, typically events.  The
+results are sent back to the parent process and passed to a callback, so
+the results of every worker end up in the daemon's one event queue.
+
+The workers either receive the datagrams themselves, each on its own
+socket bound to the same port with SO_REUSEPORT (or all on one inherited
+socket), or are handed them by the parent when only the parent can
+receive them.  The parent never blocks writing to a worker: what a worker
+can't take yet is buffered, and datagrams are dropped once its buffer is
+full.
+"""
+
+import cPickle as pickle
+import ctypes
+import errno
+import fcntl
+import logging
+import multiprocessing
+import os
+import select
+import signal
+import socket
+import struct
+
+from ctypes.util import find_library
+from time import time
+
+from twisted.internet import reactor
+from twisted.internet.interfaces import IReadDescriptor, IWriteDescriptor
+from zope.interface import implementer
+
+log = logging.getLogger("zen.udpreceivers")
+
+# Linux value, for Pythons whose socket module doesn't define it.
+SO_REUSEPORT = getattr(socket, "SO_REUSEPORT", 15)
+
+# How often, in seconds, workers report their counters.
+STATS_INTERVAL = 10
+
+# Messages between the parent and a worker, as (kind, value) pairs.
+CONFIGURE = "configure"
+DATAGRAMS = "datagrams"
+RESULTS = "results"
+STATS = "stats"
+
+_MAX_DATAGRAM = 65535
+# Datagrams read from the socket before the results are sent to the parent
+_MAX_BATCH = 100
+# Bytes of messages buffered for a worker before datagrams are dropped
+MAX_BUFFERED = 4 * 1024 * 1024
+
+# Messages from the parent to a worker are pickles preceded by their size.
+_HEADER = struct.Struct("!I")
+
+
+def socketDrops(sock):
+    """
+    Return the number of datagrams the kernel dropped for the socket, as
+    reported in /proc/net/udp, or None if that isn't known.
+    """
+    try:
+        inode = str(os.fstat(sock.fileno()).st_ino)
+        for path in ("/proc/net/udp", "/proc/net/udp6"):
+            with open(path) as table:
+                next(table)
+                for line in table:
+                    fields = line.split()
+                    if fields[9] == inode:
+                        return int(fields[12])
+    except (IOError, OSError, ValueError, IndexError, StopIteration):
+        pass
+    return None
+
+
+def _handle(handler, data, address, results, counters):
+    counters["received"] += 1
+    try:
+        handled = handler(data, address)
+    except Exception:
+        counters["errors"] += 1
+        log.exception("Failed to process datagram from %s", address)
+    else:
+        counters["results"] += len(handled)
+        results.extend(handled)
+
+
+def _encode(message):
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(data)) + data
+
+
+def _readExactly(fd, size):
+    chunks = []
+    while size:
+        try:
+            chunk = os.read(fd, size)
+        except OSError as ex:
+            if ex.errno == errno.EINTR:
+                continue
+            raise
+        if not chunk:
+            raise EOFError()
+        chunks.append(chunk)
+        size -= len(chunk)
+    return "".join(chunks)
+
+
+def _readMessage(fd):
+    """Read a message written by _encode from the file descriptor."""
+    (size,) = _HEADER.unpack(_readExactly(fd, _HEADER.size))
+    return pickle.loads(_readExactly(fd, size))
+
+
+def _runReceiver(handler, requests, conn, sock, parentFds=()):
+    """
+    Entry point of a worker process.  Reads datagrams from the socket, if
+    there is one, and messages from the parent on the requests file
+    descriptor, and replies on conn with the results of handling the
+    datagrams and, now and then, its counters.  parentFds are inherited
+    file descriptors that the worker closes, so that it sees the end of
+    the requests when the parent closes them.
+    """
+    # Don't run the parent's handlers (e.g. removing its pid file) and
+    # exit along with the parent.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    libc = ctypes.CDLL(find_library("c"))
+    PR_SET_PDEATHSIG = 1
+    libc.prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
+    for fd in parentFds:
+        os.close(fd)
+
+    counters = {"received": 0, "results": 0, "errors": 0, "dropped": None}
+    readers = [requests] if sock is None else [requests, sock]
+    nextReport = time() + STATS_INTERVAL
+    while True:
+        try:
+            readable = select.select(readers, [], [], STATS_INTERVAL)[0]
+        except select.error as ex:
+            if ex.args[0] == errno.EINTR:
+                continue
+            raise
+        results = []
+        # Read from the parent first, so that a new configuration applies
+        # to the datagrams received along with it.
+        if requests in readable:
+            try:
+                kind, value = _readMessage(requests)
+            except (EOFError, KeyboardInterrupt):
+                break
+            if kind == CONFIGURE:
+                handler.configure(value)
+            elif kind == DATAGRAMS:
+                for data, address in value:
+                    _handle(handler, data, address, results, counters)
+        if sock is not None and sock in readable:
+            for _ in xrange(_MAX_BATCH):
+                try:
+                    data, address = sock.recvfrom(_MAX_DATAGRAM)
+                except socket.error as ex:
+                    if ex.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                        break
+                    raise
+                _handle(handler, data, address, results, counters)
+        if results:
+            conn.send((RESULTS, results))
+        if time() >= nextReport:
+            if sock is not None:
+                counters["dropped"] = socketDrops(sock)
+            conn.send((STATS, dict(counters)))
+            nextReport = time() + STATS_INTERVAL
+
+
+@implementer(IReadDescriptor)
+class _ResultReader(object):
+    """
+    Reads the messages a worker sends to the parent from the reactor.
+    """
+
+    def __init__(self, pool, index, conn):
+        self._pool = pool
+        self._index = index
+        self._conn = conn
+
+    def fileno(self):
+        return self._conn.fileno()
+
+    def logPrefix(self):
+        return "%s receiver %s" % (self._pool.name, self._index)
+
+    def doRead(self):
+        try:
+            while self._conn.poll():
+                self._pool._received(self._index, self._conn.recv())
+        except (EOFError, IOError):
+            self._pool._lost(self._index)
+
+    def connectionLost(self, reason):
+        pass
+
+
+@implementer(IWriteDescriptor)
+class _RequestWriter(object):
+    """
+    Writes the messages for a worker to its pipe from the reactor, without
+    blocking, buffering up to maxBuffered bytes that the worker hasn't
+    read yet.
+    """
+
+    def __init__(self, pool, index, fd, maxBuffered):
+        self._pool = pool
+        self._index = index
+        self._fd = fd
+        self._maxBuffered = maxBuffered
+        self._pending = []
+        self._buffered = 0
+        self._writing = False
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    def fileno(self):
+        return self._fd
+
+    def logPrefix(self):
+        return "%s receiver %s" % (self._pool.name, self._index)
+
+    def write(self, message, force=False):
+        """
+        Queue the message for the worker.  Returns False, without queueing
+        it, if the buffer is full, unless force is True.
+        """
+        data = _encode(message)
+        if (not force and self._buffered and
+                self._buffered + len(data) > self._maxBuffered):
+            return False
+        self._pending.append(data)
+        self._buffered += len(data)
+        if not self._writing:
+            self.doWrite()
+            if self._pending:
+                self._writing = True
+                reactor.addWriter(self)
+        return True
+
+    def doWrite(self):
+        data = "".join(self._pending)
+        try:
+            written = os.write(self._fd, data)
+        except OSError as ex:
+            if ex.errno not in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                self._pool._lost(self._index)
+                return
+            written = 0
+        data = data[written:]
+        self._pending = [data] if data else []
+        self._buffered = len(data)
+        if not data and self._writing:
+            self._writing = False
+            reactor.removeWriter(self)
+
+    def close(self):
+        if self._writing:
+            self._writing = False
+            reactor.removeWriter(self)
+        self._pending = []
+        self._buffered = 0
+        os.close(self._fd)
+
+    def connectionLost(self, reason):
+        pass
+
+
+class ReceiverPool(object):
+    """
+    A fixed number of worker processes receiving and handling datagrams.
+
+    The handler, which is inherited by the workers, is called with each
+    datagram and its sender's address and returns a list of results; its
+    configure method is called with the value given to configure.  The
+    callback is called in the parent with each result.  Workers that die
+    are restarted.  Datagrams given to dispatch are dropped, and counted,
+    while a worker has maxBuffered bytes of messages it hasn't read.
+    """
+
+    def __init__(self, name, size, handler, callback,
+                 maxBuffered=MAX_BUFFERED):
+        self.name = name
+        self.size = size
+        self._handler = handler
+        self._callback = callback
+        self._maxBuffered = maxBuffered
+        self._sockets = [None] * size
+        self._workers = [None] * size
+        self._config = None
+        self._stopping = False
+        self.stats = [{} for _ in xrange(size)]
+        self.dispatchDrops = [0] * size
+
+    def listen(self, port, interface="", fd=None):
+        """
+        Start workers that receive datagrams on the port themselves.  If fd
+        is an inherited socket, all the workers read from it; otherwise
+        each has its own socket bound with SO_REUSEPORT, so that the kernel
+        spreads datagrams across them, or shares one if that's not
+        supported.
+        """
+        if fd is not None:
+            sock = socket.fromfd(fd, socket.AF_INET, socket.SOCK_DGRAM)
+            os.close(fd)
+            sock.setblocking(False)
+            self._sockets = [sock] * self.size
+        else:
+            family = socket.AF_INET6 if ":" in interface else socket.AF_INET
+            sockets = []
+            try:
+                for _ in xrange(self.size):
+                    sockets.append(
+                        self._bind(family, interface, port, reusePort=True)
+                    )
+            except socket.error as ex:
+                log.warn(
+                    "Could not share port %s with SO_REUSEPORT (%s); "
+                    "the %s receivers will share one socket",
+                    port, ex, self.name,
+                )
+                for sock in sockets:
+                    sock.close()
+                sock = self._bind(family, interface, port, reusePort=False)
+                sockets = [sock] * self.size
+            self._sockets = sockets
+        self.start()
+
+    def _bind(self, family, interface, port, reusePort):
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            if reusePort:
+                sock.setsockopt(socket.SOL_SOCKET, SO_REUSEPORT, 1)
+            sock.bind((interface, port))
+        except socket.error:
+            sock.close()
+            raise
+        sock.setblocking(False)
+        return sock
+
+    def start(self):
+        """
+        Start the workers.  Unless listen was called, the workers only
+        handle the datagrams given to dispatch.
+        """
+        for index in xrange(self.size):
+            self._start(index)
+        reactor.addSystemEventTrigger("before", "shutdown", self.stop)
+
+    def _start(self, index):
+        requests, requestWriter = os.pipe()
+        parentConn, childConn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_runReceiver,
+            args=(
+                self._handler, requests, childConn, self._sockets[index],
+                (requestWriter,),
+            ),
+            name="%s receiver %s" % (self.name, index),
+        )
+        process.daemon = True
+        process.start()
+        os.close(requests)
+        childConn.close()
+        reader = _ResultReader(self, index, parentConn)
+        writer = _RequestWriter(self, index, requestWriter, self._maxBuffered)
+        self._workers[index] = (process, parentConn, reader, writer)
+        reactor.addReader(reader)
+        log.info(
+            "Started %s receiver %s (pid %s)", self.name, index, process.pid
+        )
+        if self._config is not None:
+            self._send(index, (CONFIGURE, self._config), force=True)
+
+    def _send(self, index, message, force=False):
+        if self._workers[index] is None:
+            return True
+        return self._workers[index][3].write(message, force)
+
+    def _received(self, index, message):
+        kind, value = message
+        if kind == RESULTS:
+            for result in value:
+                try:
+                    self._callback(result)
+                except Exception:
+                    log.exception("Failed to handle %r", result)
+        elif kind == STATS:
+            self.stats[index] = value
+
+    def _lost(self, index):
+        if self._workers[index] is None:
+            return
+        process, conn, reader, writer = self._workers[index]
+        self._workers[index] = None
+        reactor.removeReader(reader)
+        conn.close()
+        writer.close()
+        if self._stopping:
+            return
+        log.warning(
+            "%s receiver %s (pid %s) died; restarting it",
+            self.name, index, process.pid,
+        )
+        process.join(1)
+        self._start(index)
+
+    def configure(self, config):
+        """
+        Call configure on the handler of every worker with the config,
+        including workers started later.
+        """
+        self._config = config
+        for index, worker in enumerate(self._workers):
+            if worker is not None:
+                self._send(index, (CONFIGURE, config), force=True)
+
+    def dispatch(self, data, address):
+        """
+        Have a worker handle a datagram.  The datagrams from an address
+        are always handled by the same worker, in order.
+        """
+        index = hash(address[0]) % self.size
+        if not self._send(index, (DATAGRAMS, [(data, address)])):
+            self.dispatchDrops[index] += 1
+
+    def stop(self):
+        self._stopping = True
+        workers = filter(None, self._workers)
+        for process, conn, reader, writer in workers:
+            reactor.removeReader(reader)
+            conn.close()
+            writer.close()
+            if process.is_alive():
+                process.terminate()
+        for process, _, _, _ in workers:
+            process.join(5)
+        self._workers = [None] * self.size
+
+    def displayStatistics(self):
+        lines = []
+        for index, stats in enumerate(self.stats):
+            if not stats:
+                continue
+            line = "%s receiver %d: %d received, %d results, %d errors" % (
+                self.name, index, stats["received"], stats["results"],
+                stats["errors"],
+            )
+            if stats["dropped"] is not None:
+                line += ", %d dropped by the kernel" % stats["dropped"]
+            if self.dispatchDrops[index]:
+                line += ", %d dropped while its buffer was full" % (
+                    self.dispatchDrops[index]
+                )
+            lines.append(line)
+        return "\n".join(lines)
@@ -9,6 +9,7 @@
 
 import logging
 import signal
+from functools import partial
 from time import time
 
 from twisted.internet import defer, reactor
@@ -16,6 +17,8 @@ from zope.component import getUtility, provideUtility
 from zope.component.event import objectEventNotify
 from zope.interface import implementer, implements
 from metrology import Metrology
+from metrology.instruments import Gauge
+from metrology.registry import registry
 
 from zenoss.protocols import hydrateQueueMessage
 from zenoss.protocols.interfaces import IAMQPConnectionInfo, IQueueSchema
@@ -27,6 +30,7 @@ from zenoss.protocols.protobufs.zep_pb2 import (
 from Products.ZenCollector.utils.maintenance import (
     MaintenanceCycle, QueueHeartbeatSender, maintenanceBuildOptions
 )
+from Products.ZenEvents.CompiledCodeCache import compiledCodeCache
 from Products.ZenEvents.daemonlifecycle import (
     BuildOptionsEvent, DaemonCreatedEvent, DaemonStartRunEvent, SigTermEvent,
     SigUsr1Event
@@ -69,12 +73,23 @@ EXCHANGE_ZEP_ZEN_EVENTS = '$ZepZenEvents'
 QUEUE_RAW_ZEN_EVENTS = '$RawZenEvents'
 
 
+class CacheGauge(Gauge):
+    """Samples a statistic of one of zeneventd's in-process caches."""
+
+    def __init__(self, getter):
+        self.__getter = getter
+
+    @property
+    def value(self):
+        return self.__getter()
+
+
 class EventPipelineProcessor(object):
 
     SYNC_EVERY_EVENT = False
     PROCESS_EVENT_TIMEOUT = 0
 
-    def __init__(self, dmd):
+    def __init__(self, dmd, reportMetrics=True):
         self.dmd = dmd
         self._manager = Manager(self.dmd)
         self._pipes = (
@@ -106,9 +121,21 @@ class EventPipelineProcessor(object):
         for pipe in self._pipes:
             timer_name = pipe.name
             self._pipe_timers[timer_name] = Metrology.timer(timer_name)
+        self._registerCacheGauges('compiledCodeCache', compiledCodeCache)
+        self._registerCacheGauges(
+            'identityCache', self._manager.identityCache,
+            ('hits', 'negativeHits', 'misses', 'evictions'),
+        )
+        if self._manager.mappingIndex is not None:
+            self._registerCacheGauges(
+                'eventClassMappingIndex', self._manager.mappingIndex
+            )
 
-        self.reporter = MetricReporter(prefix='zenoss.zeneventd.')
-        self.reporter.start()
+        # Batch mode workers don't report; their parent process does.
+        self.reporter = None
+        if reportMetrics:
+            self.reporter = MetricReporter(prefix='zenoss.zeneventd.')
+            self.reporter.start()
 
         if not self.SYNC_EVERY_EVENT:
             # don't call sync() more often than 1 every 0.5 sec
@@ -116,6 +143,19 @@ class EventPipelineProcessor(object):
             self.nextSync = time()
             self.syncInterval = 0.5
 
+    def _registerCacheGauges(self, name, cache, stats=('hits', 'misses')):
+        """
+        Report the size of a cache and the given counters of it.
+        """
+        getters = dict(
+            (stat, partial(getattr, cache, stat)) for stat in stats
+        )
+        getters['size'] = partial(len, cache)
+        for stat, getter in getters.iteritems():
+            metricName = '%s.%s' % (name, stat)
+            if not registry.metrics.get(metricName):
+                Metrology.gauge(metricName, CacheGauge(getter))
+
     def processMessage(self, message, retry=True):
         """
         Handles a queue message, can call "acknowledge" on the Queue Consumer
@@ -196,7 +236,9 @@ class EventPipelineProcessor(object):
             self.nextSync = current_time + self.syncInterval
 
         if doSync:
+            oids = self._manager.pollInvalidations()
             self.dmd._p_jar.sync()
+            self._manager.processInvalidations(oids)
 
     def create_exception_event(self, message, exception):
         # construct wrapper event to report this event processing failure
@@ -314,12 +356,71 @@ class ZenEventDConfig:
         return self.options
 
 
+def batchBuildOptions(parser):
+    """
+    Adds the options of zeneventd's batch mode.
+    """
+    parser.add_option(
+        '--batchworkers', dest='batchWorkers', default=0, type="int",
+        help=('Process events in batches on this many worker processes,'
+              ' each with its own database connection. Events of the'
+              ' same device are always processed in order. Default is'
+              ' 0, which disables batch mode.')
+    )
+    parser.add_option(
+        '--batchsize', dest='batchSize', default=100, type="int",
+        help=('Sets the maximum number of events in a batch when'
+              ' --batchworkers is set. Default is 100.')
+    )
+    parser.add_option(
+        '--batchflushinterval', dest='batchFlushInterval',
+        default=0.1, type="float",
+        help=('Sets the number of seconds to wait for a batch to fill'
+              ' before processing it anyway when --batchworkers is set.'
+              ' Default is 0.1.')
+    )
+
+
+def identityCacheBuildOptions(parser):
+    """
+    Adds the options of the event processing identity cache.
+    """
+    parser.add_option(
+        '--identitycachesize', dest='identityCacheSize',
+        default=10000, type="int",
+        help=('Sets the maximum number of device and component'
+              ' identity lookups cached in memory. Default is 10000.')
+    )
+    parser.add_option(
+        '--identitycachettl', dest='identityCacheTtl',
+        default=300, type="int",
+        help=('Sets the number of seconds a found device or component'
+              ' uuid is cached in memory. Default is 300.')
+    )
+    parser.add_option(
+        '--identitycachenegativettl', dest='identityCacheNegativeTtl',
+        default=60, type="int",
+        help=('Sets the number of seconds a failed device or component'
+              ' lookup is cached in memory. Default is 60.')
+    )
+
+
+def applyIdentityCacheOptions(options):
+    """
+    Configures the identity cache of event processing Managers.
+    """
+    Manager.IDENTITY_CACHE_SIZE = options.identityCacheSize
+    Manager.IDENTITY_CACHE_TTL = options.identityCacheTtl
+    Manager.IDENTITY_CACHE_NEGATIVE_TTL = options.identityCacheNegativeTtl
+
+
 class ZenEventD(ZCmdBase):
 
     def __init__(self, *args, **kwargs):
         super(ZenEventD, self).__init__(*args, **kwargs)
         EventPipelineProcessor.SYNC_EVERY_EVENT = self.options.syncEveryEvent
         EventPipelineProcessor.PROCESS_EVENT_TIMEOUT = self.options.process_event_timeout
+        applyIdentityCacheOptions(self.options)
         self._heartbeatSender = QueueHeartbeatSender(
             'localhost', 'zeneventd', self.options.heartbeatTimeout
         )
@@ -372,6 +473,8 @@ class ZenEventD(ZCmdBase):
                   ' increases the probability that events will be processed'
                   ' out of order.')
         )
+        batchBuildOptions(self.parser)
+        identityCacheBuildOptions(self.parser)
         self.parser.add_option(
             '--maxpickle', dest='maxpickle', default=100, type="int",
             help=('Sets the number of pickle files in'
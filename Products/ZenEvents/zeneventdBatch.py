@@ -0,0 +1,342 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""
+Batched, multi-process event processing for zeneventd.
+
+The parent process consumes raw events from the queue in batches, shards
+each batch by device (or fingerprint) across a pool of worker processes
+and publishes the processed events in bulk.  Each worker has its own ZODB
+connection and runs the whole event pipeline on its shard in order, so
+the events of a device are always processed, and published, in the
+order they were received.
+"""
+
+import ctypes
+import logging
+import multiprocessing
+import signal
+
+from ctypes.util import find_library
+from time import time
+
+from metrology import Metrology
+from twisted.internet import defer, reactor
+from twisted.internet.threads import deferToThread
+from zope.component import getUtility
+
+from zenoss.protocols import hydrateQueueMessage
+from zenoss.protocols.interfaces import IAMQPConnectionInfo
+from zenoss.protocols.protobufs.zep_pb2 import Event, ZepRawEvent
+
+from Products.ZenEvents.events2.processing import DropEvent
+from Products.ZenEvents.zeneventd import (
+    BaseQueueConsumerTask, EventPipelineProcessor, EXCHANGE_ZEP_ZEN_EVENTS,
+    QUEUE_RAW_ZEN_EVENTS
+)
+from Products.ZenMessaging.queuemessaging.QueueConsumer import QueueConsumer
+from Products.ZenUtils.MetricReporter import MetricReporter
+
+log = logging.getLogger("zen.eventd")
+
+# Outcomes of processing one event in a worker.
+PUBLISH = 'publish'
+DROP = 'drop'
+REJECT = 'reject'
+
+
+def shardKey(event):
+    """
+    Return the key used to assign an event to a worker: the device
+    identifier, else the fingerprint, else the event's uuid.
+    """
+    return (event.actor.element_identifier or event.fingerprint
+            or event.uuid)
+
+
+class RecordingTimer(object):
+    """
+    Stands in for a Metrology timer in a worker process.  Durations are
+    kept until drained and sent to the parent, which updates its timers.
+    """
+
+    def __init__(self):
+        self.durations = []
+
+    def __enter__(self):
+        self._start = time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.durations.append(time() - self._start)
+
+    def drain(self):
+        durations, self.durations = self.durations, []
+        return durations
+
+
+def _runWorker(daemon, conn):
+    """
+    Entry point of a worker process.  Receives lists of (index, serialized
+    Event) pairs and replies with ([(index, outcome, serialized
+    ZepRawEvent)], {pipe name: [durations]}).
+    """
+    # Don't run the parent's handlers (e.g. removing its pid file) and
+    # exit along with the parent.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    libc = ctypes.CDLL(find_library("c"))
+    PR_SET_PDEATHSIG = 1
+    libc.prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
+
+    daemon.zodbConnect()
+    daemon.getDataRoot()
+    daemon.login()
+    processor = EventPipelineProcessor(daemon.dmd, reportMetrics=False)
+    timers = dict(
+        (name, RecordingTimer()) for name in processor._pipe_timers
+    )
+    processor._pipe_timers = timers
+
+    while True:
+        try:
+            items = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        results = []
+        for index, data in items:
+            event = Event()
+            event.ParseFromString(data)
+            try:
+                zepRawEvent = processor.processMessage(event)
+            except DropEvent:
+                results.append((index, DROP, None))
+            except Exception:
+                log.exception("Failed to process event %s", event.uuid)
+                results.append((index, REJECT, None))
+            else:
+                results.append(
+                    (index, PUBLISH, zepRawEvent.SerializeToString())
+                )
+        conn.send((
+            results,
+            dict((name, timer.drain()) for name, timer in timers.iteritems())
+        ))
+
+
+class EventWorkerPool(object):
+    """
+    A fixed number of event processing worker processes, each addressed
+    by its index.  Workers that die are restarted on their next use.
+    """
+
+    def __init__(self, daemon, size):
+        self._daemon = daemon
+        self.size = size
+        self._workers = [None] * size
+
+    def start(self):
+        for index in xrange(self.size):
+            self._start(index)
+        # Each worker is called from its own reactor thread.
+        reactor.suggestThreadPoolSize(max(10, self.size + 2))
+
+    def _start(self, index):
+        parentConn, childConn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_runWorker, args=(self._daemon, childConn),
+            name="zeneventd batch worker %s" % index,
+        )
+        process.daemon = True
+        process.start()
+        childConn.close()
+        self._workers[index] = (process, parentConn)
+        log.info("Started batch worker %s (pid %s)", index, process.pid)
+
+    def _call(self, index, items):
+        process, conn = self._workers[index]
+        if not process.is_alive():
+            log.warning(
+                "Batch worker %s (pid %s) died; restarting it",
+                index, process.pid,
+            )
+            conn.close()
+            self._start(index)
+            process, conn = self._workers[index]
+        conn.send(items)
+        return conn.recv()
+
+    def process(self, index, items):
+        """
+        Process a list of (index, serialized Event) pairs on a worker.
+        Returns a Deferred firing with the worker's reply.
+        """
+        return deferToThread(self._call, index, items)
+
+    def stop(self):
+        for process, conn in filter(None, self._workers):
+            conn.close()
+            if process.is_alive():
+                process.terminate()
+        for process, _ in filter(None, self._workers):
+            process.join(5)
+
+
+class BatchQueueConsumerTask(BaseQueueConsumerTask):
+    """
+    Collects raw events into batches and processes each batch on an
+    EventWorkerPool.  Batches are processed one at a time so that events
+    for the same device are published in the order they were received.
+    """
+
+    def __init__(self, pool, batchSize, flushInterval):
+        BaseQueueConsumerTask.__init__(self, None)
+        self.queue = self._queueSchema.getQueue(QUEUE_RAW_ZEN_EVENTS)
+        self._pool = pool
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        self._pending = []
+        self._flushCall = None
+        self._lock = defer.DeferredLock()
+        self._batchTimer = Metrology.timer('processBatch')
+        self._batchSizes = Metrology.histogram('batchSize')
+        self._pipeTimers = {}
+
+    def processMessage(self, message):
+        try:
+            hydrated = hydrateQueueMessage(message, self._queueSchema)
+        except Exception as e:
+            log.error("Failed to hydrate raw event: %s", e)
+            return self.queueConsumer.acknowledge(message)
+        self._pending.append((message, hydrated))
+        if len(self._pending) >= self.batchSize:
+            self.flush()
+        elif self._flushCall is None:
+            self._flushCall = reactor.callLater(
+                self.flushInterval, self.flush
+            )
+
+    def flush(self):
+        """Queue the pending events for processing as one batch."""
+        if self._flushCall is not None:
+            if self._flushCall.active():
+                self._flushCall.cancel()
+            self._flushCall = None
+        batch, self._pending = self._pending, []
+        if batch:
+            return self._lock.run(self._processBatch, batch)
+
+    def _shard(self, batch):
+        shards = [[] for _ in xrange(self._pool.size)]
+        for index, (_, event) in enumerate(batch):
+            shard = hash(shardKey(event)) % self._pool.size
+            shards[shard].append((index, event.SerializeToString()))
+        return shards
+
+    @defer.inlineCallbacks
+    def _processBatch(self, batch):
+        start = time()
+        calls = [
+            (shard, self._pool.process(worker, shard))
+            for worker, shard in enumerate(self._shard(batch)) if shard
+        ]
+        outcomes = [(REJECT, None)] * len(batch)
+        for shard, call in calls:
+            try:
+                results, timings = yield call
+            except Exception:
+                log.exception(
+                    "Batch worker failed; rejecting %s events", len(shard)
+                )
+                continue
+            for index, outcome, data in results:
+                outcomes[index] = (outcome, data)
+            self._updatePipeTimers(timings)
+
+        published = []  # indexes of the events being published
+        publishes = []
+        for index, (outcome, data) in enumerate(outcomes):
+            if outcome != PUBLISH:
+                continue
+            try:
+                zepRawEvent = ZepRawEvent()
+                zepRawEvent.ParseFromString(data)
+                publishes.append(self.queueConsumer.publishMessage(
+                    EXCHANGE_ZEP_ZEN_EVENTS,
+                    self._routing_key(zepRawEvent),
+                    zepRawEvent,
+                    declareExchange=False,
+                ))
+            except Exception:
+                log.exception("Failed to publish event; rejecting it")
+                outcomes[index] = (REJECT, None)
+            else:
+                published.append(index)
+        results = yield defer.DeferredList(publishes, consumeErrors=True)
+        for index, (success, result) in zip(published, results):
+            if not success:
+                log.error(
+                    "Failed to publish event; rejecting it: %s",
+                    result.getErrorMessage(),
+                )
+                outcomes[index] = (REJECT, None)
+
+        for (message, _), (outcome, _) in zip(batch, outcomes):
+            if outcome == REJECT:
+                yield self.queueConsumer.reject(message)
+            else:
+                yield self.queueConsumer.acknowledge(message)
+
+        self._batchSizes.update(len(batch))
+        self._batchTimer.update(time() - start)
+
+    def _updatePipeTimers(self, timings):
+        for name, durations in timings.iteritems():
+            timer = self._pipeTimers.get(name)
+            if timer is None:
+                timer = self._pipeTimers[name] = Metrology.timer(name)
+            for duration in durations:
+                timer.update(duration)
+
+
+class EventDBatchWorker(object):
+    """
+    Runs zeneventd in batch mode: this process consumes and publishes,
+    and 'batchworkers' worker processes run the event pipeline.
+    """
+
+    def __init__(self, daemon):
+        options = daemon.options
+        self._amqpConnectionInfo = getUtility(IAMQPConnectionInfo)
+        self._pool = EventWorkerPool(daemon, options.batchWorkers)
+        self._consumer_task = BatchQueueConsumerTask(
+            self._pool, options.batchSize, options.batchFlushInterval
+        )
+        self._consumer = QueueConsumer(self._consumer_task, None)
+        self._consumer.setPrefetch(options.batchSize * 2)
+        self._reporter = MetricReporter(prefix='zenoss.zeneventd.')
+
+    def run(self):
+        # Start the workers before the reactor, so that they don't
+        # inherit its threads.
+        self._pool.start()
+        reactor.callWhenRunning(self._start)
+        reactor.run()
+
+    def _start(self):
+        reactor.addSystemEventTrigger('before', 'shutdown', self._shutdown)
+        self._reporter.start()
+        self._consumer.run()
+
+    @defer.inlineCallbacks
+    def _shutdown(self):
+        try:
+            yield self._consumer.shutdown()
+        finally:
+            self._pool.stop()
@@ -47,6 +47,13 @@ def onDaemonStartRun(daemon, event):
     defined in zeneventd.py, because onDaemonCreated (above) removes it
     """
     from .zeneventdWorkers import EventDEventletWorker
+    if daemon.options.batchWorkers > 0:
+        from .zeneventdBatch import EventDBatchWorker
+        # Batch workers open their own database connections
+        daemon.closedb()
+        daemon.closeAll()
+        EventDBatchWorker(daemon).run()
+        return
     # Free up unnecessary database resources in parent zeneventd process
     if daemon.options.daemon or daemon.options.cycle:
         daemon.closedb()
@@ -16,7 +16,10 @@ import time
 from amqplib.client_0_8.exceptions import AMQPConnectionException
 from zope.component import getUtility
 from Products.ZenEvents.zeneventd import BaseQueueConsumerTask, EventPipelineProcessor
-from Products.ZenEvents.zeneventd import QUEUE_RAW_ZEN_EVENTS
+from Products.ZenEvents.zeneventd import (
+    QUEUE_RAW_ZEN_EVENTS, applyIdentityCacheOptions, batchBuildOptions,
+    identityCacheBuildOptions
+)
 from Products.ZenMessaging.queuemessaging.eventlet import BasePubSubMessageTask
 from Products.ZenUtils.ZCmdBase import ZCmdBase
 from zenoss.protocols.interfaces import IAMQPConnectionInfo, IQueueSchema
@@ -65,6 +68,7 @@ class EventDEventletWorker(ZCmdBase):
         signal.signal(signal.SIGTERM, self._sigterm)
         mypid = str(os.getpid())
         log.info("in worker, current pid: %s", mypid)
+        applyIdentityCacheOptions(self.options)
         task = EventletQueueConsumerTask(EventPipelineProcessor(self.dmd))
         self._listen(task)
 
@@ -78,6 +82,8 @@ class EventDEventletWorker(ZCmdBase):
         super(EventDEventletWorker, self).buildOptions()
         # don't comment out the workers option in zeneventd.conf (ZEN-2769)
         workersBuildOptions(self.parser)
+        batchBuildOptions(self.parser)
+        identityCacheBuildOptions(self.parser)
         self.parser.add_option('--messagesperworker', dest='messagesPerWorker', default=1,
                     type="int",
                     help='Sets the number of messages each worker gets from the queue at any given time. Default is 1. '
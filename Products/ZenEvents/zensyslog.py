@@ -40,10 +40,11 @@ from Products.ZenUtils.observable import ObservableMixin
 from Products.ZenEvents.SyslogProcessing import SyslogProcessor
 
 from Products.ZenUtils.Utils import zenPath
-from Products.ZenUtils.IpUtil import asyncNameLookup
+from Products.ZenUtils.IpUtil import ReverseLookupCache
 
 from Products.ZenEvents.EventServer import Stats
 from Products.ZenEvents.SyslogMsgFilter import SyslogMsgFilter
+from Products.ZenEvents.udpreceivers import ReceiverPool
 from Products.ZenEvents.ZenEventClasses import Clear, Info, Critical
 from Products.ZenHub.interfaces import ICollectorEventTransformer
 from Products.ZenUtils.Utils import unused
@@ -53,6 +54,15 @@ unused(DeviceProxy)
 COLLECTOR_NAME = 'zensyslog'
 log = logging.getLogger("zen.%s" % COLLECTOR_NAME)
 
+# Results sent by SyslogReceiver
+EVENT = 'event'
+PARSER_DROPPED = 'parserDropped'
+FILTER_DROPPED = 'filterDropped'
+
+# Event fields that are only set in the main process.  The receiver
+# processes filter the events on the other fields.
+MAIN_PROCESS_FIELDS = ('device', 'agent', 'manager')
+
 
 class SyslogPreferences(object):
     zope.interface.implements(ICollectorPreferences)
@@ -123,6 +133,30 @@ class SyslogPreferences(object):
                            action='store_true', default=False,
                            help="Don't convert the remote device's IP address to a hostname."
                            )
+        parser.add_option('--reverseLookupTtl', dest='reverseLookupTtl',
+                           default=3600, type='int',
+                           help='Seconds to cache the hostname of a remote '
+                           'device. Default is %default'
+                           )
+        parser.add_option('--reverseLookupNegativeTtl',
+                           dest='reverseLookupNegativeTtl',
+                           default=300, type='int',
+                           help='Seconds to cache a failed hostname lookup. '
+                           'Default is %default'
+                           )
+        parser.add_option('--reverseLookupCacheSize',
+                           dest='reverseLookupCacheSize',
+                           default=10000, type='int',
+                           help='Maximum number of hostnames to cache. '
+                           'Default is %default'
+                           )
+        parser.add_option('--receivers', dest='receivers',
+                           default=1, type='int',
+                           help='Number of processes receiving and parsing '
+                           'syslog messages. With more than one, each has its '
+                           'own socket on the syslog port (SO_REUSEPORT). '
+                           'Default is %default'
+                           )
 
     def postStartup(self):
         daemon = zope.component.getUtility(ICollector)
@@ -163,6 +197,10 @@ class SyslogTask(BaseTask, DatagramProtocol):
         self.options = self._daemon.options
 
         self.stats = Stats()
+        self._nameCache = ReverseLookupCache(
+            ttl=self.options.reverseLookupTtl,
+            negativeTtl=self.options.reverseLookupNegativeTtl,
+            maxsize=self.options.reverseLookupCacheSize)
 
         if not self.options.useFileDescriptor\
              and self.options.syslogport < 1024:
@@ -182,7 +220,18 @@ class SyslogTask(BaseTask, DatagramProtocol):
             hdlr.setFormatter(logging.Formatter('%(message)s'))
             self.olog.addHandler(hdlr)
 
-        if self.options.useFileDescriptor is not None:
+        self._receivers = None
+        if self.options.receivers > 1:
+            self._receivers = ReceiverPool(COLLECTOR_NAME,
+                                           self.options.receivers,
+                                           SyslogReceiver(self),
+                                           self.receiverResult)
+            self._daemon.setReceivers(self._receivers)
+            fd = self.options.useFileDescriptor
+            self._receivers.listen(self.options.syslogport,
+                                   self.options.listenip,
+                                   fd=int(fd) if fd is not None else None)
+        elif self.options.useFileDescriptor is not None:
             self.useUdpFileDescriptor(int(self.options.useFileDescriptor))
         else:
             reactor.listenUDP(self.options.syslogport, self,
@@ -282,7 +331,7 @@ class SyslogTask(BaseTask, DatagramProtocol):
         if self.options.noreverseLookup:
             d = defer.succeed(ipaddr)
         else:
-            d = asyncNameLookup(ipaddr)
+            d = self._nameCache.lookup(ipaddr)
         d.addBoth(self.gotHostname, (msg, ipaddr, time.time()))
 
     def gotHostname(self, response, data):
@@ -303,12 +352,52 @@ class SyslogTask(BaseTask, DatagramProtocol):
         if self._daemon.processor:
             processResult = self._daemon.processor.process(msg, ipaddr, host, rtime)
             if processResult == "EventSent":
-                totalTime, totalEvents, maxTime = self.stats.report()
-                stat = self._statService.getStatistic("events")
-                stat.value = totalEvents
+                self._updateEventStatistic()
             elif processResult == "ParserDropped":
                 self._daemon.counters["eventParserDroppedCount"] += 1
 
+    def _updateEventStatistic(self):
+        totalTime, totalEvents, maxTime = self.stats.report()
+        stat = self._statService.getStatistic("events")
+        stat.value = totalEvents
+
+    def receiverResult(self, result):
+        """
+        Send an event parsed by a receiver process, resolving the address
+        of the remote device if a parser didn't set the device.
+
+        @param result: (EVENT, (event, ipaddr)), (PARSER_DROPPED, None) or
+            (FILTER_DROPPED, None)
+        @type result: tuple
+        """
+        kind, value = result
+        if kind == PARSER_DROPPED:
+            self._daemon.counters["eventParserDroppedCount"] += 1
+            return
+        if kind == FILTER_DROPPED:
+            self._daemon.counters["eventFilterDroppedCount"] += 1
+            return
+        evt, ipaddr = value
+        if evt.get('device') is not None:
+            self._sendReceivedEvent(evt)
+        elif self.options.noreverseLookup:
+            self.gotReceivedHostname(ipaddr, evt, ipaddr)
+        else:
+            d = self._nameCache.lookup(ipaddr)
+            d.addBoth(self.gotReceivedHostname, evt, ipaddr)
+
+    def gotReceivedHostname(self, response, evt, ipaddr):
+        if isinstance(response, failure.Failure):
+            host = ipaddr
+        else:
+            host = response
+        evt['device'] = unicode(host)
+        self._sendReceivedEvent(evt)
+
+    def _sendReceivedEvent(self, evt):
+        self._eventService.sendEvent(evt)
+        self._updateEventStatistic()
+
     def displayStatistics(self):
         totalTime, totalEvents, maxTime = self.stats.report()
         display = "%d events processed in %.2f seconds" % (
@@ -319,11 +408,65 @@ class SyslogTask(BaseTask, DatagramProtocol):
 %.5f average seconds per event
 Maximum processing time for one event was %.5f""" % (
                        (totalTime / totalEvents), maxTime)
+        if not self.options.noreverseLookup:
+            display += "\n" + self._nameCache.displayStatistics()
+        if self._receivers is not None:
+            display += "\n" + self._receivers.displayStatistics()
         return display
 
     def cleanup(self):
         status = self.displayStatistics()
         self.log.info(status)
+        if self._receivers is not None:
+            self._receivers.stop()
+
+
+class SyslogReceiver(object):
+    """
+    Parses syslog messages into events, and filters them, in a receiver
+    process.  The device of an event is left as None unless a parser sets
+    it, for the parent process to fill in with the hostname of the remote
+    device; the filter rules for the device are applied there.
+    """
+
+    def __init__(self, task):
+        self._task = task
+        self._events = []
+        self.processor = None
+        self.msgFilter = SyslogMsgFilter()
+
+    def configure(self, config):
+        processorArgs, filterRules = config
+        self.processor = SyslogProcessor(self._events.append, *processorArgs)
+        # Problems with the parsers and rules were already reported by the
+        # parent
+        del self._events[:]
+        self.msgFilter = SyslogMsgFilter()
+        self.msgFilter.updateRuleSet(filterRules)
+
+    def __call__(self, msg, client_address):
+        if msg == "" or self.processor is None:
+            return []
+        ipaddr = client_address[0]
+        options = self._task.options
+        if options.logorig:
+            if options.logformat == 'human':
+                message = self._task.expand(msg, client_address)
+            else:
+                message = msg
+            self._task.olog.info(message)
+
+        processResult = self.processor.process(msg, ipaddr, None, time.time())
+        results = []
+        for evt in self._events:
+            if self.msgFilter.isFiltered(evt):
+                results.append((FILTER_DROPPED, None))
+            else:
+                results.append((EVENT, (evt, ipaddr)))
+        del self._events[:]
+        if processResult == "ParserDropped":
+            results.append((PARSER_DROPPED, None))
+        return results
 
 
 class SyslogConfigTask(ObservableMixin):
@@ -346,10 +489,15 @@ class SyslogConfigTask(ObservableMixin):
 
         eventService = zope.component.queryUtility(IEventService)
 
-        self._daemon.processor = SyslogProcessor(eventService.sendEvent,
+        processorArgs = (
                     self._daemon.options.minpriority, self._daemon.options.parsehost,
                     self._daemon.options.monitor, self._preferences.defaultPriority,
                     self._preferences.syslogParsers, self._preferences.syslogSummaryToMessage)
+        self._daemon.processor = SyslogProcessor(eventService.sendEvent,
+                                                 *processorArgs)
+        # Receiver processes build their own processors from the same args
+        self._daemon.processorArgs = processorArgs
+        self._daemon.configureReceivers()
 
     def doTask(self):
         return defer.succeed("Already updated default syslog priority...")
@@ -363,6 +511,9 @@ class SyslogDaemon(CollectorDaemon):
     _frameworkFactoryName = "nosip"
 
     def __init__(self, *args, **kwargs):
+        self.receivers = None
+        self.processorArgs = None
+        self._syslogMsgFilterRules = {}
         self._syslogMsgFilter = SyslogMsgFilter()
         zope.component.provideUtility(self._syslogMsgFilter, ICollectorEventTransformer)
         kwargs["initializationCallback"] = self._initializeSyslogMsgFilter
@@ -395,10 +546,31 @@ class SyslogDaemon(CollectorDaemon):
             self.setExitCode(1)
             self.stop()
 
+    def setReceivers(self, receivers):
+        """
+        Have the receiver processes parse and filter the syslog messages.
+        The filter rules for the fields set by this process are still
+        applied when the events are sent.
+        """
+        self.receivers = receivers
+        self._syslogMsgFilter.fields = MAIN_PROCESS_FIELDS
+        self.configureReceivers()
+
+    def configureReceivers(self):
+        """
+        Send the receiver processes the configuration of their syslog
+        processors and message filters.
+        """
+        if self.receivers is not None and self.processorArgs is not None:
+            self.receivers.configure(
+                (self.processorArgs, self._syslogMsgFilterRules))
+
     def _updateConfig(self, cfg):
         result = super(SyslogDaemon, self)._updateConfig(cfg)
         if result:
+            self._syslogMsgFilterRules = cfg.syslogMsgEvtFieldFilterRules
             self._syslogMsgFilter.updateRuleSet(cfg.syslogMsgEvtFieldFilterRules)
+            self.configureReceivers()
         return result
 
     def _displayStatistics(self, verbose=False):
@@ -21,6 +21,7 @@ import socket
 import sys
 import time
 
+from bisect import bisect_right
 from collections import defaultdict
 from ipaddr import IPAddress
 from struct import unpack
@@ -46,6 +47,7 @@ from Products.ZenCollector.tasks import (
 from Products.ZenEvents.EventServer import Stats
 from Products.ZenEvents.TrapFilter import TrapFilter
 from Products.ZenEvents.ZenEventClasses import Clear, Critical, Info
+from Products.ZenEvents.udpreceivers import ReceiverPool
 from Products.ZenHub.interfaces import ICollectorEventTransformer
 from Products.ZenHub.services.SnmpTrapConfig import User
 from Products.ZenUtils.captureReplay import CaptureReplay
@@ -98,6 +100,75 @@ LEGACY_VARBIND_COPY_MODE = 0
 DIRECT_VARBIND_COPY_MODE = 1
 MIXED_VARBIND_COPY_MODE  = 2
 
+# SNMPv2-MIB::snmpTrapOID.0 and SNMP-COMMUNITY-MIB::snmpTrapAddress
+SNMP_TRAP_OID = (1, 3, 6, 1, 6, 3, 1, 1, 4, 1, 0)
+SNMP_TRAP_ADDRESS_OID = (1, 3, 6, 1, 6, 3, 18, 1, 3)
+
+# Results sent by TrapDecoder
+TRAP = 'trap'
+FILTER_DROPPED = 'filterDropped'
+
+
+class OidMap(object):
+    """
+    A mapping of OIDs to MIB names that also finds the longest prefix of
+    an OID that has a name.
+
+    The numeric OIDs are kept as tuples in a sorted list, and each entry
+    refers to the entry of its own longest named prefix, so a lookup is a
+    binary search followed by a short walk up those references.
+    """
+
+    def __init__(self, names=None):
+        self.names = dict(names or {})
+        entries = []
+        for oid, name in self.names.iteritems():
+            try:
+                key = tuple(int(part) for part in oid.split('.'))
+            except ValueError:
+                continue
+            # Keys that aren't in canonical dotted form never matched
+            if '.'.join(map(str, key)) == oid:
+                entries.append((key, name))
+        entries.sort()
+        self._oids = [key for key, _ in entries]
+        self._names = [name for _, name in entries]
+        self._parents = []
+        for i, key in enumerate(self._oids):
+            self._parents.append(self._prefixOf(key, i - 1))
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, oid, default=None):
+        return self.names.get(oid, default)
+
+    def _prefixOf(self, oid, i):
+        # Any named prefix of the OID is a named prefix of the entry at i,
+        # the last entry that sorts before the OID, or is the entry itself.
+        oids = self._oids
+        parents = self._parents
+        while i >= 0:
+            prefix = oids[i]
+            if oid[:len(prefix)] == prefix:
+                return i
+            i = parents[i]
+        return -1
+
+    def longestPrefix(self, oid):
+        """
+        Return the name of the longest prefix of the OID that has a name,
+        and the length of that prefix, or (None, 0) if there is none.
+
+        @param oid: SNMP Object IDentifier
+        @type oid: tuple of integers
+        """
+        i = self._prefixOf(oid, bisect_right(self._oids, oid) - 1)
+        if i < 0:
+            return None, 0
+        return self._names[i], len(self._oids[i])
+
+
 class FakePacket(object):
     """
     A fake object to make packet replaying feasible.
@@ -168,12 +239,20 @@ class SnmpTrapPreferences(CaptureReplay):
                 'of the varbind, otherwise uses varbindCopyMode=1 behaviour'
         )
 
+        parser.add_option(
+            '--receivers',
+            dest='receivers', type='int', default=1,
+            help="Number of processes decoding SNMP traps. Traps are "
+            "received by the main process and handed to the others when "
+            "there is more than one. Default is %default"
+        )
+
         self.buildCaptureReplayOptions(parser)
 
     def postStartup(self):
         # Ensure that we always have an oidMap
         daemon = getUtility(ICollector)
-        daemon.oidMap = {}
+        daemon.oidMap = OidMap()
         # add our collector's custom statistics
         statService = queryUtility(IStatisticsService)
         statService.addStatistic("events", "COUNTER")
@@ -318,6 +397,15 @@ class TrapTask(BaseTask, CaptureReplay):
         processor_class = self._varbind_processors.get(self.varbindCopyMode)
         self._process_varbinds = processor_class(self.oid2name)
 
+        self._receivers = None
+        if self.options.receivers > 1 and not self.options.replayFilePrefix:
+            self._receivers = ReceiverPool(
+                'zentrap', self.options.receivers, TrapDecoder(self),
+                self._decodedTrap
+            )
+            self._daemon.setReceivers(self._receivers)
+            self._receivers.start()
+
         if not self.options.replayFilePrefix:
             trapPort = self._preferences.options.trapport
             if not self.options.useFileDescriptor and trapPort < 1024:
@@ -432,7 +520,7 @@ class TrapTask(BaseTask, CaptureReplay):
         packet.enterprise_length = pdu.enterprise_length
 
         # Here's where we start to encounter differences between packet types
-        if pdu.version == SNMPv1:
+        if pdu.version == SNMPv1 or pdu.enterprise_length > 0:
             # SNMPv1 can't be received via IPv6
             packet.agent_addr = [pdu.agent_addr[i] for i in range(4)]
             packet.trap_type = pdu.trap_type
@@ -452,12 +540,22 @@ class TrapTask(BaseTask, CaptureReplay):
         ts = time.time()
         self.asyncHandleTrap([pdu.host, pdu.port], pdu, ts)
 
+    @property
+    def oidMap(self):
+        return self._oidMap
+
+    @oidMap.setter
+    def oidMap(self, oidMap):
+        if not isinstance(oidMap, OidMap):
+            oidMap = OidMap(oidMap)
+        self._oidMap = oidMap
+
     def oid2name(self, oid, exactMatch=True, strip=False):
         """
         Returns a MIB name based on an OID and special handling flags.
 
         @param oid: SNMP Object IDentifier
-        @type oid: string
+        @type oid: string or tuple of integers
         @param exactMatch: find the full OID or don't match
         @type exactMatch: boolean
         @param strip: show what matched, or matched + numeric OID remainder
@@ -466,24 +564,25 @@ class TrapTask(BaseTask, CaptureReplay):
         @rtype: Twisted deferred object
         """
         if isinstance(oid, tuple):
-            oid = '.'.join(map(str, oid))
-
-        oid = oid.strip('.')
-        if exactMatch:
-            return self.oidMap.get(oid, oid)
-
-        oidlist = oid.split('.')
-        for i in range(len(oidlist), 0, -1):
-            name = self.oidMap.get('.'.join(oidlist[:i]), None)
-            if name is None:
-                continue
-
-            oid_trail = oidlist[i:]
-            if len(oid_trail) > 0 and not strip:
-                return "%s.%s" % (name, '.'.join(oid_trail))
-            return name
+            text = None
+            if exactMatch:
+                text = '.'.join(map(str, oid))
+                return self.oidMap.get(text, text)
+        else:
+            text = oid.strip('.')
+            if exactMatch:
+                return self.oidMap.get(text, text)
+            try:
+                oid = tuple(int(part) for part in text.split('.'))
+            except ValueError:
+                return text
 
-        return oid
+        name, length = self._oidMap.longestPrefix(oid)
+        if name is None:
+            return text if text is not None else '.'.join(map(str, oid))
+        if length < len(oid) and not strip:
+            return "%s.%s" % (name, '.'.join(map(str, oid[length:])))
+        return name
 
     def _pre_parse(
             self, session, transport, transport_data, transport_data_length):
@@ -699,11 +798,12 @@ class TrapTask(BaseTask, CaptureReplay):
         varbinds = []
         for vb_oid, vb_value in variables:
             vb_value = decode_snmp_value(vb_value)
-            vb_oid = '.'.join(map(str, vb_oid))
+            vb_oid = tuple(vb_oid)
             if vb_value is None:
                 log.debug(
                     "[decodeSnmpv1] enterprise %s, varbind-oid %s, "
-                    "varbind-value %s", enterprise, vb_oid, vb_value
+                    "varbind-value %s",
+                    enterprise, '.'.join(map(str, vb_oid)), vb_value
                 )
             varbinds.append((vb_oid, vb_value))
 
@@ -720,22 +820,22 @@ class TrapTask(BaseTask, CaptureReplay):
         varbinds = []
         for vb_oid, vb_value in variables:
             vb_value = decode_snmp_value(vb_value)
-            vb_oid = '.'.join(map(str, vb_oid))
+            vb_oid = tuple(vb_oid)
             if vb_value is None:
                 log.debug(
                     "[decodeSnmpV2OrV3] varbind-oid %s, varbind-value %s",
-                    vb_oid, vb_value
+                    '.'.join(map(str, vb_oid)), vb_value
                 )
 
             # SNMPv2-MIB/snmpTrapOID
-            if vb_oid == '1.3.6.1.6.3.1.1.4.1.0':
+            if vb_oid == SNMP_TRAP_OID:
                 result["oid"] = vb_value
                 eventType = self.oid2name(
                     vb_value, exactMatch=False, strip=False
                 )
-            elif vb_oid.startswith('1.3.6.1.6.3.18.1.3'):
+            elif vb_oid[:len(SNMP_TRAP_ADDRESS_OID)] == SNMP_TRAP_ADDRESS_OID:
                 self.log.debug("found snmpTrapAddress OID: %s = %s",
-                               vb_oid, vb_value)
+                               '.'.join(map(str, vb_oid)), vb_value)
                 result['snmpTrapAddress'] = vb_value
                 result['device'] = vb_value
             else:
@@ -763,6 +863,44 @@ class TrapTask(BaseTask, CaptureReplay):
         """
         self.capturePacket(addr[0], addr, pdu)
 
+        if self._receivers is not None:
+            # Net-SNMP frees the PDU after this call; hand a copy of it to
+            # a receiver process to decode.
+            packet = self.convertPacketToPython(addr, pdu)
+            packet.community = self.getCommunity(pdu)
+            self._receivers.dispatch((packet, startProcessTime), addr)
+            if pdu.command == netsnmp.SNMP_MSG_INFORM:
+                self.snmpInform(addr, pdu)
+            return
+
+        decoded = self.decodeTrap(addr, pdu)
+        if decoded is None:
+            return
+        eventType, result = decoded
+        community = self.getCommunity(pdu)
+        result['zenoss.trap_source_ip'] = addr[0]
+        self.sendTrapEvent(result, community, eventType,
+                           startProcessTime)
+
+        if self.isReplaying():
+            self.replayed += 1
+            # Don't attempt to respond back if we're replaying packets
+            return
+
+        if pdu.command == netsnmp.SNMP_MSG_INFORM:
+            self.snmpInform(addr, pdu)
+
+    def decodeTrap(self, addr, pdu):
+        """
+        Decode a trap into its event type and event fields.
+
+        @param addr: packet-sending host's IP address, port info
+        @type addr: ( host-ip, port)
+        @param pdu: Net-SNMP object or FakePacket
+        @type pdu: netsnmp_pdu object
+        @return: (eventType, event fields), or None for unknown versions
+        @rtype: tuple
+        """
         # Some misbehaving agents will send SNMPv1 traps contained within
         # an SNMPv2c PDU. So we can't trust tpdu.version to determine what
         # version trap exists within the PDU. We need to assume that a
@@ -777,22 +915,25 @@ class TrapTask(BaseTask, CaptureReplay):
             eventType, result = self.decodeSnmpV2OrV3(addr, pdu)
         else:
             self.log.error("Unable to handle trap version %d", pdu.version)
-            return
+            return None
         self.log.debug("asyncHandleTrap: eventType=%s oid=%s snmpVersion=%s",
                        eventType, result['oid'], result['snmpVersion'])
+        return eventType, result
 
-        community = self.getCommunity(pdu)
-        result['zenoss.trap_source_ip'] = addr[0]
-        self.sendTrapEvent(result, community, eventType,
-                           startProcessTime)
+    def _decodedTrap(self, decoded):
+        """
+        Send the event for a trap decoded by a receiver process.
 
-        if self.isReplaying():
-            self.replayed += 1
-            # Don't attempt to respond back if we're replaying packets
+        @param decoded: (TRAP, (eventType, result, community,
+            startProcessTime)) or (FILTER_DROPPED, None)
+        @type decoded: tuple
+        """
+        kind, value = decoded
+        if kind == FILTER_DROPPED:
+            self._daemon.counters['eventFilterDroppedCount'] += 1
             return
-
-        if pdu.command == netsnmp.SNMP_MSG_INFORM:
-            self.snmpInform(addr, pdu)
+        eventType, result, community, startProcessTime = value
+        self.sendTrapEvent(result, community, eventType, startProcessTime)
 
     def sendTrapEvent(self, result, community, eventType, startProcessTime):
         summary = 'snmp trap %s' % eventType
@@ -818,6 +959,8 @@ class TrapTask(BaseTask, CaptureReplay):
 %.5f average seconds per event
 Maximum processing time for one event was %.5f""" % (
                        (totalTime / totalEvents), maxTime)
+        if self._receivers is not None:
+            display += "\n" + self._receivers.displayStatistics()
         return display
 
     def cleanup(self):
@@ -825,6 +968,37 @@ Maximum processing time for one event was %.5f""" % (
             self.session.close()
         status = self.displayStatistics()
         self.log.info(status)
+        if self._receivers is not None:
+            self._receivers.stop()
+
+
+class TrapDecoder(object):
+    """
+    Decodes and filters the traps handed to a receiver process.
+    """
+
+    def __init__(self, task):
+        self._task = task
+        self.trapFilter = TrapFilter()
+
+    def configure(self, config):
+        oidMap, trapFilters = config
+        self._task.oidMap = oidMap
+        self.trapFilter = TrapFilter()
+        self.trapFilter.initializeReceiver(self._task._daemon)
+        self.trapFilter.updateFilter(trapFilters)
+
+    def __call__(self, data, addr):
+        packet, startProcessTime = data
+        decoded = self._task.decodeTrap(addr, packet)
+        if decoded is None:
+            return []
+        eventType, result = decoded
+        if self.trapFilter.isFiltered(result):
+            return [(FILTER_DROPPED, None)]
+        result['zenoss.trap_source_ip'] = addr[0]
+        community = self._task.getCommunity(packet)
+        return [(TRAP, (eventType, result, community, startProcessTime))]
 
 
 class Decoders:
@@ -964,7 +1138,8 @@ class MibConfigTask(ObservableMixin):
         self._preferences = taskConfig
         self._daemon = getUtility(ICollector)
 
-        self._daemon.oidMap = self._preferences.oidMap
+        self._daemon.oidMap = OidMap(self._preferences.oidMap)
+        self._daemon.configureReceivers()
 
     def doTask(self):
         return defer.succeed("Already updated OID -> name mappings...")
@@ -978,6 +1153,8 @@ class TrapDaemon(CollectorDaemon):
     _frameworkFactoryName = "nosip"
 
     def __init__(self, *args, **kwargs):
+        self.receivers = None
+        self._trapFilters = None
         self._trapFilter = TrapFilter()
         provideUtility(self._trapFilter, ICollectorEventTransformer)
         kwargs["initializationCallback"] = self._initializeTrapFilter
@@ -1033,11 +1210,28 @@ class TrapDaemon(CollectorDaemon):
         else:
             self._prefs.task.session.create_users(users)
 
+    def setReceivers(self, receivers):
+        """
+        Have the receiver processes decode and filter the traps.
+        """
+        self.receivers = receivers
+        self._trapFilter.enabled = False
+        self.configureReceivers()
+
+    def configureReceivers(self):
+        """
+        Send the receiver processes the OID map and the trap filters.
+        """
+        if self.receivers is not None:
+            self.receivers.configure((self.oidMap.names, self._trapFilters))
+
     def _updateConfig(self, cfg):
         result = super(TrapDaemon, self)._updateConfig(cfg)
         if result:
             self._trapFilter._resetFilters()
             self._trapFilter.updateFilter(cfg.trapFilters)
+            self._trapFilters = cfg.trapFilters
+            self.configureReceivers()
         return result
 
     def _displayStatistics(self, verbose=False):
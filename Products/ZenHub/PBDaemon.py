@@ -60,6 +60,7 @@ from Products.ZenUtils.metricwriter import (
     ThresholdNotifier,
 )
 from Products.ZenUtils.PBUtil import ReconnectingPBClientFactory
+from Products.ZenUtils.segmentqueue import SegmentFileQueue
 from Products.ZenUtils.Utils import zenPath, atomicWrite
 from Products.ZenUtils.ZenDaemon import ZenDaemon
 
@@ -408,6 +409,216 @@ class DeDupingEventQueue(BaseEventQueue):
         return self.queue.itervalues()
 
 
+class SpillingEventQueue(DeDupingEventQueue):
+    """
+    Event queue implementation that keeps up to memlen events in memory
+    and spills the rest to a SegmentFileQueue in directory.  Events left
+    on disk are queued again when the daemon restarts.
+
+    Events are read back from disk chunksize at a time.  If deduplicate is
+    True, an event with the same fingerprint as a spilled event is written
+    to disk again with an updated 'count' and the earlier copy is skipped
+    when read back; the fingerprints of the spilled events are tracked in
+    memory for this.  Once the skipped copies outnumber the live events,
+    the live events are rewritten to new files without them.
+
+    The files use at most maxbytes bytes (0 means no limit).  When they
+    are full, new events are discarded, while repeats of spilled events
+    only update the count kept in memory.
+    """
+
+    def __init__(
+        self,
+        maxlen,
+        directory,
+        memlen=1000,
+        chunksize=50,
+        deduplicate=True,
+        maxbytes=0,
+    ):
+        super(SpillingEventQueue, self).__init__(maxlen)
+        self.memlen = max(1, min(memlen, maxlen))
+        self.chunksize = max(1, chunksize)
+        self.deduplicate = deduplicate
+        self.maxbytes = maxbytes
+        self._seq = 0
+        # fingerprint -> [seq of the live record, count, firstTime]
+        self._spooled = {}
+        # number of records on disk superseded by a later record
+        self._dead = 0
+        self._store = SegmentFileQueue(directory)
+        for seq, fingerprint, event in self._store.records():
+            self._seq = max(self._seq, seq)
+            if fingerprint in self._spooled:
+                self._dead += 1
+            self._index(seq, fingerprint, event)
+        if not self._spooled:
+            self._store.clear()
+            self._dead = 0
+
+    def _next_seq(self):
+        self._seq += 1
+        return self._seq
+
+    def _fingerprint(self, event):
+        # Without de-duplication, every event gets a unique key.
+        if self.deduplicate:
+            return self._event_fingerprint(event)
+        return self._next_seq()
+
+    def _index(self, seq, fingerprint, event):
+        self._spooled[fingerprint] = [
+            seq,
+            event.get("count", 1),
+            event.get("firstTime", event["rcvtime"]),
+        ]
+
+    def _spool(self, fingerprint, event):
+        if fingerprint in self._spooled:
+            self._dead += 1
+        seq = self._next_seq()
+        self._store.append((seq, fingerprint, event))
+        self._index(seq, fingerprint, event)
+        if self._dead > max(len(self._spooled), self.chunksize):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the spilled events without their superseded records."""
+        self._store.rewrite(
+            (seq, fingerprint, event)
+            for fingerprint, event, (seq, _, _) in self._live(
+                self._store.records()
+            )
+        )
+        self._dead = 0
+
+    def _full(self):
+        return self.maxbytes and self._store.size >= self.maxbytes
+
+    def _live(self, records):
+        for seq, fingerprint, event in records:
+            entry = self._spooled.get(fingerprint)
+            if entry is not None and entry[0] == seq:
+                yield fingerprint, event, entry
+
+    def _load(self):
+        while self._spooled and len(self.queue) < self.chunksize:
+            records = self._store.read(self.chunksize - len(self.queue))
+            if not records:
+                break
+            for fingerprint, event, entry in self._live(records):
+                del self._spooled[fingerprint]
+                if entry[1] > 1:
+                    event["count"] = entry[1]
+                    event["firstTime"] = entry[2]
+                self.queue[fingerprint] = event
+        if not self._spooled:
+            self._store.clear()
+
+    def append(self, event):
+        # Make sure every processed event specifies the time it was queued.
+        if "rcvtime" not in event:
+            event["rcvtime"] = time.time()
+
+        fingerprint = self._fingerprint(event)
+        if fingerprint in self.queue:
+            current_event = self.queue.pop(fingerprint)
+            event["count"] = current_event.get("count", 1) + 1
+            event["firstTime"] = self._first_time(current_event, event)
+            self.queue[fingerprint] = event
+            return
+        entry = self._spooled.get(fingerprint)
+        if entry is not None:
+            firstTime = min(entry[2], event.get("firstTime", event["rcvtime"]))
+            if self._full():
+                entry[1] += 1
+                entry[2] = firstTime
+                return
+            event["count"] = entry[1] + 1
+            event["firstTime"] = firstTime
+            self._spool(fingerprint, event)
+            return
+
+        if (self._spooled or len(self.queue) >= self.memlen) and self._full():
+            return event
+
+        discarded = None
+        if len(self) >= self.maxlen:
+            discarded = self.popleft()
+
+        if not self._spooled and len(self.queue) < self.memlen:
+            self.queue[fingerprint] = event
+        else:
+            self._spool(fingerprint, event)
+        return discarded
+
+    def popleft(self):
+        if not self.queue:
+            self._load()
+        return super(SpillingEventQueue, self).popleft()
+
+    def extendleft(self, events):
+        events_to_add = []
+        for event in events:
+            fingerprint = self._fingerprint(event)
+            if fingerprint in self.queue:
+                current_event = self.queue[fingerprint]
+                current_event["count"] = current_event.get("count", 1) + 1
+                current_event["firstTime"] = self._first_time(
+                    current_event, event
+                )
+                continue
+            entry = self._spooled.get(fingerprint)
+            if entry is not None:
+                entry[1] += 1
+                entry[2] = min(
+                    entry[2], event.get("firstTime", event["rcvtime"])
+                )
+                continue
+            events_to_add.append((fingerprint, event))
+
+        if not events_to_add:
+            return []
+        available = self.maxlen - len(self)
+        if available <= 0:
+            return [event for _, event in events_to_add]
+        to_discard = max(0, len(events_to_add) - available)
+        discarded = [event for _, event in events_to_add[:to_discard]]
+
+        # Events that don't fit in memory go to the front of the disk queue,
+        # followed by the events they displace from memory.
+        items = events_to_add[to_discard:] + self.queue.items()
+        self.queue = collections.OrderedDict(items[: self.memlen])
+        records = []
+        for fingerprint, event in items[self.memlen :]:
+            seq = self._next_seq()
+            records.append((seq, fingerprint, event))
+            self._index(seq, fingerprint, event)
+        self._store.prepend(records)
+        return discarded
+
+    def close(self):
+        """Save the events held in memory to disk."""
+        self._store.prepend(
+            [
+                (self._next_seq(), fingerprint, event)
+                for fingerprint, event in self.queue.iteritems()
+            ]
+        )
+        self.queue.clear()
+        self._spooled.clear()
+        self._store.close()
+
+    def __len__(self):
+        return len(self.queue) + len(self._spooled)
+
+    def __iter__(self):
+        return chain(
+            self.queue.itervalues(),
+            (event for _, event, _ in self._live(self._store.records())),
+        )
+
+
 class EventQueueManager(object):
 
     CLEAR_FINGERPRINT_FIELDS = (
@@ -424,6 +635,7 @@ class EventQueueManager(object):
         self.discarded_events = 0
         # TODO: Do we want to limit the size of the clear event dictionary?
         self.clear_events_count = {}
+        self._spillQueues = self._createSpillQueues()
         self._initQueues()
         self._eventsSent = Metrology.meter("collectordaemon.eventsSent")
         self._discardedEvents = Metrology.meter(
@@ -441,7 +653,29 @@ class EventQueueManager(object):
 
             Metrology.gauge("collectordaemon.eventQueue", EventQueueGauge())
 
+    def _createSpillQueues(self):
+        spooldir = getattr(self.options, "eventspooldir", None)
+        if not spooldir:
+            return None
+        options = self.options
+        return tuple(
+            SpillingEventQueue(
+                options.maxqueuelen,
+                os.path.join(spooldir, name),
+                memlen=options.eventspoolmemorylen,
+                chunksize=options.eventflushchunksize,
+                deduplicate=options.deduplicate_events,
+                maxbytes=options.eventspoolmaxsize * 1024 * 1024,
+            )
+            for name in ("events", "perf")
+        )
+
     def _initQueues(self):
+        if self._spillQueues:
+            # The spilling queues persist; they are drained in place.
+            self.event_queue, self.perf_event_queue = self._spillQueues
+            self.heartbeat_event_queue = collections.deque(maxlen=1)
+            return
         maxlen = self.options.maxqueuelen
         queue_type = (
             DeDupingEventQueue
@@ -452,6 +686,11 @@ class EventQueueManager(object):
         self.perf_event_queue = queue_type(maxlen)
         self.heartbeat_event_queue = collections.deque(maxlen=1)
 
+    def close(self):
+        """Save the queued events to disk if event spooling is enabled."""
+        for queue in self._spillQueues or ():
+            queue.close()
+
     def _transformEvent(self, event):
         for transformer in self.transformers:
             result = transformer.transform(event)
@@ -556,6 +795,18 @@ class EventQueueManager(object):
         prev_event_queue = self.event_queue
         self._initQueues()
 
+        # Only send the events queued so far; a queue that isn't replaced
+        # by _initQueues keeps receiving events while this batch is sent.
+        remaining = {
+            prev_perf_event_queue: len(prev_perf_event_queue),
+            prev_event_queue: len(prev_event_queue),
+        }
+
+        def drain(queue, count):
+            count = min(count, remaining[queue], len(queue))
+            remaining[queue] -= count
+            return [queue.popleft() for i in xrange(count)]
+
         perf_events = []
         events = []
         sent = 0
@@ -573,18 +824,10 @@ class EventQueueManager(object):
                     )
                 chunk_remaining -= num_heartbeat_events
 
-                perf_events = []
-                num_perf_events = min(
-                    chunk_remaining, len(prev_perf_event_queue)
-                )
-                for i in xrange(num_perf_events):
-                    perf_events.append(prev_perf_event_queue.popleft())
-                chunk_remaining -= num_perf_events
-
-                events = []
-                num_events = min(chunk_remaining, len(prev_event_queue))
-                for i in xrange(num_events):
-                    events.append(prev_event_queue.popleft())
+                perf_events = drain(prev_perf_event_queue, chunk_remaining)
+                chunk_remaining -= len(perf_events)
+
+                events = drain(prev_event_queue, chunk_remaining)
                 return heartbeat_events, perf_events, events
 
             heartbeat_events, perf_events, events = chunk_events()
@@ -608,7 +851,8 @@ class EventQueueManager(object):
             defer.returnValue(sent)
         except Exception:
             # Restore performance events that failed to send
-            perf_events.extend(prev_perf_event_queue)
+            if prev_perf_event_queue is not self.perf_event_queue:
+                perf_events.extend(prev_perf_event_queue)
             discarded_perf_events = self.perf_event_queue.extendleft(
                 perf_events
             )
@@ -616,7 +860,8 @@ class EventQueueManager(object):
             self._discardedEvents.mark(len(discarded_perf_events))
 
             # Restore events that failed to send
-            events.extend(prev_event_queue)
+            if prev_event_queue is not self.event_queue:
+                events.extend(prev_event_queue)
             discarded_events = self.event_queue.extendleft(events)
             self.discarded_events += len(discarded_events)
             self._discardedEvents.mark(len(discarded_events))
@@ -687,6 +932,10 @@ class PBDaemon(ZenDaemon, pb.Referenceable):
         self._metric_writer = None
         self._derivative_tracker = None
         self._metrologyReporter = None
+        # Save events that could not be sent when spooling to disk
+        reactor.addSystemEventTrigger(
+            "after", "shutdown", self.eventQueueManager.close
+        )
         # Add a shutdown trigger to send a stop event and flush the event queue
         reactor.addSystemEventTrigger("before", "shutdown", self._stopPbDaemon)
 
@@ -750,9 +999,29 @@ class PBDaemon(ZenDaemon, pb.Referenceable):
 
     def derivativeTracker(self):
         if not self._derivative_tracker:
-            self._derivative_tracker = DerivativeTracker()
+            self._derivative_tracker = DerivativeTracker(
+                maxsize=self.options.derivativeMaxSeries,
+                maxage=self.options.derivativeMaxAge or None,
+            )
+            if self.options.saveDerivatives:
+                self._derivative_tracker.load(self._derivativesFileName())
         return self._derivative_tracker
 
+    def _derivativesFileName(self):
+        instance_id = os.environ.get("CONTROLPLANE_INSTANCE_ID")
+        return zenPath(
+            "var",
+            "%s_%s_%s_derivatives.pickle"
+            % (self.name, self.options.monitor, instance_id),
+        )
+
+    def _saveDerivatives(self):
+        if self._derivative_tracker and self.options.saveDerivatives:
+            try:
+                self._derivative_tracker.save(self._derivativesFileName())
+            except Exception:
+                self.log.exception("Unable to save the COUNTER/DERIVE state")
+
     def connecting(self):
         """
         Called when about to connect to zenhub
@@ -994,6 +1263,7 @@ class PBDaemon(ZenDaemon, pb.Referenceable):
         if self.stopped:
             return
         self.stopped = True
+        self._saveDerivatives()
         if "EventService" in self.services:
             # send stop event if we don't have an implied --cycle,
             # or if --cycle has been specified
@@ -1392,6 +1662,57 @@ class PBDaemon(ZenDaemon, pb.Referenceable):
             action="store_false",
             help="Disable event de-duplication",
         )
+        self.parser.add_option(
+            "--derivative-max-series",
+            dest="derivativeMaxSeries",
+            default=0,
+            type="int",
+            help="Maximum number of COUNTER/DERIVE metrics whose last "
+            "value is kept to compute rates; the least recently updated "
+            "ones are dropped beyond this. 0 for no limit; default %default",
+        )
+        self.parser.add_option(
+            "--derivative-max-age",
+            dest="derivativeMaxAge",
+            default=86400,
+            type="int",
+            help="Seconds after which the last value of a COUNTER/DERIVE "
+            "metric that hasn't been updated is dropped. 0 to keep them "
+            "forever; default %default",
+        )
+        self.parser.add_option(
+            "--disable-derivative-persistence",
+            dest="saveDerivatives",
+            default=True,
+            action="store_false",
+            help="Don't save the last values of COUNTER/DERIVE metrics on "
+            "shutdown, so rates are not computed across a restart",
+        )
+        self.parser.add_option(
+            "--eventspooldir",
+            dest="eventspooldir",
+            default="",
+            help="Directory in which queued events that don't fit in "
+            "memory are stored until they can be sent; events in this "
+            "directory are also kept across restarts. Disabled by default",
+        )
+        self.parser.add_option(
+            "--eventspoolmemorylen",
+            dest="eventspoolmemorylen",
+            default=1000,
+            type="int",
+            help="Number of queued events kept in memory when "
+            "--eventspooldir is set; default %default",
+        )
+        self.parser.add_option(
+            "--eventspoolmaxsize",
+            dest="eventspoolmaxsize",
+            default=1024,
+            type="int",
+            help="Maximum size in MB of each of the event and performance "
+            "event spools; once it is reached, new events are discarded. "
+            "0 means no limit; default %default",
+        )
 
         self.parser.add_option(
             "--redis-url",
@@ -34,7 +34,7 @@ from .interfaces import (
     IInvalidationOid,
     IInvalidationProcessor,
 )
-from .invalidations import INVALIDATIONS_PAUSED
+from .invalidations import INVALIDATIONS_PAUSED, batches, prefetch
 
 log = logging.getLogger("zen.{}".format(__name__.split(".")[-1].lower()))
 
@@ -63,6 +63,7 @@ class InvalidationManager(object):
         poll_invalidations,
         send_event,
         poll_interval=30,
+        batch_size=0,
     ):
         self.__dmd = dmd
         self.__syncdb = syncdb
@@ -70,6 +71,7 @@ class InvalidationManager(object):
         self.__poll_invalidations = poll_invalidations
         self.__send_event = send_event
         self.poll_interval = poll_interval
+        self.batch_size = batch_size
         self._queue = set()
 
         self._currently_paused = False
@@ -134,6 +136,10 @@ class InvalidationManager(object):
                 log.debug("no invalidations found: oids=%s", oids)
                 return
 
+            if self.batch_size:
+                yield self._process_batched(oids)
+                return
+
             for oid in oids:
                 yield self.invalidation_pipeline.run(oid)
 
@@ -148,6 +154,35 @@ class InvalidationManager(object):
             self.totalTime += time() - now
             log.debug("end process_invalidations")
 
+    @inlineCallbacks
+    def _process_batched(self, oids):
+        """
+        Process the oids in batches of batch_size.
+
+        Duplicate oids are dropped, and each batch is prefetched from the
+        database before being run through the pipeline.  The pipeline
+        transforms the oids of components into the oid of their device, so
+        the processor receives each changed device once, however many of
+        its components changed, and fires one event per device.
+        """
+        try:
+            unique = sorted(set(oids))
+            for batch in batches(unique, self.batch_size):
+                prefetch(self.__dmd, batch)
+                for oid in batch:
+                    self.invalidation_pipeline.run(oid)
+            self.log.debug(
+                "Processed %s raw invalidations (%s unique) into %s",
+                len(oids),
+                len(unique),
+                len(self._queue),
+            )
+            yield self.processor.processQueue(
+                sorted(self._queue), batch_size=self.batch_size
+            )
+        finally:
+            self._queue.clear()
+
     @inlineCallbacks
     def _syncdb(self):
         try:
@@ -11,6 +11,7 @@ import logging
 
 from BTrees.IIBTree import IITreeSet
 from twisted.internet import defer
+from ZODB.POSException import POSKeyError
 from ZODB.utils import u64
 from zope.component import adapter, getGlobalSiteManager
 from zope.interface import implementer, providedBy
@@ -44,7 +45,36 @@ def betterObjectEventNotify(event):
         yield giveTimeToReactor(subscription, event.object, event)
 
 
-def handle_oid(dmd, oid):
+def objectEventNotifyNow(event):
+    """
+    Like betterObjectEventNotify, but calls the subscribers right away.
+    An exception raised by a subscriber is logged and doesn't keep the
+    other subscribers from being called.  Returns the Deferreds returned
+    by subscribers, if any.
+    """
+    gsm = getGlobalSiteManager()
+    subscriptions = gsm.adapters.subscriptions(
+        map(providedBy, (event.object, event)), None
+    )
+    deferreds = []
+    for subscription in subscriptions:
+        try:
+            result = subscription(event.object, event)
+        except Exception:
+            log.exception(
+                "Error notifying %s of %r", subscription, event.object
+            )
+        else:
+            if isinstance(result, defer.Deferred):
+                deferreds.append(result)
+    return deferreds
+
+
+def make_event(dmd, oid):
+    """
+    Return an UpdateEvent or DeletionEvent for the object with the given
+    oid, or None if no event should be fired for it.
+    """
     # Go pull the object out of the database
     obj = dmd._p_jar[oid]
     # Don't bother with all the catalog stuff; we're depending on primaryAq
@@ -59,15 +89,41 @@ def handle_oid(dmd, oid):
             # Object has been removed from its primary path (i.e. was
             # deleted), so make a DeletionEvent
             log.debug("Notifying services that %r has been deleted", obj)
-            event = DeletionEvent(obj, oid)
+            return DeletionEvent(obj, oid)
         else:
             # Object was updated, so make an UpdateEvent
             log.debug("Notifying services that %r has been updated", obj)
-            event = UpdateEvent(obj, oid)
+            return UpdateEvent(obj, oid)
+
+
+def handle_oid(dmd, oid):
+    event = make_event(dmd, oid)
+    if event is not None:
         # Fire the event for all interested services to pick up
         return betterObjectEventNotify(event)
 
 
+def prefetch(dmd, oids):
+    """
+    Load the states of the given objects from the database in bulk, if
+    the storage supports it, so that they aren't loaded one at a time.
+    """
+    jar = dmd._p_jar
+    if not hasattr(jar, "prefetch"):
+        return
+    try:
+        jar.prefetch(oids)
+    except Exception:
+        log.debug("Unable to prefetch %s objects", len(oids), exc_info=True)
+
+
+def batches(items, size):
+    """Yield successive lists of at most size items from items."""
+    items = list(items)
+    for i in xrange(0, len(items), size):
+        yield items[i:i + size]
+
+
 @implementer(IInvalidationProcessor)
 class InvalidationProcessor(object):
     """
@@ -91,13 +147,16 @@ class InvalidationProcessor(object):
         self._hub_ready.callback(self._hub)
 
     @defer.inlineCallbacks
-    def processQueue(self, oids):
+    def processQueue(self, oids, batch_size=None):
         yield self._hub_ready
         i = 0
         queue = self._invalidation_queue
         if self._hub.dmd.pauseHubNotifications:
             log.debug("notifications are currently paused")
             defer.returnValue(INVALIDATIONS_PAUSED)
+        if batch_size:
+            count = yield self._processBatches(oids, batch_size)
+            defer.returnValue(count)
         for i, oid in enumerate(oids):
             ioid = u64(oid)
             # Try pushing it into the queue, which is an IITreeSet.
@@ -108,6 +167,39 @@ class InvalidationProcessor(object):
                 yield d
         defer.returnValue(i)
 
+    @defer.inlineCallbacks
+    def _processBatches(self, oids, batch_size):
+        """
+        Fire the events for the oids in batches of batch_size.  Each batch
+        is prefetched from the database and its events are fired without
+        returning to the reactor, which is only given time between batches.
+        """
+        dmd = self._hub.dmd
+        queue = self._invalidation_queue
+        count = 0
+        for batch in batches(oids, batch_size):
+            batch = [oid for oid in batch if queue.insert(u64(oid))]
+            prefetch(dmd, batch)
+            pending = []
+            for oid in batch:
+                try:
+                    event = make_event(dmd, oid)
+                    if event is not None:
+                        pending.extend(objectEventNotifyNow(event))
+                except POSKeyError:
+                    log.debug("Object %s is no longer in the database", oid)
+                except Exception:
+                    log.exception("Error processing invalidation %r", oid)
+                finally:
+                    queue.remove(u64(oid))
+            count += len(batch)
+            results = yield defer.DeferredList(pending, consumeErrors=True)
+            for success, result in results:
+                if not success:
+                    log.error("Error notifying services: %s", result)
+            yield giveTimeToReactor(_noop)
+        defer.returnValue(count)
+
     def _dispatch(self, dmd, oid, ioid, queue):
         """
         Send to all the services that care by firing events.
@@ -116,3 +208,7 @@ class InvalidationProcessor(object):
             return handle_oid(dmd, oid)
         finally:
             queue.remove(ioid)
+
+
+def _noop():
+    pass
@@ -0,0 +1,113 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Compare the metric encoding of RedisListPublisher with the generic
+dict-based encoding.
+
+    python -m Products.ZenHub.metricpublisher.benchmark [-n COUNT]
+
+Reports metrics/sec for both paths, the bytes held per encoded metric and
+how much the peak resident memory grows while a whole workload of encoded
+metrics is held, as they are in the publisher's queue until a flush.
+Each path runs in its own forked process, so that the peaks are separate.
+"""
+
+import argparse
+import cPickle as pickle
+import gc
+import os
+import resource
+import sys
+import time
+
+from .publisher import RedisListPublisher
+
+
+def _workload(count, devices=100):
+    """Return (metric, value, timestamp, tags) tuples resembling the output
+    of a collector that polls several datapoints per device."""
+    tags = [
+        {
+            "device": "device%d" % i,
+            "contextUUID": "%032x" % i,
+            "key": "Devices/device%d" % i,
+            "internal": True,
+        }
+        for i in xrange(devices)
+    ]
+    now = time.time()
+    return [
+        (
+            "device%d/sysUpTime_sysUpTime" % (i % devices),
+            i * 1.5,
+            now + i,
+            tags[i % devices],
+        )
+        for i in xrange(count)
+    ]
+
+
+def _peakRss():
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _measure(encode, workload):
+    gc.collect()
+    before = _peakRss()
+    start = time.time()
+    encoded = [encode(*args) for args in workload]
+    elapsed = time.time() - start
+    return (
+        len(workload) / elapsed,
+        sum(sys.getsizeof(e) for e in encoded) / len(encoded),
+        _peakRss() - before,
+    )
+
+
+def _inChild(function, *args):
+    """Return the result of calling function in a forked process."""
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        with os.fdopen(write, "wb") as f:
+            pickle.dump(function(*args), f, pickle.HIGHEST_PROTOCOL)
+        os._exit(0)
+    os.close(write)
+    with os.fdopen(read, "rb") as f:
+        result = pickle.load(f)
+    os.waitpid(pid, 0)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    # Only the encoding is measured; no connection to redis is made.
+    publisher = RedisListPublisher.__new__(RedisListPublisher)
+    publisher._tagsToFilter = ("internal",)
+    publisher._encodedTags = {}
+
+    workload = _workload(args.count)
+    for name, encode in (
+        ("dict", publisher._build_metric_json),
+        ("pre-encoded", publisher.build_metric),
+    ):
+        rate, perMetric, peak = _inChild(_measure, encode, workload)
+        print(
+            "%-12s %12.0f metrics/sec %6d bytes/metric %12d bytes peak growth"
+            % (name, rate, perMetric, peak)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -35,11 +35,17 @@ defaultRedisPort = 6379
 defaultMaxOutstandingMetrics = 864000000
 
 bufferHighWater = 4096
+# Upper bound on the number of distinct tag sets whose JSON encoding is
+# cached by RedisListPublisher.
+maxEncodedTags = 10000
 HTTP_BATCH = 100
 INITIAL_REDIS_BATCH = 2
 
 log = logging.getLogger("zen.publisher")
 
+# Same key order as the JSON encoding of a BasePublisher.build_metric dict.
+_METRIC_TEMPLATE = '{"timestamp":%s,"metric":%s,"value":%s,"tags":%s}'
+
 
 class BasePublisher(object):
     """
@@ -162,6 +168,7 @@ class RedisListPublisher(BasePublisher):
         self._maxOutstandingMetrics = maxOutstandingMetrics
         self._redis = RedisClientFactory()
         self._flushing = False
+        self._encodedTags = {}
         self._connection = reactor.connectTCP(
             self._host, self._port, self._redis
         )
@@ -169,8 +176,61 @@ class RedisListPublisher(BasePublisher):
 
     def build_metric(self, metric, value, timestamp, tags):
         """
-        Override base method to work with strings instead of dicts
+        Override base method to work with strings instead of dicts.
+
+        The JSON is assembled from pre-encoded parts instead of going
+        through an intermediate dict; the encoded tags are cached since
+        the same tags are published for many metrics.
         """
+        _value = sanitized_float(value)
+        if _value is None:
+            encodedValue = "null"
+        elif _value - _value == 0.0:
+            encodedValue = repr(_value)
+        else:
+            # NaN and infinity.
+            return self._build_metric_json(metric, value, timestamp, tags)
+        if type(timestamp) is float:
+            encodedTimestamp = repr(timestamp)
+        elif type(timestamp) is int:
+            encodedTimestamp = str(timestamp)
+        else:
+            return self._build_metric_json(metric, value, timestamp, tags)
+        encodedTags = self._encode_tags(tags)
+        if encodedTags is None:
+            return self._build_metric_json(metric, value, timestamp, tags)
+        return _METRIC_TEMPLATE % (
+            encodedTimestamp,
+            json.dumps(metric),
+            encodedValue,
+            encodedTags,
+        )
+
+    def _encode_tags(self, tags):
+        """
+        Return the JSON encoding of the tags (less the filtered ones), or
+        None if the tags can't be cached.
+        """
+        try:
+            key = tuple(tags.iteritems())
+            encoded = self._encodedTags.get(key)
+        except (AttributeError, TypeError):
+            # Unhashable tag values.
+            return None
+        if encoded is None:
+            _tags = tags.copy()
+            for name in self._tagsToFilter:
+                _tags.pop(name, None)
+            try:
+                encoded = json.dumps(_tags)
+            except (OverflowError, ValueError):
+                return None
+            if len(self._encodedTags) >= maxEncodedTags:
+                self._encodedTags.clear()
+            self._encodedTags[key] = encoded
+        return encoded
+
+    def _build_metric_json(self, metric, value, timestamp, tags):
         m = BasePublisher.build_metric(self, metric, value, timestamp, tags)
         try:
             return json.dumps(m)
@@ -250,12 +310,25 @@ class RedisListPublisher(BasePublisher):
                 client = self._redis.client
                 try:
                     self._flushing = True
-                    yield client.multi()
-                    yield client.lpush(self._channel, *metrics)
-                    yield client.ltrim(
-                        self._channel, 0, self._maxOutstandingMetrics - 1
+                    # Pipeline the transaction; the replies to the queued
+                    # commands are only checked once EXEC has replied.
+                    queued = defer.DeferredList(
+                        [
+                            defer.maybeDeferred(client.multi),
+                            defer.maybeDeferred(
+                                client.lpush, self._channel, *metrics
+                            ),
+                            defer.maybeDeferred(
+                                client.ltrim,
+                                self._channel,
+                                0,
+                                self._maxOutstandingMetrics - 1,
+                            ),
+                        ],
+                        consumeErrors=True,
                     )
                     result, _ = yield client.execute()
+                    yield queued
                     yield self._metrics_published(
                         result,
                         metricCount=len(metrics),
@@ -175,6 +175,35 @@ class RedisPublisherTest(TestCase):
         self.assertEqual(metric, self.metric)
         self.assertIsInstance(metric, str)
 
+    def test_build_metric_matches_dict_encoding(self):
+        tags = {"device": "d1", "internal": True, "key": u"Devices/d1"}
+        for value, timestamp in (
+            ("1.5", 1535460634.26479),
+            ("n/a", 1),
+            (float("nan"), 1),
+            (2, 2 ** 70),
+        ):
+            self.assertEqual(
+                json.loads(
+                    self.pub.build_metric("m", value, timestamp, tags)
+                ),
+                json.loads(
+                    self.pub._build_metric_json("m", value, timestamp, tags)
+                ),
+            )
+
+    def test_build_metric_caches_encoded_tags(self):
+        tags = {"device": "d1", "internal": True}
+        self.pub.build_metric("m1", 1, 1, tags)
+        self.pub.build_metric("m2", 2, 2, dict(tags))
+        self.assertEqual(len(self.pub._encodedTags), 1)
+        self.assertEqual(
+            json.loads(self.pub._encodedTags.values()[0]), {"device": "d1"}
+        )
+        tags["device"] = "d2"
+        metric = json.loads(self.pub.build_metric("m1", 1, 1, tags))
+        self.assertEqual(metric["tags"], {"device": "d2"})
+
     @patch(
         "Products.ZenHub.metricpublisher.publisher.reactor",
         autospec=True,
@@ -230,6 +259,30 @@ class RedisPublisherTest(TestCase):
         )
         self.pub._metrics_published.assert_called_once_with(1, 1, 0)
 
+    def test__put_pipelines_transaction(self):
+        self.pub._reschedule_pubtask = create_autospec(
+            self.pub._reschedule_pubtask, spec_set=True
+        )
+        self.pub._connection = create_autospec(self.pub._connection)
+        self.pub._connection.state = "connected"
+        client = self.pub._redis.client = Mock(
+            spec_set=["multi", "lpush", "ltrim", "execute"]
+        )
+        replies = [defer.Deferred() for _ in range(3)]
+        client.multi.return_value = replies[0]
+        client.lpush.return_value = replies[1]
+        client.ltrim.return_value = replies[2]
+        client.execute.return_value = defer.Deferred()
+        self.pub.put("m", "0", 1, {})
+        result = self.pub._put(scheduled=SCHEDULED, reschedule=True)
+
+        # Every command is sent before any reply arrives.
+        client.execute.assert_called_once_with()
+        for reply in replies:
+            reply.callback("QUEUED")
+        client.execute.return_value.callback((1, 1))
+        self.assertEqual(result.result, 0)
+
     def test__put_fail(self):
         # check the put when there is Exception in writing to Redis
         self.pub._publish_failed = create_autospec(
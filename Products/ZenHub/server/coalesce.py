@@ -0,0 +1,115 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from __future__ import absolute_import
+
+import cPickle as pickle
+
+from metrology import Metrology
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from .utils import getLogger
+
+
+class ServiceCallCoalescer(object):
+    """Shares one execution among identical in-flight service calls.
+
+    A service call is coalesced with an earlier call that hasn't completed
+    yet if both have the same monitor, service, method and arguments, and
+    the call matches one of the configured "service:method" patterns.
+    Either part of a pattern may be "*" to match any name.  Only idempotent
+    methods should be configured; the coalesced calls receive the result
+    (or failure) of the earlier call.
+    """
+
+    @classmethod
+    def from_config(cls, calls):
+        """Return a ServiceCallCoalescer initialized from config.
+
+        :param calls: The "service:method" patterns of calls to coalesce.
+        :type calls: Sequence[str]
+        """
+        return cls(tuple(call.split(":")) for call in calls)
+
+    def __init__(self, calls):
+        """Initialize a ServiceCallCoalescer instance.
+
+        :param calls: (service, method) patterns of calls to coalesce.
+        :type calls: Iterable[Tuple[str, str]]
+        """
+        self.__calls = frozenset(calls)
+        self.__inflight = {}
+        self.__meter = Metrology.meter("zenhub.coalescedCalls")
+        self.__log = getLogger(self)
+        self.coalesced = 0
+
+    def submit(self, call, executor):
+        """Submit the call to the executor unless an identical call is
+        already being executed.
+
+        Returns a Deferred that fires with the result of the call.
+
+        :type call: .service.ServiceCall
+        :type executor: IServiceExecutor
+        """
+        key = self.__key(call)
+        if key is None:
+            return executor.submit(call)
+        waiters = self.__inflight.get(key)
+        if waiters is not None:
+            self.coalesced += 1
+            self.__meter.mark()
+            self.__log.debug(
+                "Coalesced service call service=%s method=%s monitor=%s",
+                call.service,
+                call.method,
+                call.monitor,
+            )
+            dfr = defer.Deferred()
+            waiters.append(dfr)
+            return dfr
+        self.__inflight[key] = []
+        dfr = defer.maybeDeferred(executor.submit, call)
+        dfr.addBoth(self.__complete, key)
+        return dfr
+
+    def __complete(self, result, key):
+        for waiter in self.__inflight.pop(key):
+            if isinstance(result, Failure):
+                waiter.errback(result)
+            else:
+                waiter.callback(result)
+        return result
+
+    def __key(self, call):
+        if not self.__matches(call.service, call.method):
+            return None
+        try:
+            args = pickle.dumps(
+                (call.args, sorted(call.kwargs.items())),
+                pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception:
+            # Arguments that can't be compared aren't coalesced.
+            return None
+        return (call.monitor, call.service, call.method, args)
+
+    def __matches(self, service, method):
+        calls = self.__calls
+        return (
+            (service, method) in calls
+            or ("*", method) in calls
+            or (service, "*") in calls
+            or ("*", "*") in calls
+        )
+
+    def __len__(self):
+        """Return the number of coalescable calls in flight."""
+        return len(self.__inflight)
@@ -50,6 +50,10 @@ class ModuleObjectConfig(object):
     def routes(self):
         return self.__config.routes
 
+    @property
+    def coalesced_calls(self):
+        return self.__config.coalesced_calls
+
     @property
     def modeling_pause_timeout(self):
         return self.__config.modeling_pause_timeout
@@ -212,6 +216,16 @@ priorities = {
 }
 
 
+# Declares the idempotent service calls that may share one execution
+# when identical calls (same monitor and arguments) are in flight at the
+# same time.
+coalesced_calls = [
+    "*:getThresholdClasses",
+    "*:getCollectorThresholds",
+    "*:getConfigProperties",
+]
+
+
 legacy_metric_priority_map = {
     "zenhub.eventWorkList": "EVENTS",
     "zenhub.admWorkList": "MODELING",
@@ -28,6 +28,10 @@ class IHubServerConfig(Interface):
 
     routes = Attribute("Maps ServiceCalls to worklist names.")
 
+    coalesced_calls = Attribute(
+        "Service calls whose identical in-flight calls share one execution."
+    )
+
     modeling_pause_timeout = Attribute(
         "Number of seconds to wait before resuming the execution "
         "of ServiceCalls with MODELING priority.",
@@ -18,6 +18,7 @@ from Products.ZenUtils.PBUtil import setKeepAlive
 from .auth import HubRealm
 from .avatar import HubAvatar
 from .broker import ZenPBServerFactory
+from .coalesce import ServiceCallCoalescer
 from .interface import IHubServerConfig
 from .router import ServiceCallRouter
 from .service import (
@@ -98,9 +99,13 @@ def make_service_manager(pools):
     # returns a dict having <executor-name>: <executor-instance>
     executors = make_executors(config, pools)
 
+    coalescer = ServiceCallCoalescer.from_config(config.coalesced_calls)
+
     # Build the ZenHub service manager
     loader = ServiceLoader()
-    factory = ServiceReferenceFactory(WorkerInterceptor, routes, executors)
+    factory = ServiceReferenceFactory(
+        WorkerInterceptor, routes, executors, coalescer
+    )
     return ServiceManager(registry, loader, factory)
 
 
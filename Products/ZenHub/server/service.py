@@ -192,7 +192,7 @@ class ServiceCall(object):
 class ServiceReferenceFactory(object):
     """Builds WorkerInterceptor objects."""
 
-    def __init__(self, cls, routes, executors):
+    def __init__(self, cls, routes, executors, coalescer=None):
         """Initialize an instance of ServiceReferenceFactory.
 
         :param cls: The class this factory builds
@@ -200,9 +200,13 @@ class ServiceReferenceFactory(object):
         :type routes: Mapping[ServiceCall, str]
         :param executors: registry of executors
         :type executors: Mapping[str, ServiceExecutor]
+        :param coalescer: Shares results among identical service calls.
+        :type coalescer: .coalesce.ServiceCallCoalescer
         """
         self.__cls = cls
         self.__kwargs = {"routes": routes, "executors": executors}
+        if coalescer is not None:
+            self.__kwargs["coalescer"] = coalescer
 
     def __call__(self, service, name, monitor):
         """Build and return a WorkerInterceptor object.
@@ -224,7 +228,9 @@ class ServiceReference(pb.Referenceable):
     service.
     """
 
-    def __init__(self, service, name, monitor, routes, executors):
+    def __init__(
+        self, service, name, monitor, routes, executors, coalescer=None
+    ):
         """Initialize an instance of ServiceReference.
 
         :param service: The service object.
@@ -235,12 +241,15 @@ class ServiceReference(pb.Referenceable):
         :type routes: Mapping[ServiceCall, str]
         :param executors: registry of executors.
         :type executors: Mapping[str, ServiceExecutor]
+        :param coalescer: Shares results among identical service calls.
+        :type coalescer: .coalesce.ServiceCallCoalescer
         """
         self.__service = service
         self.__name = name
         self.__monitor = monitor
         self.__executors = executors
         self.__routes = routes
+        self.__coalescer = coalescer
         self.__log = getLogger(self)
 
         # Required to exist by HubService derived classes.
@@ -274,7 +283,10 @@ class ServiceReference(pb.Referenceable):
                 self.__name,
                 self.__monitor,
             )
-            state = yield executor.submit(call)
+            if self.__coalescer is not None:
+                state = yield self.__coalescer.submit(call, executor)
+            else:
+                state = yield executor.submit(call)
             response = broker.serialize(state, self.perspective)
             success = True
             defer.returnValue(response)
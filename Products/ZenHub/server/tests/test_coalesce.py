@@ -0,0 +1,93 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from __future__ import absolute_import
+
+from mock import Mock, patch
+from twisted.internet import defer
+from unittest import TestCase
+
+from ..coalesce import ServiceCallCoalescer
+from ..service import ServiceCall
+
+PATH = {"src": "Products.ZenHub.server.coalesce"}
+
+
+def make_call(method="getConfigProperties", monitor="localhost", *args):
+    return ServiceCall(
+        monitor=monitor,
+        service="Svc",
+        method=method,
+        args=args,
+        kwargs={},
+    )
+
+
+class ServiceCallCoalescerTest(TestCase):
+    """Test the ServiceCallCoalescer class."""
+
+    def setUp(self):
+        self.metrology_patcher = patch(
+            "{src}.Metrology".format(**PATH), autospec=True,
+        )
+        self.metrology = self.metrology_patcher.start()
+        self.addCleanup(self.metrology_patcher.stop)
+
+        self.coalescer = ServiceCallCoalescer.from_config(
+            ["*:getConfigProperties", "Svc:getThresholdClasses"],
+        )
+        self.pending = defer.Deferred()
+        self.executor = Mock(spec=["submit"])
+        self.executor.submit.return_value = self.pending
+
+    def test_identical_calls_share_execution(self):
+        dfr1 = self.coalescer.submit(make_call(), self.executor)
+        dfr2 = self.coalescer.submit(make_call(), self.executor)
+
+        self.assertEqual(self.executor.submit.call_count, 1)
+        self.assertEqual(len(self.coalescer), 1)
+        self.pending.callback("result")
+        self.assertEqual(dfr1.result, "result")
+        self.assertEqual(dfr2.result, "result")
+        self.assertEqual(self.coalescer.coalesced, 1)
+        self.metrology.meter.return_value.mark.assert_called_once_with()
+        self.assertEqual(len(self.coalescer), 0)
+
+    def test_completed_calls_are_not_shared(self):
+        self.executor.submit.side_effect = lambda call: defer.succeed(None)
+        self.coalescer.submit(make_call(), self.executor)
+        self.coalescer.submit(make_call(), self.executor)
+        self.assertEqual(self.executor.submit.call_count, 2)
+
+    def test_different_calls_are_not_shared(self):
+        self.coalescer.submit(make_call(), self.executor)
+        self.coalescer.submit(make_call(monitor="other"), self.executor)
+        self.coalescer.submit(
+            make_call("getConfigProperties", "localhost", 1), self.executor,
+        )
+        self.coalescer.submit(make_call("getThresholdClasses"), self.executor)
+        self.assertEqual(self.executor.submit.call_count, 4)
+
+    def test_unlisted_calls_are_not_shared(self):
+        self.coalescer.submit(make_call("remote_other"), self.executor)
+        self.coalescer.submit(make_call("remote_other"), self.executor)
+        self.assertEqual(self.executor.submit.call_count, 2)
+        self.assertEqual(len(self.coalescer), 0)
+
+    def test_failure_is_shared(self):
+        dfr1 = self.coalescer.submit(make_call(), self.executor)
+        dfr2 = self.coalescer.submit(make_call(), self.executor)
+        errors = []
+        dfr1.addErrback(errors.append)
+        dfr2.addErrback(errors.append)
+
+        self.pending.errback(ValueError("boom"))
+
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(all(e.check(ValueError) for e in errors))
@@ -40,6 +40,9 @@ class ModuleObjectConfigTest(TestCase):
     def test_routes(self):
         self.assertIs(self.source.routes, self.config.routes)
 
+    def test_coalesced_calls(self):
+        self.assertIs(self.source.coalesced_calls, self.config.coalesced_calls)
+
     def test_modeling_pause_timeout(self):
         self.assertIs(
             self.source.modeling_pause_timeout,
@@ -124,6 +124,7 @@ class MakeServiceManagerTest(TestCase):
 
     @patch("{src}.ServiceManager".format(**PATH), autospec=True)
     @patch("{src}.ServiceReferenceFactory".format(**PATH), autospec=True)
+    @patch("{src}.ServiceCallCoalescer".format(**PATH), autospec=True)
     @patch("{src}.ServiceLoader".format(**PATH), autospec=True)
     @patch("{src}.make_executors".format(**PATH), autospec=True)
     @patch("{src}.ServiceCallRouter".format(**PATH), autospec=True)
@@ -136,6 +137,7 @@ class MakeServiceManagerTest(TestCase):
         _ServiceCallRouter,
         _make_executors,
         _ServiceLoader,
+        _ServiceCallCoalescer,
         _ServiceReferenceFactory,
         _ServiceManager,
     ):
@@ -149,10 +151,14 @@ class MakeServiceManagerTest(TestCase):
         _ServiceCallRouter.from_config.assert_called_once_with(config.routes)
         _make_executors.assert_called_once_with(config, pools)
         _ServiceLoader.assert_called_once_with()
+        _ServiceCallCoalescer.from_config.assert_called_once_with(
+            config.coalesced_calls,
+        )
         _ServiceReferenceFactory.assert_called_once_with(
             WorkerInterceptor,
             _ServiceCallRouter.from_config.return_value,
             _make_executors.return_value,
+            _ServiceCallCoalescer.from_config.return_value,
         )
         _ServiceManager.assert_called_once_with(
             _ServiceRegistry.return_value,
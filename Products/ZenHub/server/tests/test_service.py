@@ -10,7 +10,7 @@
 from __future__ import absolute_import
 
 from unittest import TestCase
-from mock import Mock, patch, call, MagicMock, sentinel
+from mock import ANY, Mock, patch, call, MagicMock, sentinel
 from zope.interface.verify import verifyObject
 
 from Products.ZenHub.PBDaemon import RemoteException
@@ -346,6 +346,27 @@ class ServiceReferenceTest(TestCase):
         self.assertIs(result, dfr.result)
         self.assertEqual(1, executor.submit.call_count)
 
+    def test_remoteMessageReceived_coalescer(self):
+        coalescer = Mock(spec=["submit"])
+        reference = ServiceReference(
+            self.service,
+            self.name,
+            self.monitor,
+            self.routes,
+            self.executors,
+            coalescer=coalescer,
+        )
+        reference.perspective = sentinel.perspective
+        executor = Mock(spec=["submit"])
+        self.routes.get.return_value = "blah"
+        self.executors.get.return_value = executor
+
+        dfr = reference.remoteMessageReceived(self.broker, "method", [], {})
+
+        self.assertIs(coalescer.submit.return_value, dfr.result)
+        coalescer.submit.assert_called_once_with(ANY, executor)
+        executor.submit.assert_not_called()
+
     def test_remoteMessageReceived_raise_external_error(self):
         args = []
         kwargs = {}
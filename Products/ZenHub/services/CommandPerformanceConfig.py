@@ -36,6 +36,10 @@ log = logging.getLogger("zen.HubService.CommandPerformanceConfig")
 class CommandPerformanceConfig(CollectorConfigService):
     dsType = "COMMAND"
 
+    # The proxies depend only on the device, its device class, components
+    # and templates, whose changes are all passed to _notifyAll.
+    cacheDeviceConfigs = True
+
     def __init__(self, dmd, instance):
         deviceProxyAttributes = (
             "zCommandPort",
@@ -70,6 +70,9 @@ class ModelerService(PerformanceConfig):
                     result.plugins.append(plugin.loader)
                     plugin.copyDataToProxy(dev, result)
             result.temp_device = dev.isTempDevice()
+            # Lets zenmodeler tell whether the model changed since it last
+            # applied datamaps to the device.
+            result.lastChange = dev._lastChange
         return result
 
     @translateError
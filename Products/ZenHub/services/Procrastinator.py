@@ -14,15 +14,26 @@ log = logging.getLogger("zen.Procrastinator")
 
 
 class Procrastinate(object):
-    "A class to delay executing a change to a device"
+    """
+    A class to delay executing a change to a device.
+
+    The callback is called with each device passed to doLater once no
+    more devices were passed for _DO_LATER_DELAY seconds.  With a
+    batchCallback, the devices are instead passed to it in lists of at
+    most batchSize devices.  When the batchCallback returns a Deferred,
+    the next batch is not started before it fires.
+    """
 
     _DO_LATER_DELAY = 5
     _DO_NOW_DELAY = 0.05
 
-    def __init__(self, cback):
+    def __init__(self, cback, batchCallback=None, batchSize=1000):
         self.cback = cback
+        self.batchCallback = batchCallback
+        self.batchSize = max(1, batchSize)
         self.devices = set()
         self.timer = None
+        self._busy = False
         self._stopping = False
         self._stopping_deferred = defer.Deferred()
 
@@ -31,11 +42,10 @@ class Procrastinate(object):
 
     def stop(self):
         self._stopping = True
-        if not self.devices:
+        if not self.devices and not self._busy:
             return defer.succeed(True)
         log.debug("Returning stopping deferred")
-        d, self._stopping_deferred = self._stopping_deferred, None
-        return d
+        return self._stopping_deferred
 
     def doLater(self, device=None):
         if not self._stopping:
@@ -47,11 +57,35 @@ class Procrastinate(object):
             )
 
     def _doNow(self, *unused):
+        if self._busy:
+            # _next reschedules once the current batch is done
+            return
+        if self.devices:
+            if self.batchCallback is not None:
+                batch = [
+                    self.devices.pop()
+                    for _ in xrange(min(self.batchSize, len(self.devices)))
+                ]
+                self._busy = True
+                d = defer.maybeDeferred(self.batchCallback, batch)
+                d.addErrback(self._batchFailed, batch)
+                d.addBoth(self._next)
+            else:
+                device = self.devices.pop()
+                self.cback(device)
+                self._next()
+
+    def _batchFailed(self, failure, batch):
+        log.error(
+            "Unable to process a batch of %s devices: %s",
+            len(batch),
+            failure.getErrorMessage(),
+        )
+
+    def _next(self, *unused):
+        self._busy = False
         if self.devices:
-            device = self.devices.pop()
-            self.cback(device)
-            if self.devices:
-                reactor.callLater(Procrastinate._DO_NOW_DELAY, self._doNow)
-            elif self._stopping:
-                log.debug("Callback to _stopping_deferred")
-                self._stopping_deferred.callback(None)
+            reactor.callLater(Procrastinate._DO_NOW_DELAY, self._doNow)
+        elif self._stopping and not self._stopping_deferred.called:
+            log.debug("Callback to _stopping_deferred")
+            self._stopping_deferred.callback(None)
@@ -55,6 +55,10 @@ pb.setUnjellyableForClass(SnmpDeviceProxy, SnmpDeviceProxy)
 
 
 class SnmpPerformanceConfig(CollectorConfigService):
+    # The proxies depend only on the device, its device class, components
+    # and templates, whose changes are all passed to _notifyAll.
+    cacheDeviceConfigs = True
+
     def __init__(self, dmd, instance):
         deviceProxyAttributes = (
             "zMaxOIDPerRequest",
@@ -1,5 +1,7 @@
 import logging
+import shutil
 import sys
+import tempfile
 
 from unittest import TestCase
 from mock import Mock, patch, create_autospec, call, sentinel
@@ -26,6 +28,7 @@ from Products.ZenHub.PBDaemon import (
     RemoteConflictError,
     RemoteException,
     sha1,
+    SpillingEventQueue,
     TRANSFORM_DROP,
     TRANSFORM_STOP,
     translateError,
@@ -507,6 +510,107 @@ class DeDupingEventQueueTest(TestCase):
         t.assertEqual(ret, [t.event_a, t.event_b])
 
 
+class SpillingEventQueueTest(TestCase):
+    def setUp(t):
+        t.directory = tempfile.mkdtemp()
+        t.addCleanup(shutil.rmtree, t.directory)
+        t.sq = t.make_queue()
+
+    def make_queue(t, maxlen=10, deduplicate=True):
+        return SpillingEventQueue(
+            maxlen, t.directory, memlen=2, chunksize=2, deduplicate=deduplicate
+        )
+
+    def events(t, *names):
+        return [{"name": name, "rcvtime": 1} for name in names]
+
+    def drain(t, queue):
+        ret = []
+        while True:
+            try:
+                ret.append(queue.popleft()["name"])
+            except IndexError:
+                return ret
+
+    def test_spills_past_memlen(t):
+        for event in t.events("a", "b", "c", "d", "e"):
+            t.sq.append(event)
+
+        t.assertEqual(len(t.sq.queue), 2)
+        t.assertEqual(len(t.sq), 5)
+        t.assertEqual([e["name"] for e in t.sq], ["a", "b", "c", "d", "e"])
+        t.assertEqual(t.drain(t.sq), ["a", "b", "c", "d", "e"])
+        t.assertEqual(len(t.sq), 0)
+
+    def test_deduplicates_spilled_events(t):
+        for event in t.events("a", "b", "c", "d", "c"):
+            t.sq.append(event)
+
+        t.assertEqual(len(t.sq), 4)
+        t.assertEqual(t.sq.popleft()["name"], "a")
+        t.assertEqual(t.sq.popleft()["name"], "b")
+        event = t.sq.popleft()
+        t.assertEqual((event["name"], event.get("count", 1)), ("d", 1))
+        event = t.sq.popleft()
+        t.assertEqual((event["name"], event["count"]), ("c", 2))
+
+    def test_no_deduplication(t):
+        sq = t.make_queue(deduplicate=False)
+        for event in t.events("a", "a", "a"):
+            sq.append(event)
+        t.assertEqual(t.drain(sq), ["a", "a", "a"])
+
+    def test_append_discards_oldest_if_full(t):
+        sq = t.make_queue(maxlen=3)
+        for event in t.events("a", "b", "c"):
+            sq.append(event)
+        ret = sq.append(t.events("d")[0])
+        t.assertEqual(ret["name"], "a")
+        t.assertEqual(t.drain(sq), ["b", "c", "d"])
+
+    def test_extendleft(t):
+        for event in t.events("c", "d", "e"):
+            t.sq.append(event)
+        a, b, c = t.events("a", "b", "c")
+        ret = t.sq.extendleft([a, b, c])
+        t.assertEqual(ret, [])
+        t.assertEqual(t.sq.queue.values(), [a, b])
+        t.assertEqual(t.drain(t.sq), ["a", "b", "c", "d", "e"])
+
+    def test_close_saves_queued_events(t):
+        for event in t.events("a", "b", "c", "b"):
+            t.sq.append(event)
+        t.sq.close()
+
+        sq = t.make_queue()
+        t.assertEqual(len(sq), 3)
+        sq.append(t.events("d")[0])
+        t.assertEqual(t.drain(sq), ["a", "b", "c", "d"])
+
+    def test_compacts_repeated_spilled_events(t):
+        for event in t.events("a", "b", "c", "d"):
+            t.sq.append(event)
+        for event in t.events(*"cd" * 10):
+            t.sq.append(event)
+        t.assertLessEqual(t.sq._dead, 2)
+        t.assertLessEqual(len(list(t.sq._store.records())), 4)
+        t.assertEqual(t.drain(t.sq), ["a", "b", "c", "d"])
+
+    def test_full_spool_discards_new_events(t):
+        sq = SpillingEventQueue(
+            10, t.directory, memlen=1, chunksize=2, maxbytes=1
+        )
+        a, b, c, b2 = t.events("a", "b", "c", "b")
+        t.assertIsNone(sq.append(a))
+        t.assertIsNone(sq.append(b))
+        t.assertIs(sq.append(c), c)
+        t.assertIsNone(sq.append(b2))
+        t.assertEqual(sq.popleft()["name"], "a")
+        event = sq.popleft()
+        t.assertEqual((event["name"], event["count"]), ("b", 2))
+        t.assertEqual(len(sq), 0)
+
+
 class EventQueueManagerTest(TestCase):
     def setUp(t):
         options = Mock(
@@ -1069,8 +1173,19 @@ class PBDaemonTest(TestCase):
 
         ret = t.pbd.derivativeTracker()
 
+        DerivativeTracker.assert_called_with(
+            maxsize=t.pbd.options.derivativeMaxSeries,
+            maxage=t.pbd.options.derivativeMaxAge,
+        )
         t.assertEqual(ret, DerivativeTracker.return_value)
         t.assertEqual(t.pbd._derivative_tracker, ret)
+        ret.load.assert_called_with(t.pbd._derivativesFileName())
+
+    @patch("{src}.DerivativeTracker".format(**PATH), autospec=True)
+    def test__stopPbDaemon_saves_derivatives(t, DerivativeTracker):
+        tracker = t.pbd.derivativeTracker()
+        t.pbd._stopPbDaemon()
+        tracker.save.assert_called_with(t.pbd._derivativesFileName())
 
     def test_connecting(t):
         # logs a message, noop
@@ -10,7 +10,9 @@
 import logging
 
 from unittest import TestCase
-from mock import patch, Mock, create_autospec, MagicMock, sentinel, ANY
+from mock import (
+    patch, Mock, create_autospec, MagicMock, sentinel, ANY, call,
+)
 
 from mock_interface import create_interface_mock
 
@@ -123,6 +125,35 @@ class InvalidationManagerTest(TestCase):
         t.assertEqual(t.im.totalTime, timestamps[1] - timestamps[0])
         t.assertEqual(t.im.totalEvents, 1)
 
+    @patch("{src}.prefetch".format(**PATH), autospec=True)
+    def test_process_invalidations_batched(t, prefetch):
+        t.im.batch_size = 2
+        t.im._paused = create_autospec(t.im._paused, return_value=False)
+        t.poll_invalidations.return_value = ["c", "a", "b", "a"]
+
+        def process_oid(oid):
+            # Transform "component" oids a and b into "device" oid d
+            t.im._queue.add("d" if oid in ("a", "b") else oid)
+
+        t.im.invalidation_pipeline = create_autospec(
+            t.im.invalidation_pipeline
+        )
+        t.im.invalidation_pipeline.run.side_effect = process_oid
+
+        t.im.process_invalidations()
+
+        prefetch.assert_has_calls(
+            [call(t.dmd, ["a", "b"]), call(t.dmd, ["c"])]
+        )
+        t.assertEqual(
+            t.im.invalidation_pipeline.run.call_args_list,
+            [call("a"), call("b"), call("c")],
+        )
+        t.im.processor.processQueue.assert_called_once_with(
+            ["c", "d"], batch_size=2
+        )
+        t.assertEqual(t.im._queue, set())
+
     def test__syncdb(t):
         t.im._syncdb()
         t.syncdb.assert_called_with()
@@ -5,6 +5,7 @@ from Products.ZenHub.invalidations import (
     betterObjectEventNotify,
     defer,
     handle_oid,
+    objectEventNotifyNow,
     PrimaryPathObjectManager,
     DeviceComponent,
     DeletionEvent,
@@ -150,6 +151,27 @@ class invalidationsTest(TestCase):
         self.assertIsInstance(ret, UpdateEvent)
 
 
+class objectEventNotifyNowTest(TestCase):
+    @patch("Products.ZenHub.invalidations.getGlobalSiteManager", autospec=True)
+    @patch("Products.ZenHub.invalidations.providedBy", autospec=True)
+    def test_objectEventNotifyNow(self, providedBy, getGlobalSiteManager):
+        gsm = getGlobalSiteManager.return_value
+        dfr = defer.Deferred()
+        subscriptions = [
+            Mock(name="sub1", side_effect=Exception("boom")),
+            Mock(name="sub2", return_value=None),
+            Mock(name="sub3", return_value=dfr),
+        ]
+        gsm.adapters.subscriptions.return_value = subscriptions
+        event = Mock(name="event", spec_set=["object"])
+
+        ret = objectEventNotifyNow(event)
+
+        for subscription in subscriptions:
+            subscription.assert_called_once_with(event.object, event)
+        self.assertEqual(ret, [dfr])
+
+
 class InvalidationProcessorTest(TestCase):
     def setUp(self):
         self.patch_getGlobalSiteManager = patch(
@@ -215,6 +237,41 @@ class InvalidationProcessorTest(TestCase):
         # reutrn 0 if a single oid passed in, even if successful
         self.assertEqual(ret.result, len(oids) - 1)
 
+    @patch("Products.ZenHub.invalidations.giveTimeToReactor", autospec=True)
+    @patch("Products.ZenHub.invalidations.prefetch", autospec=True)
+    @patch(
+        "Products.ZenHub.invalidations.objectEventNotifyNow", autospec=True
+    )
+    @patch("Products.ZenHub.invalidations.make_event", autospec=True)
+    @patch("Products.ZenHub.invalidations.u64", autospec=True)
+    def test_processQueue_batched(
+        self, u64, make_event, objectEventNotifyNow, prefetch,
+        giveTimeToReactor,
+    ):
+        self.ip._hub.dmd.pauseHubNotifications = False
+        u64.side_effect = lambda oid: oid
+        # oid2 is already being processed
+        self.ip._invalidation_queue.insert.side_effect = (
+            lambda ioid: ioid != "oid2"
+        )
+        make_event.side_effect = [Exception("boom"), None, Mock()]
+        objectEventNotifyNow.return_value = []
+        giveTimeToReactor.return_value = defer.succeed(None)
+        dmd = self.ip._hub.dmd
+
+        oids = ["oid1", "oid2", "oid3", "oid4"]
+        ret = self.ip.processQueue(oids, batch_size=2)
+
+        self.assertEqual(ret.result, 3)
+        prefetch.assert_has_calls(
+            [call(dmd, ["oid1"]), call(dmd, ["oid3", "oid4"])]
+        )
+        self.assertEqual(objectEventNotifyNow.call_count, 1)
+        self.ip._invalidation_queue.remove.assert_has_calls(
+            [call("oid1"), call("oid3"), call("oid4")]
+        )
+        self.assertEqual(giveTimeToReactor.call_count, 2)
+
     def test_processQueue_paused(self):
         self.ip._hub.dmd.pauseHubNotifications = True
 
@@ -0,0 +1,78 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+
+from mock import patch
+from twisted.internet import defer
+from twisted.internet.task import Clock
+
+from Products.ZenHub.services.Procrastinator import Procrastinate
+
+PATH = {"src": "Products.ZenHub.services.Procrastinator"}
+
+
+class ProcrastinateTest(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = patch("{src}.reactor".format(**PATH), self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+
+    def test_calls_back_each_device_after_delay(self):
+        p = Procrastinate(self.calls.append)
+        p.doLater("a")
+        self.clock.advance(4)
+        p.doLater("b")
+        self.clock.advance(4.9)
+        self.assertEqual(self.calls, [])
+        self.clock.advance(0.1)
+        self.assertEqual(len(self.calls), 1)
+        self.clock.advance(Procrastinate._DO_NOW_DELAY)
+        self.assertEqual(sorted(self.calls), ["a", "b"])
+
+    def test_batches_devices(self):
+        p = Procrastinate(
+            self.calls.append, batchCallback=self.calls.append, batchSize=2
+        )
+        for device in "abcab":
+            p.doLater(device)
+        self.clock.advance(Procrastinate._DO_LATER_DELAY)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(self.calls[0]), 2)
+        self.clock.advance(Procrastinate._DO_NOW_DELAY)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(sorted(sum(self.calls, [])), ["a", "b", "c"])
+        self.clock.advance(Procrastinate._DO_NOW_DELAY)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_waits_for_batch_deferred(self):
+        pending = []
+
+        def batchCallback(batch):
+            self.calls.append(batch)
+            pending.append(defer.Deferred())
+            return pending[-1]
+
+        p = Procrastinate(
+            self.calls.append, batchCallback=batchCallback, batchSize=1
+        )
+        for device in "ab":
+            p.doLater(device)
+        self.clock.advance(Procrastinate._DO_LATER_DELAY)
+        self.clock.advance(Procrastinate._DO_NOW_DELAY * 10)
+        self.assertEqual(len(self.calls), 1)
+        stopped = p.stop()
+        pending[0].callback(None)
+        self.clock.advance(Procrastinate._DO_NOW_DELAY)
+        self.assertEqual(len(self.calls), 2)
+        self.assertFalse(stopped.called)
+        pending[1].errback(Exception("boom"))
+        self.assertTrue(stopped.called)
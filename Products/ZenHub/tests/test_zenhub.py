@@ -494,6 +494,7 @@ class ZenHubTest(TestCase):
         t.assertEqual(t.zh.options.monitor, "localhost")
         t.assertEqual(t.zh.options.workersReservedForEvents, 1)
         t.assertEqual(t.zh.options.invalidation_poll_interval, 30)
+        t.assertEqual(t.zh.options.invalidation_batch_size, 0)
         t.assertFalse(t.zh.options.profiling)
         t.assertEqual(t.zh.options.modeling_pause_timeout, 3600)
         # delay before actually parsing the options
@@ -502,6 +503,7 @@ class ZenHubTest(TestCase):
     @patch("{src}.server_config.ModuleObjectConfig".format(**PATH))
     @patch("{src}.provideUtility".format(**PATH))
     def test_initServiceManager(t, provideUtility, ModuleObjectConfig):
+        t.zh.options.coalescedCalls = "*:getConfigProperties, Svc:method,"
         initServiceManager(t.zh.options)
 
         t.assertEqual(
@@ -510,6 +512,10 @@ class ZenHubTest(TestCase):
         )
         t.assertEqual(server_config.xmlrpcport, int(t.zh.options.xmlrpcport))
         t.assertEqual(server_config.pbport, int(t.zh.options.pbport))
+        t.assertEqual(
+            server_config.coalesced_calls,
+            ["*:getConfigProperties", "Svc:method"],
+        )
 
         ModuleObjectConfig.assert_called_with(server_config)
         provideUtility.assert_called_with(
@@ -160,6 +160,7 @@ class ZenHub(ZCmdBase):
             self.storage.poll_invalidations,
             self.sendEvent,
             poll_interval=self.options.invalidation_poll_interval,
+            batch_size=self.options.invalidation_batch_size,
         )
 
         # Setup Metric Reporting
@@ -355,6 +356,14 @@ class ZenHub(ZCmdBase):
             default=30,
             help="Interval at which to poll invalidations (default: %default)",
         )
+        self.parser.add_option(
+            "--invalidation-batch-size",
+            type="int",
+            default=0,
+            help="Process invalidations in batches of this many objects, "
+            "prefetching each batch from the database; 0 processes them "
+            "one at a time (default: %default)",
+        )
         self.parser.add_option(
             "--profiling",
             dest="profiling",
@@ -369,6 +378,15 @@ class ZenHub(ZCmdBase):
             help="Maximum number of seconds to pause modeling during ZenPack"
             " install/upgrade/removal (default: %default)",
         )
+        self.parser.add_option(
+            "--coalesced-calls",
+            dest="coalescedCalls",
+            type="string",
+            default=",".join(server_config.coalesced_calls),
+            help="Comma-separated list of idempotent 'service:method' "
+            "calls whose identical in-flight calls share one execution; "
+            "'*' matches any service or method (default: %default)",
+        )
         self.parser.add_option(
             "--server-config",
             dest="serverconfig",
@@ -427,6 +445,11 @@ def initServiceManager(options):
     server_config.modeling_pause_timeout = int(options.modeling_pause_timeout)
     server_config.xmlrpcport = int(options.xmlrpcport)
     server_config.pbport = int(options.pbport)
+    server_config.coalesced_calls = [
+        call.strip()
+        for call in options.coalescedCalls.split(",")
+        if call.strip()
+    ]
     if options.serverconfig:
         cfg = ServerConfig.from_file(options.serverconfig)
         server_config.routes.update(cfg.routes)
@@ -436,10 +459,12 @@ def initServiceManager(options):
         "\nZenhub-server configuration:\n"
         "executors: %s\n"
         "pools: %s\n"
-        "routes: %s",
+        "routes: %s\n"
+        "coalesced calls: %s",
         server_config.executors,
         server_config.pools,
         server_config.routes,
+        server_config.coalesced_calls,
     )
     config_util = server_config.ModuleObjectConfig(server_config)
     provideUtility(config_util, IHubServerConfig)
@@ -212,26 +212,7 @@ class MinMaxThresholdInstance(MetricThresholdInstance):
         if isinstance(value, basestring):
             value = float(value)
 
-        # Check the boundaries
-        minbounds = self.minimum is None or value >= self.minimum
-        maxbounds = self.maximum is None or value <= self.maximum
-        outbounds = None not in (self.minimum, self.maximum) and \
-                    self.minimum > self.maximum
-
-        thresh = None
-        how = None
-
-        if outbounds:
-            if not maxbounds and not minbounds:
-                thresh = self.maximum
-                how = 'violated'
-        else:
-            if not maxbounds:
-                thresh = self.maximum
-                how = 'exceeded'
-            elif not minbounds:
-                thresh = self.minimum
-                how = 'not met'
+        thresh, how = self._violation(value)
 
         if thresh is not None:
             severity = self.severity
@@ -250,6 +231,51 @@ class MinMaxThresholdInstance(MetricThresholdInstance):
             self.resetCount(dp)
             return self.processClearEvent(self._create_event_dict(value, summary, Event.Clear))
 
+    def _violation(self, value):
+        """
+        Return the (threshold, how) pair describing how the value violates
+        the threshold, or (None, None) if it does not.
+        """
+        minbounds = self.minimum is None or value >= self.minimum
+        maxbounds = self.maximum is None or value <= self.maximum
+        outbounds = None not in (self.minimum, self.maximum) and \
+                    self.minimum > self.maximum
+
+        if outbounds:
+            if not maxbounds and not minbounds:
+                return self.maximum, 'violated'
+        else:
+            if not maxbounds:
+                return self.maximum, 'exceeded'
+            elif not minbounds:
+                return self.minimum, 'not met'
+        return None, None
+
+    def inRange(self, value):
+        """
+        Return True if checking the value would produce nothing but a
+        clear event (or no event at all, for a missing value).
+        """
+        if value is None:
+            return True
+        if isinstance(value, basestring):
+            value = float(value)
+        return self._violation(value)[0] is None
+
+    def inRangePredicate(self):
+        """
+        Return inRange, or None if a subclass customizes how values are
+        checked or clear events are built, in which case every value must
+        go through checkValue.
+        """
+        cls = type(self)
+        for name in ('checkValue', '_checkImpl', 'checkRange',
+                     'processClearEvent', 'inRange'):
+            method = getattr(cls, name).im_func
+            if method is not getattr(MinMaxThresholdInstance, name).im_func:
+                return None
+        return self.inRange
+
     def _create_event_dict(self, current, summary, severity, how=None):
         event_dict = dict(device=self.context().deviceName,
                           summary=summary,
@@ -16,6 +16,7 @@ from contextlib import contextmanager
 from sre_parse import parse_template
 from md5 import md5
 
+from Products.ZenUtils.regexutils import requiredLiteral
 from Products.ZenUtils.Utils import prepId
 
 log = logging.getLogger("zen.osprocessmatcher")
@@ -192,6 +193,160 @@ class OSProcessMatcher(OSProcessClassMatcher):
             return self.generateId(processText) == generatedId
         return False
 
+# Kinds of _MatcherGroup
+_CLASS_MATCHERS, _PROCESS_MATCHERS, _OTHER_MATCHERS = range(3)
+
+
+def _groupKey(matcher):
+    """
+    @return: The key matchers that always match the same command lines
+             share, or None for matchers with their own matches method
+    """
+    matches = getattr(type(matcher).matches, 'im_func', None)
+    regexes = tuple(getattr(matcher, field, None) for field in
+                    ('includeRegex', 'excludeRegex'))
+    if matches is OSProcessClassMatcher.matches.im_func:
+        return (_CLASS_MATCHERS,) + regexes
+    if matches is OSProcessMatcher.matches.im_func:
+        return (_PROCESS_MATCHERS,) + regexes + (
+            getattr(matcher, 'replaceRegex', None),
+            getattr(matcher, 'replacement', None),
+            matcher.processClassPrimaryUrlPath())
+    return None
+
+
+class _MatcherGroup(object):
+    """
+    Matchers which match the same command lines: OSProcessClassMatchers
+    with the same include and exclude regexes, or OSProcessMatchers which
+    also generate the same ids, and are told apart by their generatedId.
+    """
+
+    def __init__(self, index, matcher, kind):
+        self.first = index
+        self.kind = kind
+        self.representative = matcher
+        self.members = []
+        # For OSProcessMatchers, {generatedId: (index, matcher)}
+        self.byGeneratedId = {}
+        self.include = self.exclude = self.literal = None
+        self.isPrefix = False
+        if kind != _OTHER_MATCHERS:
+            self.include = matcher._compiledRegex('includeRegex')
+            self.exclude = matcher._compiledRegex('excludeRegex')
+            if self.include is not None:
+                self.literal, self.isPrefix = requiredLiteral(
+                    self.include.pattern)
+
+    def add(self, index, matcher):
+        self.members.append((index, matcher))
+        if self.kind == _PROCESS_MATCHERS:
+            self.byGeneratedId.setdefault(
+                getattr(matcher, 'generatedId', False), (index, matcher))
+
+    def match(self, processText):
+        """
+        @return: (index, matcher) of the first member that matches the
+                 stripped processText, or None
+        """
+        if self.literal is not None:
+            if self.isPrefix:
+                if not processText.startswith(self.literal):
+                    return None
+            elif self.literal not in processText:
+                return None
+        if self.kind == _OTHER_MATCHERS:
+            index, matcher = self.members[0]
+            return (index, matcher) if matcher.matches(processText) else None
+        if not self.include.search(processText):
+            return None
+        if self.exclude and self.exclude.search(processText):
+            return None
+        if self.kind == _CLASS_MATCHERS:
+            return self.members[0]
+        generatedId = self.representative.generateId(processText)
+        return self.byGeneratedId.get(generatedId)
+
+
+class CompiledOSProcessMatchers(object):
+    """
+    Finds the first of an ordered list of matchers that matches a command
+    line, with the same result as trying matcher.matches in turn, but
+    without running every matcher's regexes against every line:
+
+      - matchers that share their regexes (the OSProcesses of a process
+        class, say) are grouped and their regexes run once per line;
+      - the include regex of a group only runs on lines containing the
+        literal text any match of it must contain;
+      - match results are remembered per pid and command line, so a
+        command line seen in the previous call isn't matched again.
+
+    The matchers must not change after they're compiled; compile them
+    again instead.
+    """
+
+    def __init__(self, matchers):
+        self.matchers = list(matchers)
+        self._groups = []
+        groups = {}
+        for index, matcher in enumerate(self.matchers):
+            key = _groupKey(matcher)
+            if key is None:
+                group = _MatcherGroup(index, matcher, _OTHER_MATCHERS)
+                self._groups.append(group)
+            elif key in groups:
+                group = groups[key]
+            else:
+                group = groups[key] = _MatcherGroup(index, matcher, key[0])
+                # A missing or invalid include regex never matches.
+                if group.include is not None:
+                    self._groups.append(group)
+            group.add(index, matcher)
+        # {(pid, processText): matcher or None} of the last matchAll call
+        self._cache = {}
+        log.debug("Compiled %d process matchers into %d groups",
+                  len(self.matchers), len(self._groups))
+
+    def match(self, processText):
+        """
+        @return: The first matcher that matches the command line, or None
+        """
+        if not processText: return None
+        processText = processText.strip()
+        best = None
+        for group in self._groups:
+            # groups are in the order of their first member
+            if best is not None and group.first > best[0]:
+                break
+            found = group.match(processText)
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+        return best[1] if best is not None else None
+
+    def matchAll(self, processes):
+        """
+        Match the processes of one host, reusing the results of the
+        previous call for the processes whose pid and command line are
+        unchanged.
+
+        @param processes: [(pid, processText), ...]
+        @return: [(pid, processText, matcher or None), ...]
+        """
+        previous = self._cache
+        cache = {}
+        result = []
+        for pid, processText in processes:
+            key = (pid, processText)
+            if key in previous:
+                matcher = previous[key]
+            else:
+                matcher = self.match(processText)
+            cache[key] = matcher
+            result.append((pid, processText, matcher))
+        self._cache = cache
+        return result
+
+
 class DataHolder(object):
     def __init__(self, **attribs):
         for k,v in attribs.items():
@@ -216,22 +371,20 @@ def applyOSProcessClassMatchers(matchers, lines):
             matched is: {matcher => {generatedName => [line, ...], ...}, ...}
             unmatched is: [line, ...]
     """
+    compiled = CompiledOSProcessMatchers(matchers)
     matched = {}
     unmatched = []
     for line in lines:
         log.debug("COMMAND LINE: %s", line)
-        unmatchedLine = True
-        for matcher in matchers:
-            if matcher.matches(line):
-                if matcher not in matched:
-                    matched[matcher] = {}
-                generatedName = matcher.generateName(line)
-                if generatedName not in matched[matcher]:
-                    matched[matcher][generatedName] = []
-                matched[matcher][generatedName].append(line)
-                unmatchedLine = False
-                break
-        if unmatchedLine:
+        matcher = compiled.match(line)
+        if matcher is not None:
+            if matcher not in matched:
+                matched[matcher] = {}
+            generatedName = matcher.generateName(line)
+            if generatedName not in matched[matcher]:
+                matched[matcher][generatedName] = []
+            matched[matcher][generatedName].append(line)
+        else:
             unmatched.append(line)
     return (matched, unmatched)
 
@@ -241,19 +394,17 @@ def applyOSProcessMatchers(matchers, lines):
             matched is: {generatedName => [line, ...], ...}
             unmatched is: [line, ...]
     """
+    compiled = CompiledOSProcessMatchers(matchers)
     matched = {}
     unmatched = []
     for line in lines:
         log.debug("COMMAND LINE: %s", line)
-        unmatchedLine = True
-        for matcher in matchers:
-            if matcher.matches(line):
-                if matcher.generatedName not in matched:
-                    matched[matcher.generatedName] = []
-                matched[matcher.generatedName].append(line)
-                unmatchedLine = False
-                break
-        if unmatchedLine:
+        matcher = compiled.match(line)
+        if matcher is not None:
+            if matcher.generatedName not in matched:
+                matched[matcher.generatedName] = []
+            matched[matcher.generatedName].append(line)
+        else:
             unmatched.append(line)
     return (matched, unmatched)
 
@@ -152,6 +152,26 @@ class TestMinMaxThreshold(ZenModelBaseTest):
         self.assert_(result[0]['current'] == 100)
         self.assert_(result[0]['how'] == 'violated')
 
+    def testInRange(self):
+        self.threshold.minimum = 10
+        self.threshold.maximum = 100
+        for value in (None, 10, 50, '100', 0, 101, 101.5):
+            result = self.threshold.checkRange('point', value)
+            cleared = all(ev['severity'] == Event.Clear for ev in result)
+            self.assertEqual(self.threshold.inRange(value), cleared)
+
+    def testInRangePredicate(self):
+        self.assertEqual(
+            self.threshold.inRangePredicate(), self.threshold.inRange
+        )
+
+        class CustomThresholdInstance(self.threshold.__class__):
+            def processClearEvent(self, evt):
+                return []
+
+        self.threshold.__class__ = CustomThresholdInstance
+        self.assertIsNone(self.threshold.inRangePredicate())
+
 
 def test_suite():
     from unittest import TestSuite, makeSuite
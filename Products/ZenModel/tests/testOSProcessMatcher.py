@@ -0,0 +1,125 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+
+from Products.ZenModel.OSProcessMatcher import (
+    CompiledOSProcessMatchers, OSProcessClassDataMatcher,
+    OSProcessDataMatcher,
+)
+
+LINES = [
+    "/usr/sbin/sshd -D",
+    "sshd: zenoss@pts/0",
+    "/usr/bin/java -Xmx1g -jar zeneventserver.jar",
+    "/usr/bin/java -Xmx1g -jar other.jar",
+    "python /opt/zenoss/bin/zenhub.py --workers 2",
+    "python /opt/zenoss/bin/zenprocess.py run",
+    "  /sbin/mingetty tty1  ",
+    "[kworker/0:1]",
+    "",
+]
+
+
+def classMatcher(includeRegex, excludeRegex=None, replaceRegex=None,
+                 replacement=None):
+    return OSProcessClassDataMatcher(
+        includeRegex=includeRegex,
+        excludeRegex=excludeRegex,
+        replaceRegex=replaceRegex,
+        replacement=replacement,
+        primaryUrlPath="/zport/dmd/Processes/osProcessClasses/%s" % (
+            includeRegex),
+        primaryDmdId="/Processes/osProcessClasses/%s" % includeRegex,
+    )
+
+
+def processMatcher(cls, processText):
+    return OSProcessDataMatcher(
+        includeRegex=cls.includeRegex,
+        excludeRegex=cls.excludeRegex,
+        replaceRegex=cls.replaceRegex,
+        replacement=cls.replacement,
+        primaryUrlPath=cls.primaryUrlPath,
+        generatedId=cls.generateId(processText),
+        generatedName=cls.generateName(processText),
+    )
+
+
+class CompiledOSProcessMatchersTest(TestCase):
+
+    def assertMatchesInOrder(self, matchers, lines=LINES):
+        compiled = CompiledOSProcessMatchers(matchers)
+        for line in lines:
+            expected = None
+            for matcher in matchers:
+                if matcher.matches(line):
+                    expected = matcher
+                    break
+            self.assertIs(compiled.match(line), expected, line)
+
+    def testMatchesFirstClassInOrder(self):
+        self.assertMatchesInOrder([
+            classMatcher("java"),
+            classMatcher("zeneventserver"),
+            classMatcher(r"^/usr/sbin/sshd"),
+            classMatcher("sshd", excludeRegex="pts"),
+            classMatcher(r"python .*\.py", excludeRegex="zenprocess"),
+            classMatcher("(?i)MINGETTY"),
+            classMatcher("^mingetty"),
+            classMatcher("bad(regex"),
+            classMatcher(r"kworker|java"),
+        ])
+
+    def testMatchesFirstProcessInOrder(self):
+        python = classMatcher(
+            "^python ", replaceRegex=r"^python \S+/(\S+)\.py.*",
+            replacement=r"\1")
+        sshd = classMatcher("sshd")
+        zenhub = processMatcher(python, LINES[4])
+        zenprocess = processMatcher(python, LINES[5])
+        daemon = processMatcher(sshd, LINES[0])
+        matchers = [daemon, zenprocess, zenhub]
+        self.assertMatchesInOrder(matchers)
+        compiled = CompiledOSProcessMatchers(matchers)
+        self.assertEqual(len(compiled._groups), 2)
+        self.assertIs(compiled.match(LINES[0]), daemon)
+        self.assertIs(compiled.match(LINES[4]), zenhub)
+        self.assertIs(compiled.match(LINES[5]), zenprocess)
+        self.assertIsNone(compiled.match(LINES[1]))
+
+    def testMatchAllReusesUnchangedProcesses(self):
+        sshd = classMatcher("sshd")
+        java = classMatcher("java")
+        compiled = CompiledOSProcessMatchers([sshd, java])
+        calls = []
+        match = compiled.match
+
+        def countingMatch(processText):
+            calls.append(processText)
+            return match(processText)
+
+        compiled.match = countingMatch
+        self.assertEqual(
+            compiled.matchAll([(1, LINES[0]), (2, LINES[2]), (3, LINES[7])]),
+            [(1, LINES[0], sshd), (2, LINES[2], java), (3, LINES[7], None)],
+        )
+        del calls[:]
+        self.assertEqual(
+            compiled.matchAll([(1, LINES[0]), (2, LINES[3]), (4, LINES[1])]),
+            [(1, LINES[0], sshd), (2, LINES[3], java), (4, LINES[1], sshd)],
+        )
+        self.assertEqual(calls, [LINES[3], LINES[1]])
+
+
+def test_suite():
+    from unittest import TestSuite, makeSuite
+    suite = TestSuite()
+    suite.addTest(makeSuite(CompiledOSProcessMatchersTest))
+    return suite
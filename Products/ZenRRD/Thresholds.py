@@ -8,55 +8,122 @@
 ##############################################################################
 
 import logging
+import time
+
+from Products.ZenEvents.ZenEventClasses import Clear
 
 log = logging.getLogger("zen.thresholds")
 
+# How long clear events for a series that stays within its thresholds are
+# suppressed.  Resending the clear now and then repairs the state in zenhub
+# if an earlier clear event was lost.
+CLEAR_REFRESH_INTERVAL = 3600  # seconds
+
+
+class _Series(object):
+    """
+    The evaluation state of one datapoint of one threshold in one context.
+    """
+
+    __slots__ = ("threshold", "dp", "inRange", "cleared", "clearedAt")
+
+    def __init__(self, threshold, dp):
+        self.threshold = threshold
+        self.dp = dp
+        predicate = getattr(threshold, "inRangePredicate", None)
+        self.inRange = predicate() if predicate is not None else None
+        # True once a clear event has been sent and no violation since
+        self.cleared = False
+        self.clearedAt = 0
+
+    def check(self, timeAt, value, now):
+        """
+        Return the events produced by the value, leaving out clear events
+        that would not change the state of the series.
+        """
+        if self.cleared and now - self.clearedAt < CLEAR_REFRESH_INTERVAL:
+            if self.inRange is not None and self.inRange(value):
+                return ()
+            events = self.threshold.checkValue(self.dp, timeAt, value)
+            if events and all(ev.get("severity") == Clear for ev in events):
+                return ()
+        else:
+            events = self.threshold.checkValue(self.dp, timeAt, value)
+        if events:
+            if all(ev.get("severity") == Clear for ev in events):
+                self.cleared = True
+                self.clearedAt = now
+            else:
+                self.cleared = False
+        return events
+
 
 class Thresholds(object):
-    """Class for holding multiple Thresholds, used in most collectors."""
+    """
+    Class for holding multiple Thresholds, used in most collectors.
+
+    Thresholds are indexed by context key and datapoint name, and the state
+    of each indexed series is remembered between checks, so that a series
+    that stays within its thresholds only produces a clear event when it
+    returns to that state.
+    """
 
     def __init__(self):
         self.byKey = {}
-        self.byContextKey = {}
         self.byDevice = {}
-
-    def _contextKey(self, contextKey, dp):
-        return "%s/%s" % (contextKey, dp.rsplit("/", 1)[-1])
+        # {contextKey: {datapoint: [_Series, ...]}}
+        self._index = {}
+        # {threshold key: [_Series, ...]}
+        self._series = {}
 
     def remove(self, threshold):
         d = self.byDevice.get(threshold.context().deviceName, None)
         if d and threshold.key() in d:
             del d[threshold.key()]
-        doomed = self.byKey.get(threshold.key(), None)
+        doomed = self.byKey.pop(threshold.key(), None)
         if doomed:
-            del self.byKey[doomed.key()]
-            ctx = doomed.context()
-            for dp in doomed.dataPoints():
-                contextKey = self._contextKey(ctx.contextKey, dp)
-                lst = self.byContextKey[contextKey]
-                if (doomed, dp) in lst:
-                    lst.remove((doomed, dp))
+            contextKey = doomed.context().contextKey
+            byDatapoint = self._index.get(contextKey, {})
+            for series in self._series.pop(doomed.key(), ()):
+                lst = byDatapoint.get(series.dp)
+                if lst and series in lst:
+                    lst.remove(series)
                 if not lst:
-                    del self.byContextKey[contextKey]
+                    byDatapoint.pop(series.dp, None)
+            if not byDatapoint:
+                self._index.pop(contextKey, None)
         return doomed
 
     def add(self, threshold):
         self.byKey[threshold.key()] = threshold
         d = self.byDevice.setdefault(threshold.context().deviceName, {})
         d[threshold.key()] = threshold
-        ctx = threshold.context()
+        contextKey = threshold.context().contextKey
+        byDatapoint = self._index.setdefault(contextKey, {})
+        seriesList = self._series[threshold.key()] = []
         for dp in threshold.dataPoints():
-            self.byContextKey.setdefault(
-                self._contextKey(ctx.contextKey, dp), []
-            ).append((threshold, dp))
+            series = _Series(threshold, dp.rsplit("/", 1)[-1])
+            byDatapoint.setdefault(series.dp, []).append(series)
+            seriesList.append(series)
 
     def update(self, threshold):
         "Store a threshold instance for future computation"
         log.debug("Updating threshold %r", threshold.key())
+        previous = dict(
+            ((s.threshold.context().contextKey, s.dp), s)
+            for s in self._series.get(threshold.key(), ())
+        )
         doomed = self.remove(threshold)
         if doomed:
             threshold.count = doomed.count
         self.add(threshold)
+        if previous:
+            contextKey = threshold.context().contextKey
+            for series in self._series[threshold.key()]:
+                old = previous.get((contextKey, series.dp))
+                if old is not None:
+                    series.cleared = old.cleared
+                    series.clearedAt = old.clearedAt
 
     def updateList(self, thresholds):
         "Store a threshold instance for future computation"
@@ -76,14 +143,24 @@ class Thresholds(object):
         for d in doomed.values():
             self.remove(d)
 
+    def _lookup(self, contextId, datapoint):
+        byDatapoint = self._index.get(contextId)
+        if not byDatapoint:
+            return None
+        if "/" in datapoint:
+            datapoint = datapoint.rsplit("/", 1)[-1]
+        return byDatapoint.get(datapoint)
+
     def check(self, contextId, datapoint, timeAt, value):
         "Check a given threshold based on an updated value"
+        seriesList = self._lookup(contextId, datapoint)
+        if not seriesList:
+            return []
+        log.debug("Checking value %s on %s/%s", value, contextId, datapoint)
+        now = time.time()
         result = []
-        contextKey = self._contextKey(contextId, datapoint)
-        if contextKey in self.byContextKey:
-            log.debug("Checking value %s on %s", value, contextKey)
-            for t, dp in self.byContextKey[contextKey]:
-                events = t.checkValue(dp, timeAt, value)
-                if events:
-                    result.extend(events)
+        for series in seriesList:
+            events = series.check(timeAt, value, now)
+            if events:
+                result.extend(events)
         return result
@@ -0,0 +1,125 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+
+from mock import patch
+
+from Products.ZenEvents.ZenEventClasses import Clear, Warning
+from Products.ZenRRD.Thresholds import CLEAR_REFRESH_INTERVAL, Thresholds
+
+PATH = {"src": "Products.ZenRRD.Thresholds"}
+
+
+class FakeContext(object):
+    def __init__(self, deviceName, contextKey):
+        self.deviceName = deviceName
+        self.componentName = ""
+        self.contextKey = contextKey
+
+    def key(self):
+        return self.deviceName, self.componentName
+
+
+class FakeThreshold(object):
+    """A maximum threshold that records the values it checks."""
+
+    def __init__(self, id, context, dataPoints, maximum, predicate=True):
+        self.id = id
+        self._context = context
+        self._dataPoints = dataPoints
+        self.maximum = maximum
+        self.predicate = predicate
+        self.count = {}
+        self.checked = []
+
+    def key(self):
+        return self.id, self._context.key()
+
+    def context(self):
+        return self._context
+
+    def dataPoints(self):
+        return self._dataPoints
+
+    def inRange(self, value):
+        return value <= self.maximum
+
+    def inRangePredicate(self):
+        return self.inRange if self.predicate else None
+
+    def checkValue(self, dp, timeAt, value):
+        self.checked.append(value)
+        severity = Clear if self.inRange(value) else Warning
+        return [{"eventKey": self.id, "current": value, "severity": severity}]
+
+
+def severities(events):
+    return [ev["severity"] for ev in events]
+
+
+class ThresholdsTest(TestCase):
+    def setUp(self):
+        self.context = FakeContext("dev1", "uuid1")
+        self.threshold = FakeThreshold("high", self.context, ["ds_dp"], 90)
+        self.thresholds = Thresholds()
+        self.thresholds.update(self.threshold)
+
+    def test_clear_only_on_transition(self):
+        check = self.thresholds.check
+        self.assertEqual(severities(check("uuid1", "ds_dp", 1, 10)), [Clear])
+        self.assertEqual(check("uuid1", "ds_dp", 2, 20), [])
+        self.assertEqual(severities(check("uuid1", "ds_dp", 3, 95)), [Warning])
+        self.assertEqual(severities(check("uuid1", "ds_dp", 4, 96)), [Warning])
+        self.assertEqual(severities(check("uuid1", "ds_dp", 5, 30)), [Clear])
+        self.assertEqual(check("uuid1", "ds_dp", 6, 40), [])
+        # in-range values are not checked once the series has cleared
+        self.assertEqual(self.threshold.checked, [10, 95, 96, 30])
+
+    def test_suppresses_clears_without_predicate(self):
+        self.threshold.predicate = False
+        self.thresholds.update(self.threshold)
+        check = self.thresholds.check
+        self.assertEqual(severities(check("uuid1", "ds_dp", 1, 10)), [Clear])
+        self.assertEqual(check("uuid1", "ds_dp", 2, 20), [])
+        self.assertEqual(self.threshold.checked, [10, 20])
+
+    def test_clear_is_refreshed(self):
+        with patch("{src}.time".format(**PATH)) as t:
+            t.time.return_value = 1000
+            self.thresholds.check("uuid1", "ds_dp", 1, 10)
+            t.time.return_value = 1000 + CLEAR_REFRESH_INTERVAL
+            events = self.thresholds.check("uuid1", "ds_dp", 2, 20)
+            self.assertEqual(severities(events), [Clear])
+            t.time.return_value += 1
+            events = self.thresholds.check("uuid1", "ds_dp", 3, 30)
+            self.assertEqual(events, [])
+
+    def test_state_survives_update(self):
+        self.thresholds.check("uuid1", "ds_dp", 1, 10)
+        threshold = FakeThreshold("high", self.context, ["ds_dp"], 90)
+        self.thresholds.updateForDevice("dev1", [threshold])
+        self.assertEqual(self.thresholds.check("uuid1", "ds_dp", 2, 20), [])
+        self.assertEqual(threshold.checked, [])
+
+    def test_datapoint_path_and_unknown_series(self):
+        events = self.thresholds.check("uuid1", "dev1/ds_dp", 1, 10)
+        self.assertEqual(severities(events), [Clear])
+        self.assertEqual(self.thresholds.check("uuid1", "ds_other", 1, 95), [])
+        self.assertEqual(self.thresholds.check("uuid2", "ds_dp", 1, 95), [])
+
+    def test_remove(self):
+        other = FakeThreshold("low", self.context, ["ds_dp"], 10)
+        self.thresholds.update(other)
+        self.thresholds.remove(self.threshold)
+        events = self.thresholds.check("uuid1", "ds_dp", 1, 50)
+        self.assertEqual(severities(events), [Warning])
+        self.thresholds.remove(other)
+        self.assertEqual(self.thresholds._index, {})
+        self.assertEqual(self.thresholds.thresholdsForDevice("dev1"), [])
@@ -0,0 +1,128 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+from unittest import TestCase
+
+from twisted.internet import defer, error
+
+from Products.ZenRRD.zenperfsnmp import (
+    ChunkWindow,
+    SnmpPerformanceCollectionTask,
+    TaskStates,
+    _ChunkFetcher,
+)
+
+
+class ChunkWindowTest(TestCase):
+    def test_grows_after_a_window_of_timely_responses(self):
+        window = ChunkWindow(2, 4)
+        window.success(1.0)
+        self.assertEqual(window.size, 2)
+        window.success(1.0)
+        self.assertEqual(window.size, 3)
+
+    def test_never_exceeds_maximum(self):
+        window = ChunkWindow(8, 4)
+        self.assertEqual(window.size, 4)
+        for _ in range(10):
+            window.success(1.0)
+        self.assertEqual(window.size, 4)
+
+    def test_shrinks_on_slow_responses(self):
+        window = ChunkWindow(4, 8)
+        window.success(1.0)
+        window.success(2.5)
+        self.assertEqual(window.size, 3)
+
+    def test_halves_on_timeout(self):
+        window = ChunkWindow(5, 8)
+        window.timeout()
+        self.assertEqual(window.size, 2)
+        window.timeout()
+        window.timeout()
+        self.assertEqual(window.size, 1)
+
+
+class FakeTask(object):
+    _devId = "device"
+    _manageIp = "10.0.0.1"
+    _maxTimeouts = 2
+
+    def __init__(self, window):
+        self.window = window
+        self.state = TaskStates.STATE_IDLE
+        self.pending = []
+        self.maxInflight = 0
+
+    def _checkTaskTime(self):
+        pass
+
+    def _fetchPerfChunk(self, oid_chunk):
+        d = defer.Deferred()
+        self.pending.append((oid_chunk, d))
+        self.maxInflight = max(self.maxInflight, len(self.pending))
+        return d
+
+    def complete(self, failure=None, rtt=0.1):
+        oid_chunk, d = self.pending.pop(0)
+        if failure is None:
+            d.callback(rtt)
+        else:
+            d.errback(failure)
+        return oid_chunk
+
+
+class ChunkFetcherTest(TestCase):
+    def test_keeps_window_in_flight(self):
+        task = FakeTask(ChunkWindow(3, 3))
+        result = _ChunkFetcher(task, [[str(i)] for i in range(7)], 1).run()
+        self.assertEqual(len(task.pending), 3)
+        fetched = []
+        while task.pending:
+            fetched.extend(task.complete())
+        self.assertEqual(fetched, [str(i) for i in range(7)])
+        self.assertEqual(task.maxInflight, 3)
+        self.assertIsNone(result.result)
+
+    def test_consecutive_timeouts_stop_the_run(self):
+        task = FakeTask(ChunkWindow(1, 1))
+        result = _ChunkFetcher(task, [["1"], ["2"], ["3"]], 1).run()
+        task.complete(error.TimeoutError())
+        task.complete(error.TimeoutError())
+        self.assertEqual(task.pending, [])
+        failures = []
+        result.addErrback(failures.append)
+        self.assertTrue(failures[0].check(error.TimeoutError))
+
+    def test_waits_for_requests_in_flight_before_failing(self):
+        task = FakeTask(ChunkWindow(2, 2))
+        result = _ChunkFetcher(task, [["1"], ["2"], ["3"]], 1).run()
+        task.complete(ValueError("boom"))
+        self.assertFalse(result.called)
+        self.assertEqual(len(task.pending), 1)
+        task.complete()
+        failures = []
+        result.addErrback(failures.append)
+        self.assertTrue(failures[0].check(ValueError))
+
+    def test_window_uses_response_times_and_task_state(self):
+        task = FakeTask(ChunkWindow(2, 2))
+        result = _ChunkFetcher(task, [["1"], ["2"], ["3"]], 1).run()
+        self.assertEqual(
+            task.state, SnmpPerformanceCollectionTask.STATE_FETCH_PERF
+        )
+        task.complete(rtt=0.1)
+        task.complete(rtt=1.0)
+        self.assertEqual(task.window.size, 1)
+        self.assertEqual(
+            task.state, SnmpPerformanceCollectionTask.STATE_FETCH_PERF
+        )
+        task.complete(rtt=0.1)
+        self.assertEqual(task.state, TaskStates.STATE_RUNNING)
+        self.assertIsNone(result.result)
@@ -0,0 +1,105 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Measure the per-datapoint cost and event volume of threshold checks.
+
+    python -m Products.ZenRRD.threshold_benchmark [-s SERIES] [-c CYCLES]
+
+Every series has a min/max threshold, and a small fraction of the values
+violate it.  The checks are done once by calling every threshold's
+checkValue directly, which produces a clear event for every value within
+range, and once with the Thresholds engine.
+"""
+
+import argparse
+import random
+import time
+
+from Products.ZenModel.MinMaxThreshold import MinMaxThresholdInstance
+from Products.ZenModel.ThresholdInstance import ThresholdContext
+
+from .Thresholds import Thresholds
+
+
+def _context(n):
+    context = ThresholdContext.__new__(ThresholdContext)
+    context.deviceName = "device%d" % n
+    context.componentName = ""
+    context.metricMetaData = {}
+    context._contextKey = "%032x" % n
+    context._contextUid = "/zport/dmd/Devices/devices/device%d" % n
+    return context
+
+
+def _thresholds(count):
+    return [
+        MinMaxThresholdInstance(
+            "high", _context(n), ["ds_dp"], None, 90, "/Perf", 3, 0
+        )
+        for n in xrange(count)
+    ]
+
+
+def _workload(thresholds, cycles, violations):
+    rand = random.Random(0)
+    now = time.time()
+    return [
+        [
+            (
+                t.context().contextKey,
+                "ds_dp",
+                now + cycle,
+                95.0 if rand.random() < violations else 50.0,
+            )
+            for t in thresholds
+        ]
+        for cycle in xrange(cycles)
+    ]
+
+
+def _run(check, workload):
+    events = 0
+    start = time.time()
+    for cycle in workload:
+        for args in cycle:
+            events += len(check(*args))
+    return time.time() - start, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-s", "--series", type=int, default=20000)
+    parser.add_argument("-c", "--cycles", type=int, default=10)
+    parser.add_argument("-v", "--violations", type=float, default=0.01)
+    args = parser.parse_args()
+
+    thresholds = _thresholds(args.series)
+    workload = _workload(thresholds, args.cycles, args.violations)
+    byContextKey = dict((t.context().contextKey, t) for t in thresholds)
+
+    def checkEach(contextKey, dp, timeAt, value):
+        return byContextKey[contextKey].checkValue(dp, timeAt, value)
+
+    engine = Thresholds()
+    engine.updateList(thresholds)
+
+    values = args.series * args.cycles
+    for name, check in (
+        ("checkValue", checkEach),
+        ("Thresholds", engine.check),
+    ):
+        elapsed, events = _run(check, workload)
+        print(
+            "%-10s %8.2f usec/value %10d events"
+            % (name, elapsed * 1e6 / values, events)
+        )
+
+
+if __name__ == "__main__":
+    main()
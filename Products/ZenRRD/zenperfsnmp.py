@@ -15,6 +15,7 @@ Gets SNMP performance data and stores it in RRD files.
 """
 
 import logging
+import time
 
 from collections import deque
 from datetime import datetime, timedelta
@@ -24,6 +25,7 @@ import zope.interface
 from pynetsnmp.netsnmp import SnmpTimeoutError, SnmpError
 from pynetsnmp.twistedsnmp import snmpprotocol, Snmpv3Error
 from twisted.internet import defer, error
+from twisted.python.failure import Failure
 
 from Products.ZenCollector.daemon import CollectorDaemon
 from Products.ZenCollector.interfaces import (
@@ -54,6 +56,8 @@ log = logging.getLogger("zen.zenperfsnmp")
 
 COLLECTOR_NAME = "zenperfsnmp"
 MAX_BACK_OFF_MINUTES = 20
+OID_CHUNK_WINDOW = 2
+MAX_OID_CHUNK_WINDOW = 8
 
 
 @zope.interface.implementer(ICollectorPreferences)
@@ -111,6 +115,26 @@ class SnmpPerformanceCollectionPreferences(object):
             "stopping attempts to collect",
         )
 
+        parser.add_option(
+            "--oidchunkwindow",
+            dest="oidChunkWindow",
+            default=OID_CHUNK_WINDOW,
+            type="int",
+            help="Initial number of concurrent SNMP requests per device. "
+            "The number is then adjusted for each device, between 1 and "
+            "--maxoidchunkwindow, according to its response times and "
+            "timeouts; default %default",
+        )
+
+        parser.add_option(
+            "--maxoidchunkwindow",
+            dest="maxOidChunkWindow",
+            default=MAX_OID_CHUNK_WINDOW,
+            type="int",
+            help="Maximum number of concurrent SNMP requests per device. "
+            "Set to 1 to send one request at a time; default %default",
+        )
+
         parser.add_option(
             "--oid",
             dest="oid",
@@ -134,6 +158,165 @@ class StopTask(Exception):
 STATUS_EVENT = {"eventClass": Status_Snmp, "eventGroup": "SnmpTest"}
 
 
+class ChunkWindow(object):
+    """
+    Number of OID chunk requests a device is sent concurrently.
+
+    The window grows by one after a window's worth of timely responses,
+    and shrinks by one when responses slow down to more than twice the
+    baseline response time (the device is queueing the requests).  It is
+    halved on a timeout.  The baseline is the fastest response seen; it
+    slowly rises towards slower responses so that it follows a lasting
+    change in network latency.
+    """
+
+    SLOW_FACTOR = 2.0
+    # Responses are never considered slow when within this many seconds
+    # of the baseline.
+    SLOW_MARGIN = 0.1
+    BASELINE_DRIFT = 0.05
+
+    def __init__(self, size, maximum):
+        self.maximum = max(1, maximum)
+        self.size = min(max(1, size), self.maximum)
+        self.minRtt = None
+        self._acked = 0
+
+    def success(self, rtt):
+        if self.minRtt is None or rtt < self.minRtt:
+            self.minRtt = rtt
+        slow = rtt > max(
+            self.minRtt * self.SLOW_FACTOR, self.minRtt + self.SLOW_MARGIN
+        )
+        self.minRtt += (rtt - self.minRtt) * self.BASELINE_DRIFT
+        if slow:
+            self._acked = 0
+            self.size = max(1, self.size - 1)
+            return
+        self._acked += 1
+        if self._acked >= self.size:
+            self._acked = 0
+            self.size = min(self.maximum, self.size + 1)
+
+    def timeout(self):
+        self._acked = 0
+        self.size = max(1, self.size // 2)
+
+
+class _ChunkFetcher(object):
+    """
+    Fetches OID chunks for a task keeping up to task.window.size requests
+    in flight.  The Deferred returned by run() fails once the requests in
+    flight have finished if an error stops the collection.  The task is in
+    the STATE_FETCH_PERF state until then.
+    """
+
+    def __init__(self, task, oid_chunks, chunk_size, consecutiveTimeouts=0):
+        self._task = task
+        self._chunks = deque(oid_chunks)
+        self._chunk_size = chunk_size
+        self._inflight = 0
+        self._filling = False
+        self._failure = None
+        self._finished = defer.Deferred()
+        self.consecutiveTimeouts = consecutiveTimeouts
+
+    def run(self):
+        self._task.state = SnmpPerformanceCollectionTask.STATE_FETCH_PERF
+        self._fill()
+        return self._finished
+
+    def _fill(self):
+        if self._filling:
+            # A request completed synchronously; the loop below goes on.
+            return
+        task = self._task
+        self._filling = True
+        try:
+            while (
+                self._failure is None
+                and self._chunks
+                and self._inflight < task.window.size
+            ):
+                oid_chunk = self._chunks.popleft()
+                try:
+                    task._checkTaskTime()
+                except Exception:
+                    self._failure = Failure()
+                    break
+                log.debug(
+                    "Fetching OID chunk size %s from %s [%s] - %s",
+                    self._chunk_size,
+                    task._devId,
+                    task._manageIp,
+                    oid_chunk,
+                )
+                self._inflight += 1
+                d = defer.maybeDeferred(task._fetchPerfChunk, oid_chunk)
+                d.addCallbacks(
+                    self._fetched, self._fetchFailed, errbackArgs=(oid_chunk,)
+                )
+        finally:
+            self._filling = False
+        if not self._inflight and not self._finished.called:
+            task.state = TaskStates.STATE_RUNNING
+            if self._failure is None:
+                self._finished.callback(None)
+            else:
+                self._finished.errback(self._failure)
+
+    def _fetched(self, rtt):
+        task = self._task
+        self._inflight -= 1
+        self.consecutiveTimeouts = 0
+        if rtt is not None:
+            task.window.success(rtt)
+        log.debug(
+            "Finished fetchPerfChunk call %s [%s]",
+            task._devId,
+            task._manageIp,
+        )
+        self._fill()
+
+    def _fetchFailed(self, reason, oid_chunk):
+        task = self._task
+        self._inflight -= 1
+        if reason.check(error.TimeoutError):
+            log.debug(
+                "timeout for %s [%s] oids - %s",
+                task._devId,
+                task._manageIp,
+                oid_chunk,
+            )
+            task.window.timeout()
+            self.consecutiveTimeouts += 1
+            if self.consecutiveTimeouts >= task._maxTimeouts:
+                log.debug(
+                    "%s consecutive timeouts, abandoning run for %s [%s]",
+                    self.consecutiveTimeouts,
+                    task._devId,
+                    task._manageIp,
+                )
+                self._stop(reason)
+        elif reason.check(SnmpTimeoutError):
+            # Only seem to get these for V3 and subsequent calls
+            # throw credential exceptions, so just bail here.
+            log.debug(
+                "SnmpTimeoutError for %s [%s] oids - %s",
+                task._devId,
+                task._manageIp,
+                oid_chunk,
+            )
+            self._stop(reason)
+        else:
+            self._stop(reason)
+        self._fill()
+
+    def _stop(self, reason):
+        if self._failure is None:
+            self._failure = reason
+
+
 @zope.interface.implementer(IScheduledTask)
 class SnmpPerformanceCollectionTask(BaseTask):
     """
@@ -197,6 +380,10 @@ class SnmpPerformanceCollectionTask(BaseTask):
         self._snmpPort = snmpprotocol.port()
         self.triesPerCycle = max(2, self._preferences.options.triesPerCycle)
         self._maxTimeouts = self._preferences.options.maxTimeouts
+        self.window = ChunkWindow(
+            self._preferences.options.oidChunkWindow,
+            self._preferences.options.maxOidChunkWindow,
+        )
         self._chosenOid = self._preferences.options.oid
 
         self._lastErrorMsg = ""
@@ -305,50 +492,11 @@ class SnmpPerformanceCollectionTask(BaseTask):
                     chunk_size,
                 )
             oid_chunks = self.chunk(oids_to_test, chunk_size)
-            for oid_chunk in oid_chunks:
-                try:
-                    self._checkTaskTime()
-                    log.debug(
-                        "Fetching OID chunk size %s from %s [%s] - %s",
-                        chunk_size,
-                        self._devId,
-                        self._manageIp,
-                        oid_chunk,
-                    )
-                    yield self._fetchPerfChunk(oid_chunk)
-                    consecutiveTimeouts = 0
-                    log.debug(
-                        "Finished fetchPerfChunk call %s [%s]",
-                        self._devId,
-                        self._manageIp,
-                    )
-                except error.TimeoutError:
-                    log.debug(
-                        "timeout for %s [%s] oids - %s",
-                        self._devId,
-                        self._manageIp,
-                        oid_chunk,
-                    )
-                    consecutiveTimeouts += 1
-                    if consecutiveTimeouts >= self._maxTimeouts:
-                        log.debug(
-                            "%s consecutive timeouts, "
-                            "abandoning run for %s [%s]",
-                            consecutiveTimeouts,
-                            self._devId,
-                            self._manageIp,
-                        )
-                        raise
-                except SnmpTimeoutError:
-                    # Only seem to get these for V3 and subsequent calls
-                    # throw credential exceptions, so just bail here.
-                    log.debug(
-                        "SnmpTimeoutError for %s [%s] oids - %s",
-                        self._devId,
-                        self._manageIp,
-                        oid_chunk,
-                    )
-                    raise
+            fetcher = _ChunkFetcher(
+                self, oid_chunks, chunk_size, consecutiveTimeouts
+            )
+            yield fetcher.run()
+            consecutiveTimeouts = fetcher.consecutiveTimeouts
             # Can still have untested oids from a chunk that failed to return
             # data, one or more of those may be bad.  Run with a smaller
             # chunk size to identify bad oid. Can also have uncollected good
@@ -358,14 +506,19 @@ class SnmpPerformanceCollectionTask(BaseTask):
 
     @defer.inlineCallbacks
     def _fetchPerfChunk(self, oid_chunk):
-        self.state = SnmpPerformanceCollectionTask.STATE_FETCH_PERF
+        """
+        Fetch and store the values of the OIDs of the chunk, and return the
+        time the device took to respond.
+        """
         update_x = {}
         try:
+            start = time.time()
             update_x = yield self._snmpProxy.get(
                 oid_chunk,
                 self._snmpConnInfo.zSnmpTimeout,
                 self._snmpConnInfo.zSnmpTries,
             )
+            rtt = time.time() - start
         except (error.TimeoutError, SnmpTimeoutError) as e:
             raise
         except Exception as e:
@@ -377,8 +530,6 @@ class SnmpPerformanceCollectionTask(BaseTask):
             )
             # Something happened, not sure what.
             raise
-        finally:
-            self.state = TaskStates.STATE_RUNNING
         update = {}
 
         # We got a response
@@ -417,98 +568,95 @@ class SnmpPerformanceCollectionTask(BaseTask):
                     )
                     self.remove_from_good_oids([oid])
                     self._addBadOids([oid])
-            self.state = SnmpPerformanceCollectionTask.STATE_STORE_PERF
-            try:
-                for oid, value in update.items():
-                    if oid not in self._oids:
+            for oid, value in update.items():
+                if oid not in self._oids:
+                    log.error(
+                        "SNMP get returned unexpected OID: %s %s",
+                        self.configId,
+                        oid,
+                    )
+                    continue
+
+                # We should always get something useful back
+                if value == "" or value is None:
+                    if oid not in self._bad_oids:
                         log.error(
-                            "SNMP get returned unexpected OID: %s %s",
+                            "SNMP get returned empty value: %s %s",
                             self.configId,
                             oid,
                         )
+                        self._addBadOids([oid])
+                    continue
+
+                self._good_oids.add(oid)
+                self._bad_oids.discard(oid)
+                self._collectedOids.add(oid)
+                # An OID's data can be stored multiple times
+                for rrdMeta in self._oids[oid]:
+                    rrdMeta_len = len(rrdMeta)
+                    if rrdMeta_len == 8:
+                        (
+                            contextId,
+                            metric,
+                            rrdType,
+                            rrdCommand,
+                            rrdMin,
+                            rrdMax,
+                            metadata,
+                            tags,
+                        ) = rrdMeta
+                    elif rrdMeta_len == 7:
+                        (
+                            contextId,
+                            metric,
+                            rrdType,
+                            rrdCommand,
+                            rrdMin,
+                            rrdMax,
+                            metadata,
+                        ) = rrdMeta
+                        tags = {}
+                    else:
+                        log.error(
+                            "unable to write metric for %s/%s: "
+                            "stale config (%r)",
+                            self.configId,
+                            oid,
+                            rrdMeta,
+                        )
                         continue
 
-                    # We should always get something useful back
-                    if value == "" or value is None:
-                        if oid not in self._bad_oids:
-                            log.error(
-                                "SNMP get returned empty value: %s %s",
-                                self.configId,
-                                oid,
-                            )
-                            self._addBadOids([oid])
+                    path = metadata.get("contextKey")
+                    if self._chosenOid:
+                        log.info(
+                            "OID: %s >> Component: %s >> "
+                            "DataPoint: %s %s",
+                            oid,
+                            path,
+                            metric,
+                            value,
+                        )
+                    try:
+                        # See SnmpPerformanceConfig line
+                        # _getComponentConfig.
+                        yield self._dataService.writeMetricWithMetadata(
+                            metric,
+                            value,
+                            rrdType,
+                            min=rrdMin,
+                            max=rrdMax,
+                            metadata=metadata,
+                            extraTags=tags,
+                        )
+                    except Exception as e:
+                        log.exception(
+                            "Failed to write to metric service: %s %s %s",
+                            path,
+                            e.__class__.__name__,
+                            e,
+                        )
                         continue
-
-                    self._good_oids.add(oid)
-                    self._bad_oids.discard(oid)
-                    self._collectedOids.add(oid)
-                    # An OID's data can be stored multiple times
-                    for rrdMeta in self._oids[oid]:
-                        rrdMeta_len = len(rrdMeta)
-                        if rrdMeta_len == 8:
-                            (
-                                contextId,
-                                metric,
-                                rrdType,
-                                rrdCommand,
-                                rrdMin,
-                                rrdMax,
-                                metadata,
-                                tags,
-                            ) = rrdMeta
-                        elif rrdMeta_len == 7:
-                            (
-                                contextId,
-                                metric,
-                                rrdType,
-                                rrdCommand,
-                                rrdMin,
-                                rrdMax,
-                                metadata,
-                            ) = rrdMeta
-                            tags = {}
-                        else:
-                            log.error(
-                                "unable to write metric for %s/%s: "
-                                "stale config (%r)",
-                                self.configId,
-                                oid,
-                                rrdMeta,
-                            )
-                            continue
-
-                        path = metadata.get("contextKey")
-                        if self._chosenOid:
-                            log.info(
-                                "OID: %s >> Component: %s >> "
-                                "DataPoint: %s %s",
-                                oid,
-                                path,
-                                metric,
-                                value,
-                            )
-                        try:
-                            # See SnmpPerformanceConfig line
-                            # _getComponentConfig.
-                            yield self._dataService.writeMetricWithMetadata(
-                                metric,
-                                value,
-                                rrdType,
-                                min=rrdMin,
-                                max=rrdMax,
-                                metadata=metadata,
-                                extraTags=tags,
-                            )
-                        except Exception as e:
-                            log.exception(
-                                "Failed to write to metric service: %s %s %s",
-                                path,
-                                e.__class__.__name__,
-                                e,
-                            )
-                            continue
-            finally:
-                self.state = TaskStates.STATE_RUNNING
+        defer.returnValue(rtt)
 
     @defer.inlineCallbacks
     def _processBadOids(self, previous_bad_oids):
@@ -528,6 +676,7 @@ class SnmpPerformanceCollectionTask(BaseTask):
                 if oid in oids_to_test:  # fetch if we care
                     oids_to_test.remove(oid)
                     num_checked += 1
+                    self.state = self.STATE_FETCH_PERF
                     try:
                         yield self._fetchPerfChunk([oid])
                     except (error.TimeoutError, SnmpTimeoutError):
@@ -536,6 +685,8 @@ class SnmpPerformanceCollectionTask(BaseTask):
                             self.name,
                             oid,
                         )
+                    finally:
+                        self.state = TaskStates.STATE_RUNNING
 
     def _sendStatusEvent(
         self, summary, eventKey=None, severity=Event.Error, details=None
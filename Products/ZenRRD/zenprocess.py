@@ -45,7 +45,10 @@ from Products.ZenEvents.ZenEventClasses import (
     Status_Perf,
     Status_Snmp,
 )
-from Products.ZenModel.OSProcessMatcher import OSProcessMatcher
+from Products.ZenModel.OSProcessMatcher import (
+    CompiledOSProcessMatchers,
+    OSProcessMatcher,
+)
 from Products.ZenModel.OSProcessState import determineProcessState
 from Products.ZenUtils.observable import ObservableMixin
 
@@ -152,8 +155,10 @@ class DeviceStats:
         self._processes = {}
         for id, process in deviceProxy.processes.iteritems():
             self._processes[id] = ProcessStats(process)
+        self._matchers = None
 
     def update(self, deviceProxy):
+        self._matchers = None
         unused = set(self._processes)
         for id, process in deviceProxy.processes.iteritems():
             unused.discard(id)
@@ -176,6 +181,19 @@ class DeviceStats:
         """
         return self._processes.itervalues()
 
+    @property
+    def matchers(self):
+        """
+        returns the compiled matchers of the processes configured to be
+        monitored, which remember the processes matched in the last scan
+        """
+        if self._matchers is None:
+            self._matchers = CompiledOSProcessMatchers(
+                p for p in self._processes.itervalues()
+                if p._config.name is not None
+            )
+        return self._matchers
+
     @property
     def pids(self):
         """
@@ -675,18 +693,18 @@ class ZenProcessTask(ObservableMixin):
         """
         afterPidToProcessStats = {}
 
-        for pid, name_with_args in procs:
+        # Only the processes that are new or whose command line changed
+        # since the last scan are matched again.
+        matched = self._deviceStats.matchers.matchAll(procs)
+        for pid, name_with_args, pStats in matched:
             log.debug("pid: %s --- name_with_args: %s", pid, name_with_args)
-            for pStats in self._deviceStats.processStats:
-                if pStats._config.name is not None:
-                    if pStats.matches(name_with_args):
-                        log.debug(
-                            "Found process %s belonging to %s",
-                            name_with_args,
-                            pStats._config,
-                        )
-                        afterPidToProcessStats[pid] = pStats
-                        break
+            if pStats is not None:
+                log.debug(
+                    "Found process %s belonging to %s",
+                    name_with_args,
+                    pStats._config,
+                )
+                afterPidToProcessStats[pid] = pStats
 
         afterByConfig = reverseDict(afterPidToProcessStats)
 
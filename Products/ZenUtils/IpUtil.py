@@ -19,12 +19,15 @@ is representable in URLs.  Zope object names *MUST* be okay in URLs.
 
 import re
 import socket
+import time
 
+from collections import OrderedDict
 from ipaddr import IPAddress, IPNetwork
 
 from Products.ZenUtils.Exceptions import ZentinelException
 from twisted.names.client import lookupPointer
-from twisted.internet import threads
+from twisted.internet import defer, threads
+from twisted.python import failure
 
 IP_DELIM = '..'
 INTERFACE_DELIM = '...'
@@ -425,6 +428,92 @@ def asyncIpLookup(name):
     """
     return threads.deferToThread(lambda : socket.gethostbyname(name))
 
+class ReverseLookupCache(object):
+    """
+    Cache the results of asyncNameLookup.
+
+    Names are cached for ttl seconds, and failed lookups for negativeTtl
+    seconds.  Concurrent lookups of the same address share a single
+    lookup.  At most maxsize addresses are cached; the least recently
+    used ones are dropped first.
+    """
+
+    def __init__(self, ttl=3600, negativeTtl=300, maxsize=10000,
+                 lookup=asyncNameLookup, clock=time.time):
+        self.ttl = ttl
+        self.negativeTtl = negativeTtl
+        self.maxsize = maxsize
+        self._lookup = lookup
+        self._clock = clock
+        # address -> (expiration time, name or Failure)
+        self._cache = OrderedDict()
+        # address -> list of deferreds waiting on the lookup in flight
+        self._pending = {}
+        self.hits = 0
+        self.negativeHits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def lookup(self, address):
+        """
+        Return a deferred that fires with the name of the address, or fails
+        if it can not be resolved.
+        """
+        entry = self._cache.pop(address, None)
+        if entry is not None:
+            expires, result = entry
+            if expires > self._clock():
+                # re-insert to mark it as the most recently used
+                self._cache[address] = entry
+                if isinstance(result, failure.Failure):
+                    self.negativeHits += 1
+                    return defer.fail(result)
+                self.hits += 1
+                return defer.succeed(result)
+        d = defer.Deferred()
+        waiting = self._pending.get(address)
+        if waiting is not None:
+            self.coalesced += 1
+            waiting.append(d)
+            return d
+        self.misses += 1
+        self._pending[address] = [d]
+        lookup = defer.maybeDeferred(self._lookup, address)
+        lookup.addBoth(self._resolved, address)
+        return d
+
+    def _resolved(self, result, address):
+        if isinstance(result, failure.Failure):
+            result.cleanFailure()
+            ttl = self.negativeTtl
+        else:
+            ttl = self.ttl
+        if ttl > 0:
+            self._cache[address] = (self._clock() + ttl, result)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        for d in self._pending.pop(address, ()):
+            if isinstance(result, failure.Failure):
+                d.errback(result)
+            else:
+                d.callback(result)
+
+    def clear(self):
+        self._cache.clear()
+
+    def displayStatistics(self):
+        return (
+            "Reverse lookup cache: %d entries, %d hits, %d negative hits, "
+            "%d lookups, %d shared lookups, %d evictions" % (
+                len(self._cache), self.hits, self.negativeHits,
+                self.misses, self.coalesced, self.evictions))
+
+
 def generateAddrInfos(hostname):
     """
     generator for dicts from addrInfo structs for hostname
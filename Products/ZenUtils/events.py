@@ -6,6 +6,8 @@
 # License.zenoss under the directory where your Zenoss product is installed.
 # 
 ##############################################################################
+import os
+
 from contextlib import contextmanager
 from collections import defaultdict
 
@@ -111,6 +113,21 @@ def disablePasResources(event):
     except AttributeError:
         pass
 
+_metricReporter = []
+
+def startMetricReporter(event):
+    """
+    Report this Zope's Metrology metrics, e.g. the model catalog commit
+    times, when it runs under Control Center.
+    """
+    if _metricReporter or not os.environ.get("CONTROLPLANE_CONSUMER_URL"):
+        return
+    # MetricReporter imports the twisted reactor
+    from Products.ZenUtils.MetricReporter import MetricReporter
+    reporter = MetricReporter(prefix='zenoss.zope.')
+    reporter.start()
+    _metricReporter.append(reporter)
+
 def teeHandler(handler, buffer=None):
     """
     All calls to C{handler} will also call C{buffer.append}.
@@ -0,0 +1,361 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""A persistent dictionary of pickles stored in one append-only file."""
+
+import cPickle as pickle
+import fcntl
+import logging
+import os
+import struct
+import tempfile
+import threading
+import zlib
+
+from contextlib import contextmanager
+
+log = logging.getLogger("zen.logfilecache")
+
+_MAGIC = "ZLFC\x00\x01"
+# key length, value length (-1 for a deleted key), crc32 of key and value
+_HEADER = struct.Struct(">IiI")
+_DELETED = -1
+_READ_SIZE = 1 << 20
+
+_DEFAULT_NOT_SPECIFIED = object()
+
+
+def _key(key):
+    if isinstance(key, unicode):
+        return key.encode("utf-8")
+    return key
+
+
+class LogFileCache(object):
+    """
+    A dictionary of picklable values, keyed by strings, stored in a single
+    append-only file, as a drop-in replacement for FileCache.
+
+    Every write appends a record with the key and pickled value (or a
+    deletion marker) to the file, and an in-memory index maps each key to
+    the position of its latest value, so that a value is read with one
+    seek.  The index is built by scanning the record headers when the
+    cache is opened.  update writes any number of values and syncs the
+    file once.  Once more than half of the file is taken by overwritten
+    or deleted values, it is compacted into a new file.
+
+    Writers in several processes may share the file: writes are serialized
+    with a lock file, and the records written by others are indexed before
+    each operation.  A record left incomplete by a crash is ignored and
+    overwritten by the next write.
+    """
+
+    # Don't compact files smaller than this
+    compact_min_size = 1 << 20
+
+    def __init__(self, path, protocol=-1):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.lock = threading.Lock()
+        self._pickleProtocol = protocol
+        self._lockPath = path + ".lock"
+        self._file = None
+        self._inode = None
+        # {key: (offset of the pickled value, its length)}
+        self._index = {}
+        # End of the last complete record indexed, 0 if the file doesn't
+        # start with _MAGIC
+        self._end = 0
+        # Bytes taken by records that were overwritten or deleted
+        self._garbage = 0
+        self._warnedAt = None
+
+    @contextmanager
+    def _fileLock(self, exclusive):
+        fd = os.open(self._lockPath, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def _open(self):
+        if self._file is not None:
+            self._file.close()
+        try:
+            self._file = open(self.path, "r+b")
+        except IOError:
+            self._file = open(self.path, "w+b")
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        self._index = {}
+        self._end = 0
+        self._garbage = 0
+
+    def _refresh(self):
+        """
+        Index the records appended to the file, by this or another
+        process, since the last refresh.
+        """
+        try:
+            inode = os.stat(self.path).st_ino
+        except OSError:
+            inode = None
+        if self._file is None or inode != self._inode:
+            # New, or replaced by a compaction
+            self._open()
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self._end:
+            # Cleared
+            self._open()
+        if size > self._end:
+            self._scan(size)
+
+    def _scan(self, size):
+        f = self._file
+        if self._end == 0:
+            f.seek(0)
+            magic = f.read(len(_MAGIC))
+            if magic != _MAGIC:
+                if magic and not self._garbage:
+                    log.warning("Ignoring the contents of %s", self.path)
+                    # Warn once; the next write replaces the contents.
+                    self._garbage = size
+                return
+            self._end = len(_MAGIC)
+        index = self._index
+        offset = self._end
+        f.seek(offset)
+        buf = f.read(_READ_SIZE)
+        pos = 0
+        while True:
+            if len(buf) - pos < _HEADER.size:
+                buf = buf[pos:] + f.read(_READ_SIZE)
+                pos = 0
+                if len(buf) < _HEADER.size:
+                    break
+            keyLen, valueLen, crc = _HEADER.unpack_from(buf, pos)
+            recordLen = _HEADER.size + keyLen + max(valueLen, 0)
+            if offset + recordLen > size:
+                break
+            if len(buf) - pos < recordLen:
+                buf = buf[pos:] + f.read(max(_READ_SIZE, recordLen))
+                pos = 0
+                if len(buf) < recordLen:
+                    break
+            start = pos + _HEADER.size
+            record = buf[start:pos + recordLen]
+            if zlib.crc32(record) & 0xffffffff != crc:
+                break
+            key = record[:keyLen]
+            previous = index.pop(key, None)
+            if previous is not None:
+                self._garbage += _HEADER.size + keyLen + previous[1]
+            if valueLen == _DELETED:
+                self._garbage += recordLen
+            else:
+                index[key] = (offset + _HEADER.size + keyLen, valueLen)
+            offset += recordLen
+            pos += recordLen
+        if offset < size and offset != self._warnedAt:
+            log.warning(
+                "Ignoring an incomplete record at %d in %s", offset, self.path
+            )
+            self._warnedAt = offset
+        self._end = offset
+
+    def _encode(self, key, value):
+        key = _key(key)
+        if value is _DEFAULT_NOT_SPECIFIED:
+            data = ""
+            valueLen = _DELETED
+        else:
+            data = pickle.dumps(value, self._pickleProtocol)
+            valueLen = len(data)
+        record = key + data
+        crc = zlib.crc32(record) & 0xffffffff
+        return key, valueLen, _HEADER.pack(len(key), valueLen, crc) + record
+
+    def _write(self, items):
+        """
+        Append a record for each (key, value) pair, a deletion if value is
+        _DEFAULT_NOT_SPECIFIED, and sync the file.
+        """
+        records = [self._encode(key, value) for key, value in items]
+        if not records:
+            return
+        with self._fileLock(True):
+            self._refresh()
+            f = self._file
+            if self._end == 0:
+                f.truncate(0)
+                f.seek(0)
+                f.write(_MAGIC)
+                self._end = len(_MAGIC)
+                self._garbage = 0
+            else:
+                # Drop an incomplete record left by a crash
+                f.truncate(self._end)
+            f.seek(self._end)
+            f.write("".join(record for _, _, record in records))
+            f.flush()
+            os.fsync(f.fileno())
+            index = self._index
+            offset = self._end
+            for key, valueLen, record in records:
+                previous = index.pop(key, None)
+                if previous is not None:
+                    self._garbage += _HEADER.size + len(key) + previous[1]
+                if valueLen == _DELETED:
+                    self._garbage += len(record)
+                else:
+                    index[key] = (offset + _HEADER.size + len(key), valueLen)
+                offset += len(record)
+            self._end = offset
+            if self._garbage > max(self.compact_min_size, self._end // 2):
+                self._compact()
+
+    def _compact(self):
+        """Copy the current values to a new file, which replaces this one."""
+        directory = os.path.dirname(self.path) or "."
+        fd, tempPath = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(_MAGIC)
+                src = self._file
+                for key, (offset, length) in self._index.iteritems():
+                    src.seek(offset)
+                    data = src.read(length)
+                    record = key + data
+                    crc = zlib.crc32(record) & 0xffffffff
+                    out.write(_HEADER.pack(len(key), length, crc) + record)
+                out.flush()
+                os.fsync(out.fileno())
+            os.rename(tempPath, self.path)
+        except Exception:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+        log.debug(
+            "Compacted %s from %d to %d bytes",
+            self.path, self._end, os.path.getsize(self.path),
+        )
+        self._open()
+        self._scan(os.fstat(self._file.fileno()).st_size)
+
+    def _read(self, key):
+        offset, length = self._index[key]
+        self._file.seek(offset)
+        return pickle.loads(self._file.read(length))
+
+    def get(self, key, default=_DEFAULT_NOT_SPECIFIED):
+        key = _key(key)
+        with self.lock:
+            with self._fileLock(False):
+                self._refresh()
+                if key in self._index:
+                    return self._read(key)
+        if default is _DEFAULT_NOT_SPECIFIED:
+            raise KeyError("no such key " + key)
+        return default
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        self.update(((key, value),))
+
+    def update(self, items):
+        """
+        Store the (key, value) pairs, or the items of a dict, with one
+        write and sync of the file.
+        """
+        if hasattr(items, "iteritems"):
+            items = items.iteritems()
+        with self.lock:
+            self._write(items)
+
+    def __delitem__(self, key):
+        key = _key(key)
+        with self.lock:
+            with self._fileLock(False):
+                self._refresh()
+            if key not in self._index:
+                raise KeyError("no such key " + key)
+            self._write(((key, _DEFAULT_NOT_SPECIFIED),))
+
+    def clear(self):
+        with self.lock:
+            with self._fileLock(True):
+                self._refresh()
+                self._file.truncate(0)
+                self._file.flush()
+                self._index = {}
+                self._end = 0
+                self._garbage = 0
+
+    def compact(self):
+        with self.lock:
+            with self._fileLock(True):
+                self._refresh()
+                self._compact()
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._inode = None
+
+    def items(self):
+        with self.lock:
+            with self._fileLock(False):
+                self._refresh()
+                # in file order, to read it sequentially
+                return [
+                    (key, self._read(key))
+                    for key in sorted(self._index, key=self._index.get)
+                ]
+
+    def keys(self):
+        with self.lock:
+            with self._fileLock(False):
+                self._refresh()
+                return self._index.keys()
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def iterkeys(self):
+        return iter(self.keys())
+
+    def itervalues(self):
+        return iter(self.values())
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def __contains__(self, key):
+        key = _key(key)
+        with self.lock:
+            with self._fileLock(False):
+                self._refresh()
+                return key in self._index
+
+    def __len__(self):
+        with self.lock:
+            with self._fileLock(False):
+                self._refresh()
+                return len(self._index)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    __nonzero__ = __bool__
@@ -6,10 +6,15 @@
 # License.zenoss under the directory where your Zenoss product is installed.
 #
 ##############################################################################
+import cPickle
+import heapq
 import logging
+import time
 import types
+from array import array
 from twisted.internet import defer
 from Products.ZenRRD.Thresholds import Thresholds
+from Products.ZenUtils.Utils import atomicWrite
 
 log = logging.getLogger("zen.MetricWriter")
 
@@ -124,8 +129,158 @@ class AggregateMetricWriter(object):
 
 
 class DerivativeTracker(object):
-    def __init__(self):
-        self._timed_metric_cache = {}
+    """
+    Tracks the last (value, timestamp) sample of each named metric in order
+    to compute rates.
+
+    Samples are kept in two arrays of doubles indexed through a dict of
+    names, which takes far less memory than a tuple per metric.  Integer
+    values a double can't hold exactly, such as 64-bit counters past 2**53,
+    are kept aside as Python ints so their rates stay exact.  Metrics
+    that haven't been updated for maxage seconds are evicted, and if
+    maxsize is set the least recently updated metrics are evicted to keep
+    at most maxsize of them.  The samples can be saved to and restored from
+    a file so that rates can be computed across a restart.
+    """
+
+    # Fraction of the entries evicted at once when maxsize is reached.
+    EVICT_FRACTION = 0.05
+
+    # Larger integers don't all have an exact double.
+    EXACT_LIMIT = 2 ** 53
+
+    def __init__(self, maxsize=0, maxage=None):
+        """
+        @param maxsize: maximum number of tracked metrics, 0 for no limit
+        @param maxage: seconds after which a metric that hasn't been
+            updated is evicted, None to never evict
+        """
+        self._maxsize = maxsize
+        self._maxage = maxage
+        self._slots = {}
+        self._free = []
+        self._values = array('d')
+        self._timestamps = array('d')
+        self._bigValues = {}  # {slot: int too large for a double}
+        self._lastSweep = time.time()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _get(self, name):
+        slot = self._slots.get(name)
+        if slot is None:
+            return None
+        value = self._bigValues.get(slot)
+        if value is None:
+            value = self._values[slot]
+        return value, self._timestamps[slot]
+
+    def _set(self, name, timed_metric):
+        slot = self._slots.get(name)
+        if slot is None:
+            if self._maxsize and len(self._slots) >= self._maxsize:
+                self._evictOldest()
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._values)
+                self._values.append(0.0)
+                self._timestamps.append(0.0)
+            self._slots[name] = slot
+        value = timed_metric[0]
+        if (isinstance(value, (int, long)) and
+                not -self.EXACT_LIMIT <= value <= self.EXACT_LIMIT):
+            self._bigValues[slot] = value
+        else:
+            self._bigValues.pop(slot, None)
+        self._values[slot] = value
+        self._timestamps[slot] = timed_metric[1]
+
+    def _remove(self, names):
+        for name in names:
+            slot = self._slots.pop(name)
+            self._bigValues.pop(slot, None)
+            self._free.append(slot)
+
+    def _evictOldest(self):
+        timestamps = self._timestamps
+        count = max(1, int(len(self._slots) * self.EVICT_FRACTION))
+        oldest = heapq.nsmallest(
+            count, self._slots.iteritems(), key=lambda item: timestamps[item[1]]
+        )
+        self._remove(name for name, _ in oldest)
+        log.debug("Evicted %d least recently updated metrics", count)
+
+    def evictStale(self, now=None):
+        """
+        Evict the metrics that haven't been updated for maxage seconds.
+
+        @return: the number of evicted metrics
+        """
+        if self._maxage is None:
+            return 0
+        if now is None:
+            now = time.time()
+        self._lastSweep = now
+        cutoff = now - self._maxage
+        timestamps = self._timestamps
+        stale = [
+            name for name, slot in self._slots.iteritems()
+            if timestamps[slot] < cutoff
+        ]
+        self._remove(stale)
+        if stale:
+            log.debug("Evicted %d stale metrics", len(stale))
+        return len(stale)
+
+    def save(self, filename):
+        """
+        Save the tracked samples to a file.
+        """
+        names = self._slots.keys()
+        values = array('d', (self._values[self._slots[n]] for n in names))
+        timestamps = array(
+            'd', (self._timestamps[self._slots[n]] for n in names)
+        )
+        bigValues = dict(
+            (n, self._bigValues[self._slots[n]])
+            for n in names if self._slots[n] in self._bigValues
+        )
+        data = cPickle.dumps(
+            (names, values.tostring(), timestamps.tostring(), bigValues),
+            cPickle.HIGHEST_PROTOCOL
+        )
+        atomicWrite(filename, data, createDir=True)
+        log.debug("Saved %d metric samples to %s", len(names), filename)
+
+    def load(self, filename):
+        """
+        Restore the samples saved to a file, less the stale ones.  Samples
+        already being tracked are kept.
+        """
+        try:
+            with open(filename, 'rb') as f:
+                saved = cPickle.load(f)
+            names, values, timestamps = saved[:3]
+            bigValues = saved[3] if len(saved) > 3 else {}
+        except IOError:
+            return
+        except Exception:
+            log.warning("Ignoring unreadable metric samples in %s", filename)
+            return
+        values = array('d', values)
+        timestamps = array('d', timestamps)
+        cutoff = None
+        if self._maxage is not None:
+            cutoff = time.time() - self._maxage
+        for name, value, timestamp in zip(names, values, timestamps):
+            if name in self._slots:
+                continue
+            if cutoff is not None and timestamp < cutoff:
+                continue
+            self._set(name, (bigValues.get(name, value), timestamp))
+        log.debug("Restored %d metric samples from %s", len(self), filename)
 
     def derivative(self, name, timed_metric, min='U', max='U'):
         """
@@ -137,9 +292,13 @@ class DerivativeTracker(object):
         @param max: derivative will be None if above this value
         @return: change from previous value if a previous value exists
         """
-        last_timed_metric = self._timed_metric_cache.get(name)
+        if (self._maxage is not None and
+                time.time() - self._lastSweep >= self._maxage):
+            self.evictStale()
+
+        last_timed_metric = self._get(name)
         # Store timed_metric for comparison next time.
-        self._timed_metric_cache[name] = timed_metric
+        self._set(name, timed_metric)
 
         if last_timed_metric:
             if timed_metric[1] == last_timed_metric[1]:
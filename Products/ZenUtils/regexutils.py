@@ -0,0 +1,84 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Helpers for analyzing regular expressions."""
+
+import re
+import sre_constants
+import sre_parse
+
+
+def requiredLiteral(pattern):
+    """
+    Return (literal, isPrefix) where literal is the longest string that
+    every match of the regular expression must contain, and isPrefix is
+    True if a match must also start at the beginning of the string with
+    that literal.  Returns (None, False) if no such string is found.
+
+    Only plain sequences of ASCII characters are considered; alternations,
+    character classes and optional or repeated parts end a literal.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None, False
+    flags = parsed.pattern.flags
+    if flags & re.IGNORECASE:
+        return None, False
+    runs = []
+    current = []
+
+    def endRun():
+        if current:
+            runs.append("".join(current))
+            del current[:]
+
+    def walk(items):
+        for op, av in items:
+            if op is sre_constants.LITERAL and av < 128:
+                current.append(chr(av))
+            elif op is sre_constants.SUBPATTERN:
+                # A group matches its contents in sequence.
+                walk(av[-1])
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                endRun()
+                minimum, maximum, item = av
+                if minimum >= 1:
+                    walk(item)
+                    endRun()
+            else:
+                endRun()
+
+    items = list(parsed)
+    anchored = bool(items) and items[0] == (
+        sre_constants.AT, sre_constants.AT_BEGINNING)
+    if anchored:
+        items = items[1:]
+        walk(items)
+        # the first run starts the match if nothing came before it
+        prefix = runs[0] if runs else "".join(current)
+        if prefix and not _startsWithLiteral(items):
+            prefix = None
+    else:
+        walk(items)
+        prefix = None
+    endRun()
+    if not runs:
+        return None, False
+    literal = max(runs, key=len)
+    isPrefix = literal == prefix and not flags & re.MULTILINE
+    return literal, isPrefix
+
+
+def _startsWithLiteral(items):
+    for op, av in items:
+        if op is sre_constants.SUBPATTERN:
+            return _startsWithLiteral(av[-1])
+        return op is sre_constants.LITERAL and av < 128
+    return False
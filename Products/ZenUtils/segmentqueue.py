@@ -0,0 +1,250 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""A persistent FIFO queue stored in append-only segment files."""
+
+import cPickle as pickle
+import logging
+import os
+import re
+import shutil
+import struct
+
+from Products.ZenUtils.Utils import atomicWrite
+
+log = logging.getLogger("zen.segmentqueue")
+
+_HEADER = struct.Struct(">I")
+_SEGMENT_RE = re.compile(r"^(\d{20})\.seg$")
+_CURSOR_FILE = "cursor"
+# Sibling directories used while rewriting a queue.
+_NEW_SUFFIX = ".new"
+_OLD_SUFFIX = ".old"
+
+# Segments are numbered upwards from here by appends and downwards by
+# prepends.
+FIRST_SEGMENT = 10 ** 12
+
+
+class SegmentFileQueue(object):
+    """
+    A FIFO queue of picklable records stored in a directory of append-only
+    segment files.
+
+    Records are appended to the newest (tail) segment; a new segment is
+    started once the tail holds segment_size records.  Reading starts at
+    the oldest (head) segment, and a segment file is deleted once all of
+    its records have been read.  The read position of partially read
+    segments is saved in a cursor file after every read, so the queue
+    survives a restart.  After a restart, appends always start a new
+    segment, and a record left incomplete by a crash is ignored.
+    """
+
+    def __init__(self, directory, segment_size=1000):
+        self.directory = directory
+        self.segment_size = max(1, segment_size)
+        self._recover()
+        self._open()
+
+    def _recover(self):
+        """Finish or undo a rewrite interrupted by a crash."""
+        old = self.directory + _OLD_SUFFIX
+        if os.path.isdir(old):
+            if os.path.isdir(self.directory):
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                os.rename(old, self.directory)
+        shutil.rmtree(self.directory + _NEW_SUFFIX, ignore_errors=True)
+
+    def _open(self):
+        directory = self.directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._cursor = os.path.join(directory, _CURSOR_FILE)
+        self._segments = sorted(
+            int(m.group(1))
+            for m in (_SEGMENT_RE.match(name) for name in os.listdir(directory))
+            if m
+        )
+        self._offsets = self._loadCursor()
+        self._writer = None
+        self._writing = None
+        self._written = 0
+        self._size = sum(
+            os.path.getsize(self._path(number)) for number in self._segments
+        )
+
+    @property
+    def size(self):
+        """The number of bytes used by the segment files."""
+        return self._size
+
+    def _path(self, number):
+        return os.path.join(self.directory, "%020d.seg" % number)
+
+    def _loadCursor(self):
+        try:
+            with open(self._cursor, "rb") as f:
+                offsets = pickle.load(f)
+        except IOError:
+            return {}
+        except Exception:
+            log.warning("Ignoring unreadable cursor file %s", self._cursor)
+            return {}
+        return dict(
+            (number, offset)
+            for number, offset in offsets.iteritems()
+            if number in self._segments
+        )
+
+    def _saveCursor(self):
+        atomicWrite(
+            self._cursor, pickle.dumps(self._offsets, pickle.HIGHEST_PROTOCOL)
+        )
+
+    def _encode(self, record):
+        data = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        return _HEADER.pack(len(data)) + data
+
+    def _readSegment(self, number, limit=None):
+        """
+        Generate (record, offset) pairs from the unread part of a segment,
+        where offset is the position just past the record.
+        """
+        offset = self._offsets.get(number, 0)
+        with open(self._path(number), "rb") as f:
+            f.seek(offset)
+            count = 0
+            while limit is None or count < limit:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                (size,) = _HEADER.unpack(header)
+                data = f.read(size)
+                if len(data) < size:
+                    # Incomplete record, left by a crash during a write.
+                    return
+                offset += _HEADER.size + size
+                try:
+                    record = pickle.loads(data)
+                except Exception:
+                    log.warning(
+                        "Skipping unreadable record in %s", self._path(number)
+                    )
+                    continue
+                count += 1
+                yield record, offset
+
+    def _remove(self, number):
+        self._segments.remove(number)
+        self._offsets.pop(number, None)
+        try:
+            self._size -= os.path.getsize(self._path(number))
+            os.remove(self._path(number))
+        except OSError as e:
+            log.warning("Unable to remove %s: %s", self._path(number), e)
+
+    def _rollover(self):
+        self._closeWriter()
+        number = self._segments[-1] + 1 if self._segments else FIRST_SEGMENT
+        self._writer = open(self._path(number), "ab")
+        self._writing = number
+        self._written = 0
+        self._segments.append(number)
+
+    def _closeWriter(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._writing = None
+
+    def append(self, record):
+        """Add the record to the end of the queue."""
+        if self._writer is None or self._written >= self.segment_size:
+            self._rollover()
+        data = self._encode(record)
+        self._writer.write(data)
+        self._writer.flush()
+        self._written += 1
+        self._size += len(data)
+
+    def prepend(self, records):
+        """
+        Add the records to the beginning of the queue, so that the first
+        of them is the next one read.
+        """
+        if not records:
+            return
+        number = self._segments[0] - 1 if self._segments else FIRST_SEGMENT
+        data = "".join(self._encode(r) for r in records)
+        atomicWrite(self._path(number), data)
+        self._segments.insert(0, number)
+        self._size += len(data)
+
+    def read(self, count):
+        """Remove and return up to count records from the queue."""
+        records = []
+        while len(records) < count and self._segments:
+            number = self._segments[0]
+            for record, offset in self._readSegment(
+                number, count - len(records)
+            ):
+                records.append(record)
+                self._offsets[number] = offset
+            exhausted = len(records) < count or self._offsets.get(
+                number, 0
+            ) >= os.path.getsize(self._path(number))
+            if not exhausted:
+                break
+            if number == self._writing:
+                break
+            # Every record of the segment has been read.
+            self._remove(number)
+        self._saveCursor()
+        return records
+
+    def records(self):
+        """Generate the records of the queue, oldest first, without
+        removing them."""
+        for number in list(self._segments):
+            for record, _ in self._readSegment(number):
+                yield record
+
+    def clear(self):
+        """Remove every record from the queue."""
+        self._closeWriter()
+        for number in list(self._segments):
+            self._remove(number)
+        self._offsets = {}
+        self._size = 0
+        self._saveCursor()
+
+    def rewrite(self, records):
+        """
+        Replace the records of the queue with the given records, which may
+        be generated from records().  They are written to a new directory
+        that then takes the place of this one, so a crash leaves either the
+        old or the new records.
+        """
+        new = self.directory + _NEW_SUFFIX
+        old = self.directory + _OLD_SUFFIX
+        shutil.rmtree(new, ignore_errors=True)
+        rewritten = SegmentFileQueue(new, self.segment_size)
+        for record in records:
+            rewritten.append(record)
+        rewritten.close()
+        self._closeWriter()
+        os.rename(self.directory, old)
+        os.rename(new, self.directory)
+        shutil.rmtree(old, ignore_errors=True)
+        self._open()
+
+    def close(self):
+        self._closeWriter()
+        self._saveCursor()
@@ -8,9 +8,13 @@
 ##############################################################################
 
 
+import socket
 import unittest
+
+from twisted.internet import defer
+
 from Products.ZenTestCase.BaseTestCase import BaseTestCase
-from Products.ZenUtils.IpUtil import ensureIp
+from Products.ZenUtils.IpUtil import ensureIp, ReverseLookupCache
 
 
 class IpUtilsTest(BaseTestCase):
@@ -27,10 +31,78 @@ class IpUtilsTest(BaseTestCase):
         # invalid number
         ip = '1212121212121'
         self.assertEqual(ensureIp(ip), '0.0.0.0')
-                         
+
+
+class ReverseLookupCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000
+        self.lookups = []
+        self.cache = ReverseLookupCache(
+            ttl=60, negativeTtl=10, maxsize=2,
+            lookup=self._lookup, clock=lambda: self.now)
+
+    def _lookup(self, address):
+        d = defer.Deferred()
+        self.lookups.append((address, d))
+        return d
+
+    def _result(self, d):
+        results = []
+        d.addBoth(results.append)
+        return results[0]
+
+    def testCachesNames(self):
+        d1 = self.cache.lookup('10.0.0.1')
+        self.lookups[0][1].callback('host1')
+        self.assertEqual(self._result(d1), 'host1')
+        self.now += 59
+        self.assertEqual(self._result(self.cache.lookup('10.0.0.1')), 'host1')
+        self.assertEqual(len(self.lookups), 1)
+        self.now += 1
+        self.cache.lookup('10.0.0.1')
+        self.assertEqual(len(self.lookups), 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def testCachesFailures(self):
+        d1 = self.cache.lookup('10.0.0.1')
+        self.lookups[0][1].errback(socket.herror('unknown host'))
+        self.assertTrue(self._result(d1).check(socket.herror))
+        d2 = self.cache.lookup('10.0.0.1')
+        self.assertTrue(self._result(d2).check(socket.herror))
+        self.assertEqual(self.cache.negativeHits, 1)
+        self.now += 10
+        self.cache.lookup('10.0.0.1')
+        self.assertEqual(len(self.lookups), 2)
+
+    def testSharesLookupsInFlight(self):
+        d1 = self.cache.lookup('10.0.0.1')
+        d2 = self.cache.lookup('10.0.0.1')
+        self.assertEqual(len(self.lookups), 1)
+        self.lookups[0][1].callback('host1')
+        self.assertEqual(self._result(d1), 'host1')
+        self.assertEqual(self._result(d2), 'host1')
+        self.assertEqual(self.cache.coalesced, 1)
+
+    def testEvictsLeastRecentlyUsed(self):
+        for address in ('10.0.0.1', '10.0.0.2'):
+            self.cache.lookup(address)
+            self.lookups[-1][1].callback(address)
+        self.cache.lookup('10.0.0.1')
+        self.cache.lookup('10.0.0.3')
+        self.lookups[-1][1].callback('10.0.0.3')
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+        self.cache.lookup('10.0.0.1')
+        self.assertEqual(len(self.lookups), 3)
+        self.cache.lookup('10.0.0.2')
+        self.assertEqual(len(self.lookups), 4)
+
+
 def test_suite():
     return unittest.TestSuite((
         unittest.makeSuite(IpUtilsTest),
+        unittest.makeSuite(ReverseLookupCacheTest),
         ))
 
 if __name__ == '__main__':
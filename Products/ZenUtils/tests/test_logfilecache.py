@@ -0,0 +1,99 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Tests for Products.ZenUtils.logfilecache module."""
+
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from Products.ZenUtils.logfilecache import LogFileCache
+
+
+class LogFileCacheTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "sub", "test.cache")
+        self.cache = self.open()
+
+    def open(self):
+        cache = LogFileCache(self.path)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_mapping(self):
+        cache = self.cache
+        self.assertFalse(cache)
+        cache["a"] = {"x": 1}
+        cache.update([("b", [2]), (u"c", "three")])
+        cache.update({"a": None})
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache["a"])
+        self.assertEqual(cache.get("b"), [2])
+        self.assertTrue("c" in cache)
+        self.assertEqual(sorted(cache.keys()), ["a", "b", "c"])
+        self.assertEqual(cache.items(), [("b", [2]), ("c", "three"),
+                                         ("a", None)])
+        del cache["b"]
+        self.assertRaises(KeyError, cache.__getitem__, "b")
+        self.assertRaises(KeyError, cache.__delitem__, "b")
+        self.assertEqual(cache.get("b", "default"), "default")
+        cache.clear()
+        self.assertEqual(cache.keys(), [])
+
+    def test_reopen(self):
+        self.cache.update([(str(i), i) for i in range(100)])
+        del self.cache["5"]
+        self.cache["7"] = "seven"
+        cache = self.open()
+        self.assertEqual(len(cache), 99)
+        self.assertEqual(cache["7"], "seven")
+        self.assertFalse("5" in cache)
+
+    def test_shared_file(self):
+        other = self.open()
+        self.cache["a"] = 1
+        self.assertEqual(other["a"], 1)
+        other["a"] = 2
+        self.assertEqual(self.cache["a"], 2)
+        self.cache.clear()
+        self.assertFalse("a" in other)
+        other["b"] = 3
+        self.assertEqual(self.cache.items(), [("b", 3)])
+
+    def test_incomplete_record_is_ignored(self):
+        self.cache.update([("a", "x" * 100), ("b", "y" * 100)])
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 10)
+        cache = self.open()
+        self.assertEqual(cache.keys(), ["a"])
+        cache["c"] = 3
+        cache = self.open()
+        self.assertEqual(sorted(cache.items()), [("a", "x" * 100), ("c", 3)])
+
+    def test_compaction(self):
+        self.cache.compact_min_size = 1000
+        for i in range(20):
+            self.cache.update([("a", "x" * 100), ("b", i)])
+        self.assertLess(os.path.getsize(self.path), 1000)
+        other = self.open()
+        self.assertEqual(sorted(other.items()), [("a", "x" * 100), ("b", 19)])
+        self.cache.compact()
+        self.assertEqual(other["b"], 19)
+
+
+def test_suite():
+    from unittest import TestSuite, makeSuite
+    suite = TestSuite()
+    suite.addTest(makeSuite(LogFileCacheTest))
+    return suite
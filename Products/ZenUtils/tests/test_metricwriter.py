@@ -9,8 +9,14 @@
 
 """Tests for Products.ZenUtils.metricwriter module."""
 
+import os
+import shutil
+import tempfile
+import time
 import unittest
 
+from mock import patch
+
 from Products.ZenUtils import metricwriter
 
 
@@ -76,6 +82,70 @@ class TestDerivativeTracker(unittest.TestCase):
                     name, v, t, minval, maxval, result, expected_result))
 
 
+    @patch('Products.ZenUtils.metricwriter.time')
+    def test_evict_stale(self, _time):
+        _time.time.return_value = 1000
+        tracker = metricwriter.DerivativeTracker(maxage=100)
+        tracker.derivative('old', (0, 850))
+        tracker.derivative('new', (0, 1050))
+        _time.time.return_value = 1099
+        tracker.derivative('other', (0, 1099))
+        self.assertEqual(len(tracker), 3)
+        _time.time.return_value = 1100
+        self.assertEqual(tracker.derivative('new', (10, 1060)), 1.0)
+        self.assertEqual(len(tracker), 2)
+        self.assertIsNone(tracker.derivative('old', (10, 1100)))
+
+    def test_maxsize_evicts_least_recently_updated(self):
+        tracker = metricwriter.DerivativeTracker(maxsize=3)
+        for i, name in enumerate(('a', 'b', 'c')):
+            tracker.derivative(name, (0, 10 + i))
+        tracker.derivative('a', (10, 20))
+        tracker.derivative('d', (0, 21))
+        self.assertEqual(len(tracker), 3)
+        self.assertIsNone(tracker.derivative('b', (10, 30)))
+        self.assertEqual(tracker.derivative('a', (20, 30)), 1.0)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'var', 'derivatives.pickle')
+        now = time.time()
+        tracker = metricwriter.DerivativeTracker(maxage=3600)
+        tracker.derivative('counter', (100, now - 60))
+        tracker.derivative('stale', (100, now - 7200))
+        tracker.save(filename)
+
+        restored = metricwriter.DerivativeTracker(maxage=3600)
+        restored.load(filename)
+        self.assertEqual(len(restored), 1)
+        self.assertEqual(restored.derivative('counter', (160, now)), 1.0)
+
+    def test_large_counters_stay_exact(self):
+        tracker = metricwriter.DerivativeTracker()
+        start = 2 ** 62 + 1000
+        tracker.derivative('octets', (start, 0))
+        self.assertEqual(tracker.derivative('octets', (start + 1000, 60)),
+                         1000 / 60.0)
+        tracker.derivative('octets', (5, 120))
+        self.assertEqual(tracker.derivative('octets', (65, 180)), 1.0)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'derivatives.pickle')
+        now = time.time()
+        tracker.derivative('big', (start, now - 60))
+        tracker.save(filename)
+        restored = metricwriter.DerivativeTracker()
+        restored.load(filename)
+        self.assertEqual(restored.derivative('big', (start + 60, now)), 1.0)
+
+    def test_load_missing_file(self):
+        tracker = metricwriter.DerivativeTracker()
+        tracker.load('/nonexistent/derivatives.pickle')
+        self.assertEqual(len(tracker), 0)
+
+
 def test_suite():
     return unittest.TestSuite((unittest.makeSuite(TestDerivativeTracker),))
 
@@ -0,0 +1,39 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Tests for Products.ZenUtils.regexutils module."""
+
+from unittest import TestCase
+
+from Products.ZenUtils.regexutils import requiredLiteral
+
+
+class RequiredLiteralTest(TestCase):
+
+    def test_required_literal(self):
+        self.assertEqual(
+            requiredLiteral(r"^(?P<summary>-- (?P<eventClassKey>MARK) --)"),
+            ("-- MARK --", True))
+        self.assertEqual(
+            requiredLiteral(r"%CARD-\S+:(SLOT\d+) %(?P<x>\S+): (?P<y>.*)"),
+            ("%CARD-", False))
+        self.assertEqual(requiredLiteral(r"^\d+ SEV=\d+"), (" SEV=", False))
+        self.assertEqual(requiredLiteral(r"^(ab)+c"), ("ab", False))
+        self.assertEqual(requiredLiteral(r"(ab)?cd"), ("cd", False))
+        self.assertEqual(requiredLiteral(r"(?i)abc"), (None, False))
+        self.assertEqual(requiredLiteral(r"(?m)^abc"), ("abc", False))
+        self.assertEqual(requiredLiteral(r"abc|def"), (None, False))
+        self.assertEqual(requiredLiteral(r"\S+"), (None, False))
+
+
+def test_suite():
+    from unittest import TestSuite, makeSuite
+    suite = TestSuite()
+    suite.addTest(makeSuite(RequiredLiteralTest))
+    return suite
@@ -0,0 +1,115 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Tests for Products.ZenUtils.segmentqueue module."""
+
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from Products.ZenUtils.segmentqueue import SegmentFileQueue
+
+
+class SegmentFileQueueTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.queue = SegmentFileQueue(self.directory, segment_size=3)
+
+    def _segments(self):
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.endswith(".seg")
+        )
+
+    def test_fifo_across_segments(self):
+        for i in range(7):
+            self.queue.append(i)
+        self.assertEqual(len(self._segments()), 3)
+        self.assertEqual(self.queue.read(2), [0, 1])
+        self.assertEqual(self.queue.read(4), [2, 3, 4, 5])
+        self.assertEqual(len(self._segments()), 1)
+        self.assertEqual(self.queue.read(5), [6])
+        self.assertEqual(self.queue.read(5), [])
+
+    def test_prepend(self):
+        self.queue.append("c")
+        self.assertEqual(self.queue.read(1), ["c"])
+        self.queue.append("d")
+        self.queue.prepend(["a", "b"])
+        self.assertEqual(list(self.queue.records()), ["a", "b", "d"])
+        self.assertEqual(self.queue.read(10), ["a", "b", "d"])
+
+    def test_reopen_resumes_at_cursor(self):
+        for i in range(5):
+            self.queue.append(i)
+        self.queue.read(2)
+        self.queue.close()
+
+        queue = SegmentFileQueue(self.directory, segment_size=3)
+        queue.append(5)
+        self.assertEqual(list(queue.records()), [2, 3, 4, 5])
+        self.assertEqual(queue.read(10), [2, 3, 4, 5])
+
+    def test_incomplete_record_is_ignored(self):
+        self.queue.append("a")
+        self.queue.append("b")
+        self.queue.close()
+        path = os.path.join(self.directory, self._segments()[-1])
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 1)
+
+        queue = SegmentFileQueue(self.directory, segment_size=3)
+        queue.append("c")
+        self.assertEqual(queue.read(10), ["a", "c"])
+
+    def test_clear(self):
+        self.queue.append("a")
+        self.queue.prepend(["b"])
+        self.queue.clear()
+        self.assertEqual(self._segments(), [])
+        self.queue.append("c")
+        self.assertEqual(self.queue.read(10), ["c"])
+
+    def test_size(self):
+        self.assertEqual(self.queue.size, 0)
+        for i in range(4):
+            self.queue.append(i)
+        self.queue.prepend(["x"])
+        sizes = sum(
+            os.path.getsize(os.path.join(self.directory, name))
+            for name in self._segments()
+        )
+        self.assertEqual(self.queue.size, sizes)
+        self.queue.read(4)
+        self.assertLess(self.queue.size, sizes)
+        self.queue.clear()
+        self.assertEqual(self.queue.size, 0)
+
+    def test_rewrite(self):
+        for i in range(7):
+            self.queue.append(i)
+        self.queue.read(2)
+        self.queue.rewrite(r for r in self.queue.records() if r % 2)
+        self.assertEqual(list(self.queue.records()), [3, 5])
+        self.queue.append(7)
+        queue = SegmentFileQueue(self.directory, segment_size=3)
+        self.assertEqual(queue.read(10), [3, 5, 7])
+
+    def test_interrupted_rewrite_keeps_old_records(self):
+        self.queue.append("a")
+        self.queue.close()
+        os.rename(self.directory, self.directory + ".old")
+        os.mkdir(self.directory + ".new")
+        queue = SegmentFileQueue(self.directory, segment_size=3)
+        self.assertEqual(queue.read(10), ["a"])
+        self.assertFalse(os.path.exists(self.directory + ".new"))
@@ -15,6 +15,7 @@ from multiprocessing import Process, Event
 from Products.ZenUtils.ZenDaemon import ZenDaemon
 from Products.Zuul.catalog.model_catalog_init import run as run_model_catalog_init
 from Products.Zuul.catalog.model_catalog_init import collection_exists
+from Products.Zuul.catalog.model_catalog_init import reconcile_model_catalog
 
 log = logging.getLogger("zen.Catalog")
 
@@ -45,6 +46,13 @@ def _run_model_catalog_init(worker_count, hard, idxs, terminator, toggle_debug):
     run_model_catalog_init(worker_count, hard, indexes=idxs, terminator=terminator, toggle_debug=toggle_debug)
 
 
+def _run_reconcile():
+    ignore_interruptions()
+    drop_all_arguments()
+    from Products.ZenUtils.ZenScriptBase import ZenScriptBase
+    reconcile_model_catalog(ZenScriptBase(connect=True).dmd)
+
+
 # Note: We are very careful not to connect to the database nor memcache until
 # *after* we have finished forking new processes. The MySQL and Memcache client
 # libraries both require each fork to have its own object handles. That's why
@@ -68,6 +76,11 @@ class ZenCatalogBase(ZenDaemon):
                                action="store_true",
                                default=False,
                                help="reindex existing catalog")
+        self.parser.add_option("--reconcile",
+                               action="store_true",
+                               default=False,
+                               help="reindex the objects whose queued catalog "
+                                    "updates were lost when their process exited")
         self.parser.add_option("--permissionsOnly",
                                action="store_true",
                                default=False,
@@ -123,8 +136,10 @@ class ZenCatalogBase(ZenDaemon):
                 permissions_only=self.options.permissionsOnly,
                 resume=self.options.resume,
                 print_progress=print_progress)
+        elif self.options.reconcile:
+            return self._reconcile()
         else:
-            self.parser.error("Must use one of --createcatalog, --reindex")
+            self.parser.error("Must use one of --createcatalog, --reindex, --reconcile")
             return False
 
     def _process(self, worker_count, hard, permissions_only=False):
@@ -201,6 +216,15 @@ class ZenCatalogBase(ZenDaemon):
 
         return True
 
+    def _reconcile(self):
+        if not self._check_for_global_catalog():
+            log.warning('Global Catalog does not exist, try --createcatalog option')
+            return False
+        p = Process(target=_run_reconcile)
+        p.start()
+        p.join()
+        return p.exitcode == 0
+
     def _check_for_global_catalog(self):
         return collection_exists()
 
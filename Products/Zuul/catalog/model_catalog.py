@@ -26,6 +26,7 @@ from Products.ZenModel.Software import Software
 from Products.ZenModel.OperatingSystem import OperatingSystem
 from Products.ZenUtils.GlobalConfig import getGlobalConfiguration
 from Products.Zuul.catalog.exceptions import ModelCatalogError, ModelCatalogUnavailableError
+from metrology import Metrology
 from transaction.interfaces import IDataManager
 from zenoss.modelindex import indexed, index
 from zenoss.modelindex.field_types import StringFieldType, \
@@ -34,6 +35,7 @@ from zenoss.modelindex.exceptions import IndexException, SearchException
 from zenoss.modelindex.constants import NULL_SEARCH_LIMIT, DEFAULT_SEARCH_LIMIT
 from zenoss.modelindex.model_index import IndexUpdate, INDEX, UNINDEX, SearchParams
 from .indexable import MODEL_INDEX_UID_FIELD, OBJECT_UID_FIELD
+from .model_catalog_queue import get_indexing_queue
 
 from zope.component import getGlobalSiteManager, getUtility
 from zope.interface import implements
@@ -258,6 +260,7 @@ class ModelCatalogTransactionState(object):
         self._updates_to_finish_tx = {} # { object_uid: modelindex.IndexUpdate}
 
         self.commits_metric = []
+        self.tpc_begin_time = None
 
     def add_model_update(self, object_update):
         """
@@ -361,6 +364,13 @@ class ModelCatalogDataManager(object):
         self.model_index = zope.component.createObject('ModelIndex', solr_servers)
         self.model_index.searcher.default_row_count = int(config.get('solr-search-limit', DEFAULT_SEARCH_LIMIT))
         self.context = context
+        # when enabled, committed updates are sent by a queue shared by the
+        # whole process, which reads the objects with its own connection
+        zodb_conn = getattr(context, "_p_jar", None)
+        db = zodb_conn.db() if zodb_conn is not None else None
+        self.indexing_queue = get_indexing_queue(solr_servers, db)
+        self._commit_timer = Metrology.timer("modelcatalog.commitTime")
+        self._solr_requests = Metrology.meter("modelcatalog.solrRequests")
         self._current_transactions = {} # { transaction_id : ModelCatalogTransactionState }
         # @TODO ^^ Make that an OOBTREE to avoid concurrency issues? I dont think we need it since we have one per thread
 
@@ -416,6 +426,7 @@ class ModelCatalogDataManager(object):
 
         # send and commit indexed docs to solr
         self.model_index.process_batched_updates(tweaked_updates)
+        self._solr_requests.mark()
         # marked docs as indexed
         tx_state.mark_pending_updates_as_indexed(updates, indexed_uids, deleted_uids)
 
@@ -469,10 +480,23 @@ class ModelCatalogDataManager(object):
         brain_fields = set(fields) if fields else set()
         return list(brain_fields | MANDATORY_FIELDS)
 
+    def _flush_indexing_queue(self):
+        """
+        send the updates committed by this process that are still queued,
+        so its searches see its own changes
+        """
+        if self.indexing_queue is not None and len(self.indexing_queue):
+            try:
+                self.indexing_queue.flush()
+            except Exception as e:
+                log.warn("Unable to send queued updates before searching. %s", e)
+
     def cursor_search(self, search_params, context):
+        self._flush_indexing_queue()
         try:
             search_params.fields = self._get_fields_to_return(search_params.fields)
             search_params = self._add_tx_state_query(search_params, None)
+            self._solr_requests.mark()
             catalog_results = self.model_index.cursor_search(search_params)
         except SearchException as e:
             log.error("EXCEPTION: %s", e.message)
@@ -496,8 +520,10 @@ class ModelCatalogDataManager(object):
             search_params.start = 0
             search_params.limit = None
 
+        self._flush_indexing_queue()
         try:
             search_params.fields = self._get_fields_to_return(search_params.fields)
+            self._solr_requests.mark()
             catalog_results = self.model_index.search(search_params)
         except SearchException as e:
             log.error("EXCEPTION: %s", e.message)
@@ -591,6 +617,7 @@ class ModelCatalogDataManager(object):
         if tx_state and tx_state.are_there_indexed_updates():
             try:
                 query = {TX_STATE_FIELD:tx_state.tid}
+                self._solr_requests.mark()
                 self.model_index.unindex_search(SearchParams(query))
             except Exception as e:
                 log.fatal("Exception trying to abort current transaction. %s / %s", e, e.message)
@@ -612,7 +639,14 @@ class ModelCatalogDataManager(object):
         tx_state = self._get_tx_state(transaction)
         if tx_state:
             start = time.time()
+            tx_state.tpc_begin_time = start
             tx_state.prepare_updates_to_finish_transaction()
+            if self.indexing_queue is not None:
+                # the queue reads the objects' committed state, so it must
+                # only get the updates once the storage has finished too
+                transaction.addAfterCommitHook(
+                    self._queue_committed_updates,
+                    (tx_state.get_updates_to_finish_transaction(),))
             log.debug("Preparing updates to finish tx took %s", time.time()-start)
 
     def commit(self, transaction):
@@ -620,6 +654,7 @@ class ModelCatalogDataManager(object):
 
     def tpc_vote(self, transaction):
         # Check connection to SOLR
+        self._solr_requests.mark()
         if not self.ping_index():
             raise ModelCatalogUnavailableError()
 
@@ -630,8 +665,13 @@ class ModelCatalogDataManager(object):
                 updates = tx_state.get_updates_to_finish_transaction()
                 dirty_tx = tx_state.are_there_indexed_updates()
                 try:
-                    self.model_index.process_batched_updates(updates)
+                    if self.indexing_queue is None:
+                        self._solr_requests.mark()
+                        self.model_index.process_batched_updates(updates)
                     self._delete_temporary_tx_documents()
+                    if tx_state.tpc_begin_time is not None:
+                        duration = time.time() - tx_state.tpc_begin_time
+                        self._commit_timer.update(int(duration * 1000))
                     log.debug("COMMIT_METRIC: %s. MID-TX COMMITS? %s", tx_state.commits_metric, dirty_tx)
                 except Exception as e:
                     log.exception("Exception in tcp_finish: %s / %s", e, e.message)
@@ -640,6 +680,17 @@ class ModelCatalogDataManager(object):
         finally:
             self.reset_tx_state(transaction)
 
+    def _queue_committed_updates(self, status, updates):
+        """
+        after commit hook that puts the updates of a committed transaction
+        in the indexing queue
+        """
+        if status:
+            try:
+                self.indexing_queue.put(updates)
+            except Exception as e:
+                log.exception("Unable to queue model catalog updates. %s", e)
+
     def tpc_abort(self, transaction):
         pass
 
@@ -9,6 +9,7 @@
 
 import Queue
 import multiprocessing
+import os
 import sys
 import time
 import transaction
@@ -28,6 +29,9 @@ from Products.ZenRelations.ToManyContRelationship import ToManyContRelationship
 from Products.ZenUtils.ZenScriptBase import ZenScriptBase
 from Products.Zuul.catalog.global_catalog import GlobalCatalog
 from Products.Zuul.catalog.model_catalog import get_solr_config
+from Products.Zuul.catalog.model_catalog_queue import (
+    build_index_updates, get_journal_dir, orphaned_journals
+)
 from Products.Zuul.utils import dottedname
 from zenoss.modelindex.constants import ZENOSS_MODEL_COLLECTION_NAME
 from zenoss.modelindex.model_index import IndexUpdate, INDEX, UNINDEX, SearchParams
@@ -504,6 +508,27 @@ def reindex_model_catalog(dmd, root="/zport", idxs=None, types=()):
     log.info("Reindexing took %s seconds.", time.time() - start)
 
 
+def reconcile_model_catalog(dmd, journal_dir=None):
+    """
+    Reindexes the objects whose updates were still queued when the process
+    that committed them exited (see model_catalog_queue)
+    """
+    modelindex = zope.component.createObject('ModelIndex', get_solr_config())
+    count = 0
+    for path, uids in orphaned_journals(journal_dir or get_journal_dir()):
+        log.info("Reindexing %s objects listed in %s", len(uids), path)
+        uids = sorted(uids)
+        for i in xrange(0, len(uids), 1000):
+            updates = [(uid, INDEX, None) for uid in uids[i:i + 1000]]
+            modelindex.process_batched_updates(
+                build_index_updates(dmd, updates), commit=False)
+        modelindex.commit()
+        os.remove(path)
+        count += len(uids)
+    log.info("Reindexed %s objects with lost model catalog updates.", count)
+    return count
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Reindex Solr against ZODB.")
     parser.add_argument("-f", "--hard", action="store_true",
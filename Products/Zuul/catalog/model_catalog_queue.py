@@ -0,0 +1,402 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+"""Optional queue of committed model catalog updates that are sent to Solr
+in the background.
+
+The queue is disabled by default; set solr-flush-interval in global.conf
+to a number of seconds to enable it.  Transactions then put the uids of
+the objects they changed in the queue from an after commit hook, once
+every resource, including the ZODB storage, has finished.  Updates to the
+same object are coalesced while they wait, and the queue is flushed in
+batches every solr-flush-interval seconds, as soon as
+solr-flush-batch-size objects are waiting, before each search made by
+the process, and when the process exits.  Once solr-flush-max-queued
+objects are waiting, committing transactions send the queue themselves.
+
+Each batch is built from the latest committed state of its objects, read
+with a ZODB connection of the queue, and not from the state committed by
+the transactions that queued them.  A process that flushes after another
+one changed the same objects therefore does not send their older state.
+
+The uids of the queued objects are written to a journal in
+solr-flush-journal-dir when they are queued, and removed once they were
+sent.  When a process dies with updates still queued, the next process
+that starts a queue reindexes the objects listed in its journal;
+"zencatalog --reconcile" does the same when the queue was disabled
+since.
+"""
+
+import atexit
+import errno
+import fcntl
+import logging
+import os
+import socket
+import threading
+import time
+
+from collections import OrderedDict
+
+import transaction
+import zope.component
+
+from metrology import Metrology
+from metrology.instruments import Gauge
+from metrology.registry import registry
+from zExceptions import NotFound
+from zenoss.modelindex.model_index import IndexUpdate, INDEX, UNINDEX
+
+from Products.ZenUtils.GlobalConfig import getGlobalConfiguration
+from Products.ZenUtils.Utils import zenPath
+
+log = logging.getLogger("model_catalog")
+
+DEFAULT_FLUSH_INTERVAL = 0
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_QUEUED = 10000
+JOURNAL_SUFFIX = ".uids"
+
+_queues = {}  # { solr_servers: ModelCatalogIndexingQueue or None }
+_queues_lock = threading.Lock()
+
+
+def get_journal_dir():
+    config = getGlobalConfiguration()
+    return config.get("solr-flush-journal-dir") or zenPath(
+        "var", "model_catalog_queue")
+
+
+def build_index_updates(root, updates):
+    """
+    Return the modelindex.IndexUpdates that send the current state of the
+    objects of updates, a list of (uid, op, idxs).  Objects that can't be
+    found from root are unindexed.
+    """
+    index_updates = []
+    for uid, op, idxs in updates:
+        if op != UNINDEX:
+            try:
+                obj = root.unrestrictedTraverse(uid)
+            except (KeyError, AttributeError, NotFound):
+                log.debug("Unindexing %s, which no longer exists", uid)
+            else:
+                index_updates.append(IndexUpdate(
+                    obj, op=INDEX, idxs=sorted(idxs) if idxs else None,
+                    uid=uid))
+                continue
+        index_updates.append(IndexUpdate(None, op=UNINDEX, uid=uid))
+    return index_updates
+
+
+class IndexUpdateLoader(object):
+    """
+    Builds IndexUpdates from the latest committed state of the objects,
+    using its own connection to db.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._transaction_manager = transaction.TransactionManager()
+        self._connection = None
+
+    def __call__(self, updates):
+        if self._connection is None:
+            self._connection = self.db.open(
+                transaction_manager=self._transaction_manager)
+        # start a new transaction to see the latest committed state
+        self._transaction_manager.abort()
+        try:
+            root = self._connection.root()["Application"]
+            return build_index_updates(root, updates)
+        finally:
+            self._transaction_manager.abort()
+            self._connection.cacheGC()
+
+
+class DirtyUidJournal(object):
+    """
+    File listing the uids of the objects with queued updates, so they can
+    be reindexed when the process dies before sending them.  The file is
+    locked for as long as the process that writes it runs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a")
+        fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    @classmethod
+    def create(cls, journal_dir):
+        """ return a new journal in journal_dir """
+        try:
+            os.makedirs(journal_dir)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        name = "%s-%s-%d%s" % (socket.gethostname(), os.getpid(),
+                               time.time() * 1000, JOURNAL_SUFFIX)
+        return cls(os.path.join(journal_dir, name))
+
+    def add(self, uids):
+        if uids:
+            self._file.write("".join("%s\n" % uid for uid in uids))
+            self._file.flush()
+
+    def rewrite(self, uids):
+        """ replace the uids in the journal with uids """
+        self._file.truncate(0)
+        self.add(uids)
+
+    def remove(self):
+        self._file.close()
+        os.remove(self.path)
+
+
+def orphaned_journals(journal_dir):
+    """
+    Yield the path and the uids of each journal in journal_dir whose
+    process exited.  The journal is locked until the next one is
+    yielded, and should be removed once its objects were reindexed.
+    """
+    try:
+        names = sorted(os.listdir(journal_dir))
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(JOURNAL_SUFFIX):
+            continue
+        path = os.path.join(journal_dir, name)
+        try:
+            journal = open(path)
+        except IOError:
+            continue  # removed by another process
+        with journal:
+            try:
+                fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError:
+                continue  # its process is still running
+            if not os.path.exists(path):
+                continue
+            uids = set(line.strip() for line in journal if line.strip())
+            yield path, uids
+
+
+def _merge(queued, op, idxs):
+    """
+    Return the (op, idxs) that sends both a queued update of an object
+    and a newer one.  idxs is None when every field is sent.
+    """
+    if queued is None or op == UNINDEX:
+        return op, set(idxs) if idxs else None
+    queued_op, queued_idxs = queued
+    if queued_op == UNINDEX or not idxs or queued_idxs is None:
+        return INDEX, None
+    return INDEX, queued_idxs | set(idxs)
+
+
+class ModelCatalogIndexingQueue(object):
+    """
+    Coalesces the updates committed to each object uid, and sends them to
+    the index in batches from a background thread.  load turns a batch of
+    (uid, op, idxs) into the modelindex.IndexUpdates that are sent.
+    """
+
+    def __init__(self, model_index, load, interval=1.0,
+                 batch_size=DEFAULT_BATCH_SIZE, max_queued=DEFAULT_MAX_QUEUED,
+                 journal=None):
+        self.model_index = model_index
+        self.load = load
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_queued = max(batch_size, max_queued)
+        self.journal = journal
+        self._updates = OrderedDict()  # { object_uid: (op, idxs) }
+        self._sending = ()  # uids of the batch being sent
+        self._lock = threading.Condition()
+        self._send_lock = threading.Lock()  # keeps batches in order
+        self._thread = None
+        self._requests = Metrology.meter("modelcatalog.solrRequests")
+        self._sent = Metrology.meter("modelcatalog.indexUpdatesSent")
+        self._coalesced = Metrology.meter("modelcatalog.indexUpdatesCoalesced")
+        if "modelcatalog.indexQueue" not in {name for name, _ in registry}:
+            queue = self
+
+            class IndexQueueGauge(Gauge):
+                @property
+                def value(self):
+                    return len(queue)
+
+            Metrology.gauge("modelcatalog.indexQueue", IndexQueueGauge())
+
+    def __len__(self):
+        """ number of objects whose updates were not sent yet """
+        with self._lock:
+            return len(self._updates) + len(self._sending)
+
+    def _add(self, uid, op, idxs):
+        """ queue an update, returning whether it was coalesced """
+        queued = self._updates.get(uid)
+        # an object keeps its place in the queue
+        self._updates[uid] = _merge(queued, op, idxs)
+        return queued is not None
+
+    def _put(self, updates):
+        """ queue updates, a list of (uid, op, idxs) """
+        with self._lock:
+            was_empty = not self._updates
+            new = [uid for uid, _, _ in updates if uid not in self._updates]
+            if self.journal is not None:
+                self.journal.add(new)
+            coalesced = sum(self._add(*update) for update in updates)
+            if was_empty or len(self._updates) >= self.batch_size:
+                self._lock.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="model catalog indexing queue")
+                self._thread.daemon = True
+                self._thread.start()
+            full = len(self._updates) >= self.max_queued
+        if coalesced:
+            self._coalesced.mark(coalesced)
+        if full:
+            self.flush()
+
+    def put(self, updates):
+        """
+        queue the modelindex.IndexUpdates committed by a transaction.  When
+        max_queued objects are waiting, the queue is sent before returning.
+        """
+        self._put([(u.uid, u.op, u.idxs) for u in updates])
+
+    def reindex(self, uids):
+        """ queue a full update of the objects with uids """
+        self._put([(uid, INDEX, None) for uid in uids])
+
+    def _take(self):
+        """ return the updates of up to batch_size objects, marked as sending """
+        batch = []
+        with self._lock:
+            for _ in xrange(min(self.batch_size, len(self._updates))):
+                uid, (op, idxs) = self._updates.popitem(last=False)
+                batch.append((uid, op, idxs))
+            self._sending = [uid for uid, _, _ in batch]
+        return batch
+
+    def _sent_batch(self):
+        """ forget the uids of the batch that was sent """
+        with self._lock:
+            self._sending = ()
+            if self.journal is not None:
+                self.journal.rewrite(self._updates.keys())
+
+    def _requeue(self, batch):
+        """ put a batch that could not be sent back ahead of newer updates """
+        with self._lock:
+            newer = self._updates
+            self._updates = OrderedDict()
+            for update in batch:
+                self._add(*update)
+            for uid, (op, idxs) in newer.iteritems():
+                self._add(uid, op, idxs)
+            self._sending = ()
+
+    def flush(self):
+        """ send every queued update to the index """
+        with self._send_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    return
+                try:
+                    self.model_index.process_batched_updates(self.load(batch))
+                except Exception:
+                    self._requeue(batch)
+                    raise
+                self._sent_batch()
+                self._requests.mark()
+                self._sent.mark(len(batch))
+
+    def close(self):
+        """ send every queued update, and remove the journal """
+        self.flush()
+        if self.journal is not None:
+            self.journal.remove()
+            self.journal = None
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._updates:
+                    self._lock.wait()
+                if len(self._updates) < self.batch_size:
+                    # give the next transactions a chance to join the batch
+                    self._lock.wait(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Unable to send %s queued updates to the "
+                              "model catalog. Retrying in %s seconds",
+                              len(self), self.interval)
+                with self._lock:
+                    self._lock.wait(self.interval)
+
+
+def get_indexing_queue(solr_servers, db=None):
+    """
+    Return the process' indexing queue for solr_servers, or None when
+    updates must be sent synchronously: solr-flush-interval is 0, there
+    is no database to load the objects from, or the journal can't be
+    written.
+    """
+    with _queues_lock:
+        if solr_servers in _queues:
+            return _queues[solr_servers]
+        config = getGlobalConfiguration()
+        interval = float(config.get("solr-flush-interval",
+                                    DEFAULT_FLUSH_INTERVAL))
+        if interval <= 0:
+            _queues[solr_servers] = None
+            return None
+        if db is None:
+            return None
+        journal_dir = get_journal_dir()
+        try:
+            journal = DirtyUidJournal.create(journal_dir)
+        except (IOError, OSError) as e:
+            log.error("Unable to create a model catalog queue journal in %s, "
+                      "sending updates synchronously. %s", journal_dir, e)
+            _queues[solr_servers] = None
+            return None
+        queue = ModelCatalogIndexingQueue(
+            zope.component.createObject("ModelIndex", solr_servers),
+            IndexUpdateLoader(db),
+            interval,
+            int(config.get("solr-flush-batch-size", DEFAULT_BATCH_SIZE)),
+            int(config.get("solr-flush-max-queued", DEFAULT_MAX_QUEUED)),
+            journal,
+        )
+        for path, uids in orphaned_journals(journal_dir):
+            log.warn("Reindexing %s objects whose updates were not sent "
+                     "by the process that wrote %s", len(uids), path)
+            queue.reindex(uids)
+            os.remove(path)
+        _queues[solr_servers] = queue
+        return queue
+
+
+@atexit.register
+def _flush_queues():
+    for queue in _queues.values():
+        if queue is not None:
+            try:
+                queue.close()
+            except Exception:
+                log.exception("Unable to send %s queued updates to the "
+                              "model catalog before exiting", len(queue))
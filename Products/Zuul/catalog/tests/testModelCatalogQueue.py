@@ -0,0 +1,129 @@
+##############################################################################
+#
+# Copyright (C) Zenoss, Inc. 2026, all rights reserved.
+#
+# This content is made available according to terms specified in
+# License.zenoss under the directory where your Zenoss product is installed.
+#
+##############################################################################
+
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from mock import Mock
+from zenoss.modelindex.model_index import INDEX, UNINDEX
+
+from Products.Zuul.catalog.model_catalog_queue import (
+    DirtyUidJournal, ModelCatalogIndexingQueue, orphaned_journals
+)
+
+
+class Update(object):
+    """ Stands in for a modelindex.IndexUpdate """
+
+    def __init__(self, uid, op=INDEX, idxs=None):
+        self.uid = uid
+        self.op = op
+        self.idxs = idxs
+
+
+class ModelCatalogIndexingQueueTest(TestCase):
+
+    def setUp(self):
+        self.model_index = Mock()
+        self.journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.journal_dir)
+        self.journal = DirtyUidJournal.create(self.journal_dir)
+        # the loader passes the (uid, op, idxs) of the batch through
+        self.queue = ModelCatalogIndexingQueue(
+            self.model_index, list, batch_size=2, max_queued=4,
+            journal=self.journal)
+        # keep the background thread from flushing the queue
+        self.queue._thread = Mock()
+
+    def sent(self):
+        return [call[0][0]
+                for call in self.model_index.process_batched_updates.call_args_list]
+
+    def journaled(self):
+        with open(self.journal.path) as f:
+            return sorted(line.strip() for line in f)
+
+    def test_coalesces_updates(self):
+        self.queue.put([Update("/a", idxs=["name"]),
+                        Update("/a", idxs=["productionState"]),
+                        Update("/b", op=UNINDEX)])
+        self.queue.put([Update("/b", idxs=["name"]), Update("/c", op=UNINDEX)])
+        self.assertEqual(len(self.queue), 3)
+        self.queue.flush()
+        self.assertEqual(self.sent(), [
+            [("/a", INDEX, set(["name", "productionState"])),
+             ("/b", INDEX, None)],
+            [("/c", UNINDEX, None)],
+        ])
+        self.assertEqual(len(self.queue), 0)
+
+    def test_full_update_replaces_partial_updates(self):
+        self.queue.put([Update("/a", idxs=["name"]), Update("/a")])
+        self.queue.put([Update("/a", idxs=["name"])])
+        self.queue.flush()
+        self.assertEqual(self.sent(), [[("/a", INDEX, None)]])
+
+    def test_failed_batch_is_requeued_before_newer_updates(self):
+        self.queue.put([Update("/a", idxs=["name"]), Update("/b")])
+        self.model_index.process_batched_updates.side_effect = Exception()
+        self.assertRaises(Exception, self.queue.flush)
+        self.assertEqual(len(self.queue), 2)
+        self.queue.put([Update("/c"), Update("/a", idxs=["productionState"])])
+        self.model_index.process_batched_updates.side_effect = None
+        self.queue.flush()
+        self.assertEqual(self.sent()[-2:], [
+            [("/a", INDEX, set(["name", "productionState"])),
+             ("/b", INDEX, None)],
+            [("/c", INDEX, None)],
+        ])
+
+    def test_batch_is_pending_until_sent(self):
+        lengths = []
+        self.model_index.process_batched_updates.side_effect = (
+            lambda batch: lengths.append(len(self.queue)))
+        self.queue.put([Update("/a")])
+        self.queue.flush()
+        self.assertEqual(lengths, [1])
+        self.assertEqual(len(self.queue), 0)
+
+    def test_commit_sends_full_queue(self):
+        self.queue.put([Update("/%d" % i) for i in range(3)])
+        self.assertEqual(self.sent(), [])
+        self.queue.put([Update("/3")])
+        self.assertEqual(len(self.sent()), 2)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_journal_lists_unsent_uids(self):
+        self.queue.put([Update("/a"), Update("/b"), Update("/c")])
+        self.assertEqual(self.journaled(), ["/a", "/b", "/c"])
+        self.model_index.process_batched_updates.side_effect = [None, Exception()]
+        self.assertRaises(Exception, self.queue.flush)
+        self.assertEqual(self.journaled(), ["/c"])
+        self.model_index.process_batched_updates.side_effect = None
+        self.queue.close()
+        self.assertFalse(os.path.exists(self.journal.path))
+
+    def test_orphaned_journals(self):
+        self.queue.put([Update("/a")])
+        self.assertEqual(list(orphaned_journals(self.journal_dir)), [])
+        orphan = os.path.join(self.journal_dir, "gone-1-1.uids")
+        with open(orphan, "w") as f:
+            f.write("/b\n/c\n/b\n")
+        self.assertEqual(list(orphaned_journals(self.journal_dir)),
+                         [(orphan, set(["/b", "/c"]))])
+
+
+def test_suite():
+    from unittest import TestSuite, makeSuite
+    suite = TestSuite()
+    suite.addTest(makeSuite(ModelCatalogIndexingQueueTest))
+    return suite